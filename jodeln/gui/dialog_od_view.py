@@ -6,13 +6,18 @@ from PySide2.QtCore import QSize
 from gui.ui_dialog_od_view import Ui_ODView
 from gui.dialog_odme import DialogODME
 from gui.dialog_odme_leastsq import DialogODME_LeastSq
+from gui.odme_worker import ODMEWorker
 from od.od_matrix import ODMatrix
 
 from typing import Protocol
 
 
 class Model(Protocol):
-    def estimate_od_fratar(self):
+    def solve_od_fratar(self, tol=1e-6, max_iterations=100, progress=None, cancel=None):
+        ...
+    def prepare_odme(self) -> None:
+        ...
+    def apply_od_estimate(self, result) -> None:
         ...
     @property
     def od_seed(self) -> ODMatrix:
@@ -32,6 +37,7 @@ class DialogODView(QMainWindow):
         self.ui.setupUi(self)
 
         self.model = model
+        self.worker: ODMEWorker = None
 
         self.dialog_odme = DialogODME(model)
         self.dialog_odme_leastsq = DialogODME_LeastSq(model, self.load_od_data)
@@ -41,6 +47,7 @@ class DialogODView(QMainWindow):
         self.ui.actionODME_fratar.triggered.connect(self.odme_fratar_factor)
         self.ui.actionODME_leastsq.triggered.connect(self.odme_leastsq)
         self.ui.actionODME_cmaes.triggered.connect(self.odme_cmaes)
+        self.ui.actionODME_cancel.triggered.connect(self.cancel_fratar)
         
 
     def load_od_data(self):
@@ -59,10 +66,57 @@ class DialogODView(QMainWindow):
         self.resize(QSize(self.size().width() - 1, self.size().height() - 1))
 
     def odme_fratar_factor(self):
-        self.model.estimate_od_fratar()
+        """Start Fratar factoring in a background thread."""
+        # Build the cached data the worker reads on this thread.
+        self.model.prepare_odme()
+        self.worker = ODMEWorker(self.model.solve_od_fratar, reports_progress=True)
+        self.worker.signals.progress.connect(self.on_fratar_progress)
+        self.worker.signals.finished.connect(self.on_fratar_finished)
+        self.worker.signals.error.connect(self.on_fratar_error)
+
+        self.set_running(True)
+        self.ui.statusbar.showMessage("Running Fratar factoring...")
+        self.worker.start()
+
+    def cancel_fratar(self):
+        """Stop the running Fratar factoring after the current iteration."""
+        if self.worker is None:
+            return
+
+        self.worker.cancel()
+        self.ui.statusbar.showMessage("Cancelling...")
+
+    def set_running(self, running: bool):
+        self.ui.actionODME_fratar.setEnabled(not running)
+        self.ui.actionODME_cancel.setEnabled(running)
+
+    def on_fratar_progress(self, iteration: int, objective: float, total_geh: float):
+        self.ui.statusbar.showMessage(f"Fratar iteration {iteration}: largest residual {objective:.2e}")
+
+    def on_fratar_finished(self, result):
+        self.worker = None
+        self.set_running(False)
+
+        if result is None:
+            self.ui.statusbar.showMessage("Fratar factoring cancelled.")
+            return
+
+        try:
+            self.model.apply_od_estimate(result)
+        except ValueError as e:
+            self.ui.statusbar.showMessage(f"OD estimate not applied. {e}")
+            return
+
+        self.ui.statusbar.clearMessage()
         self.ui.mv2.load_od_data(self.model.od_estimated)
         self.ui.mv3.load_od_data(self.model.od_diff)
 
+    def on_fratar_error(self, message: str):
+        self.worker = None
+        self.set_running(False)
+        self.ui.statusbar.showMessage("Fratar factoring failed.")
+        print(message)
+
     def odme_leastsq(self):
         self.dialog_odme_leastsq.show()
 
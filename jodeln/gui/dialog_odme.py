@@ -1,16 +1,23 @@
+from functools import partial
+
 from PySide2.QtWidgets import QWidget, QFileDialog
 from PySide2.QtGui import QDoubleValidator
 
 from gui.ui_dialog_odme import Ui_Dialog
+from gui.odme_worker import ExportWatcher, ODMEWorker
 
 from typing import Protocol
 
 class Model(Protocol):
-    def estimate_od_cmaes(self, weight_total_geh=None, weight_odsse=None, weight_route_ratio=None):
+    def solve_od_cmaes(self, weight_total_geh=None, weight_odsse=None, weight_route_ratio=None,
+                       batch=False, workers=None, progress=None, cancel=None):
+        ...
+    def prepare_odme(self) -> None:
         ...
-    def export_od(self, output_folder=None) -> None:
+    def apply_od_estimate(self, result) -> None:
         ...
-    def export_od_by_route(self, output_folder=None) -> None:
+    def export_all(self, output_folder=None, formats='csv', workers=None, 
+                   compression=None, wait=True) -> list:
         ...
 
 
@@ -23,8 +30,12 @@ class DialogODME(QWidget):
         self.ui.setupUi(self)
 
         self.model = model
+        self.worker: ODMEWorker = None
+        self.export_watcher = ExportWatcher()
+        self.export_watcher.finished.connect(self.on_export_finished)
 
         self.ui.pbEstimateOD.clicked.connect(self.estimate_od)
+        self.ui.pbCancel.clicked.connect(self.cancel_odme)
     
         # Set numeric validators on objective function weight line inputs.
         double_validator = QDoubleValidator(bottom=0)
@@ -43,19 +54,83 @@ class DialogODME(QWidget):
 
     def reject(self) -> None:
         """User clicks 'Close'."""
+        self.cancel_odme()
         self.close()
 
     def estimate_od(self) -> None:
-        """Run OD matrix estimation."""
-        self.model.estimate_od_cmaes(
-                weight_total_geh=float(self.ui.leWeightGEH.text()),
-                weight_odsse=float(self.ui.leWeightODSSE.text()),
-                weight_route_ratio=float(self.ui.leWeightRouteRatio.text())
-            )
-        
-        self.model.export_od(self.ui.leExportFolder.text())
-        self.model.export_od_by_route(self.ui.leExportFolder.text())
-        self.close()
+        """Start OD matrix estimation in a background thread."""
+        solve = partial(self.model.solve_od_cmaes,
+                        weight_total_geh=float(self.ui.leWeightGEH.text()),
+                        weight_odsse=float(self.ui.leWeightODSSE.text()),
+                        weight_route_ratio=float(self.ui.leWeightRouteRatio.text()))
+
+        # Build the cached data the worker reads on this thread.
+        self.model.prepare_odme()
+        self.worker = ODMEWorker(solve, reports_progress=True)
+        self.worker.signals.progress.connect(self.on_odme_progress)
+        self.worker.signals.finished.connect(self.on_odme_finished)
+        self.worker.signals.error.connect(self.on_odme_error)
+
+        self.set_running(True)
+        self.ui.lblProgress.setText("Starting OD estimation...")
+        self.worker.start()
+
+    def cancel_odme(self) -> None:
+        """Stop the running OD estimation after the current iteration."""
+        if self.worker is None:
+            return
+
+        self.worker.cancel()
+        self.ui.lblProgress.setText("Cancelling...")
+
+    def set_running(self, running: bool) -> None:
+        self.ui.pbEstimateOD.setEnabled(not running)
+        self.ui.pbCancel.setEnabled(running)
+
+    def on_odme_progress(self, iteration: int, objective: float, total_geh: float) -> None:
+        self.ui.lblProgress.setText(
+            f"Iteration {iteration}: objective {objective:.4f}, total GEH {total_geh:.1f}")
+
+    def on_odme_error(self, message: str) -> None:
+        self.worker = None
+        self.set_running(False)
+        self.ui.lblProgress.setText("OD estimation failed.")
+        print(message)
+
+    def on_odme_finished(self, result) -> None:
+        """Apply the estimated OD to the model and export it."""
+        self.worker = None
+        self.set_running(False)
+
+        if result is None:
+            self.ui.lblProgress.setText("OD estimation cancelled.")
+            return
+
+        try:
+            self.model.apply_od_estimate(result)
+        except ValueError as e:
+            self.ui.lblProgress.setText(f"OD estimate not applied. {e}")
+            return
+
+        # Files are written in background threads from a copy of the results.
+        self.ui.pbEstimateOD.setEnabled(False)
+        self.ui.lblProgress.setText("Exporting results...")
+        futures = self.model.export_all(self.ui.leExportFolder.text(), 
+                                        formats={'od': 'csv', 'od_by_route': 'csv'},
+                                        wait=False)
+        self.export_watcher.watch(futures)
+
+    def on_export_finished(self, errors: list) -> None:
+        """Report the result of the background export."""
+        self.ui.pbEstimateOD.setEnabled(True)
+
+        if errors:
+            self.ui.lblProgress.setText(f"OD estimated. {len(errors)} export(s) failed.")
+            for message in errors:
+                print(message)
+            return
+
+        self.ui.lblProgress.setText("OD estimated and exported.")
 
     def on_pbExportFolder_click(self) -> None:
         """Open a standard file dialog for selecting the export folder."""
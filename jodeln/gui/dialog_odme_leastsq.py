@@ -1,12 +1,19 @@
+from functools import partial
+
 from PySide2.QtWidgets import QWidget, QFileDialog
 from PySide2.QtGui import QDoubleValidator
 
 from gui.ui_dialog_odme_leastsq import Ui_DialogODME_LeastSq
+from gui.odme_worker import ODMEWorker
 
 from typing import Protocol
 
 class Model(Protocol):
-    def estimate_od_leastsq(self, seed_od_weight: float):
+    def solve_od_leastsq(self, seed_od_weight: float, progress=None, cancel=None):
+        ...
+    def prepare_odme(self) -> None:
+        ...
+    def apply_od_estimate(self, result) -> None:
         ...
 
 
@@ -21,20 +28,72 @@ class DialogODME_LeastSq(QWidget):
 
         self.model = model
         self.post_odme_fn = cb_post_odme
+        self.worker: ODMEWorker = None
 
         double_validator = QDoubleValidator(bottom=0)
         double_validator.setNotation(QDoubleValidator.StandardNotation)
         self.ui.leSeedODWeight.setValidator(double_validator)
 
         self.ui.pbRunOdme.clicked.connect(self.estimate_od)
+        self.ui.pbCancel.clicked.connect(self.cancel_odme)
         self.ui.pbClose.clicked.connect(self.close)
 
     def estimate_od(self) -> None:
-        """Run OD matrix estimation."""
+        """Start OD matrix estimation in a background thread."""
+        solve = partial(self.model.solve_od_leastsq, float(self.ui.leSeedODWeight.text()))
+
+        # Build the cached data the worker reads on this thread.
+        self.model.prepare_odme()
+        self.worker = ODMEWorker(solve, reports_progress=True)
+        self.worker.signals.progress.connect(self.on_odme_progress)
+        self.worker.signals.finished.connect(self.on_odme_finished)
+        self.worker.signals.error.connect(self.on_odme_error)
+
+        self.set_running(True)
         self.ui.txtDiagnostics.setText("")
-        diagnostics = self.model.estimate_od_leastsq(float(self.ui.leSeedODWeight.text()))
-        self.ui.txtDiagnostics.setText(diagnostics.__repr__())
+        self.ui.lblProgress.setText("Running OD estimation...")
+        self.worker.start()
+
+    def cancel_odme(self) -> None:
+        """Discard the running OD estimation. The solver step cannot be interrupted."""
+        if self.worker is None:
+            return
+
+        self.worker.cancel()
+        self.ui.lblProgress.setText("Cancelling...")
+
+    def set_running(self, running: bool) -> None:
+        self.ui.pbRunOdme.setEnabled(not running)
+        self.ui.pbCancel.setEnabled(running)
+
+    def on_odme_progress(self, iteration: int, objective: float, total_geh: float) -> None:
+        self.ui.lblProgress.setText(f"Solver finished after {iteration} iterations: cost {objective:.4f}")
+
+    def on_odme_finished(self, result) -> None:
+        """Apply the estimated OD to the model."""
+        self.worker = None
+        self.set_running(False)
+
+        if result is None:
+            self.ui.lblProgress.setText("OD estimation cancelled.")
+            return
+
+        try:
+            self.model.apply_od_estimate(result)
+        except ValueError as e:
+            self.ui.lblProgress.setText(f"OD estimate not applied. {e}")
+            return
+
+        self.ui.lblProgress.setText("")
+        self.ui.txtDiagnostics.setText(result.diagnostics.__repr__())
         self.post_odme_fn()
 
+    def on_odme_error(self, message: str) -> None:
+        self.worker = None
+        self.set_running(False)
+        self.ui.lblProgress.setText("OD estimation failed.")
+        self.ui.txtDiagnostics.setText(message)
+
     def close(self) -> bool:
+        self.cancel_odme()
         return super().close()        
@@ -0,0 +1,118 @@
+"""Run OD estimation in a background thread."""
+
+import threading
+import traceback
+from concurrent.futures import Future
+
+from PySide2.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from typing import Callable
+
+
+class ODMESignals(QObject):
+    """Signals emitted by an ODMEWorker.
+
+    The signals are emitted from the worker thread and delivered to slots on
+    the GUI thread.
+
+    progress(iteration, objective, total_geh)
+        After every ODME iteration, if the ODME method reports progress.
+    finished(result)
+        ODMEResult from the solve function, or None if cancelled.
+    error(message)
+        The solve function raised an exception.
+    """
+    progress = Signal(int, float, float)
+    finished = Signal(object)
+    error = Signal(str)
+
+
+class ODMEWorker(QRunnable):
+    """Run one ODME solve function in the global QThreadPool.
+
+    The solve function must not change the Model, so the GUI can keep drawing
+    it. Apply the result on the GUI thread when finished is emitted, see
+    Model.apply_od_estimate().
+    """
+    def __init__(self, solve: Callable, reports_progress: bool = False):
+        """
+        Parameters
+        ----------
+        solve : Callable
+            Function that returns an ODMEResult, e.g. Model.solve_od_fratar.
+        reports_progress : bool, optional
+            If True, solve is called with progress and cancel keyword arguments,
+            see Model.solve_od_cmaes. By default False.
+        """
+        super().__init__()
+        self.solve = solve
+        self.reports_progress = reports_progress
+        self.signals = ODMESignals()
+        self._cancelled = threading.Event()
+
+    def start(self) -> None:
+        """Queue the worker in the global thread pool."""
+        QThreadPool.globalInstance().start(self)
+
+    def cancel(self) -> None:
+        """Stop at the end of the current iteration and discard the result."""
+        self._cancelled.set()
+
+    def run(self) -> None:
+        try:
+            if self.reports_progress:
+                result = self.solve(progress=self._emit_progress, cancel=self._cancelled.is_set)
+            else:
+                result = self.solve()
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+            return
+
+        if self._cancelled.is_set():
+            result = None
+
+        self.signals.finished.emit(result)
+
+    def _emit_progress(self, progress) -> None:
+        self.signals.progress.emit(progress.iteration, progress.objective, progress.total_geh)
+
+
+class ExportWatcher(QObject):
+    """Report when background exports finish, e.g. from Model.export_all(wait=False).
+
+    finished(errors)
+        Emitted once every watched export is done. errors has the traceback of
+        each export that failed, and is empty if every export succeeded.
+    """
+    finished = Signal(list)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._errors: list[str] = []
+
+    def watch(self, futures: list[Future]) -> None:
+        """Emit finished when every future is done."""
+        with self._lock:
+            self._remaining = len(futures)
+            self._errors = []
+
+        if not futures:
+            self.finished.emit([])
+            return
+
+        for future in futures:
+            future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future) -> None:
+        # Called from the export thread. The signal is delivered on the GUI thread.
+        exc = future.exception()
+        with self._lock:
+            if exc is not None:
+                self._errors.append(''.join(traceback.format_exception(exc)))
+            self._remaining -= 1
+            done = self._remaining == 0
+
+        if done:
+            self.finished.emit(list(self._errors))
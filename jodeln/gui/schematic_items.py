@@ -2,6 +2,8 @@ from PySide2.QtWidgets import QGraphicsItem
 from PySide2.QtCore import QRectF, QPointF
 from typing import Optional
 
+import numpy as np
+
 from PySide2.QtGui import QPainter, QPen, QColor, QPainterPath, QFont, QPolygonF
 from PySide2.QtWidgets import QStyleOptionGraphicsItem, QWidget
 from PySide2.QtCore import Qt
@@ -13,15 +15,16 @@ class LinkItem(QGraphicsItem):
     
     Displayed as a line between the starting node i and ending node j of the link.
     """
-    def __init__(self, pts: list[tuple[float, float]], parent: Optional[QGraphicsItem] = None) -> None:
+    def __init__(self, pts: np.ndarray, parent: Optional[QGraphicsItem] = None) -> None:
         super().__init__(parent=parent)
-        self.pts = pts
-        self.polyline = QPolygonF([QPointF(x, y) for x, y in pts])
-
-        self.topleft_x = min([x for x, _ in pts])
-        self.topleft_y = min([y for _, y in pts])
-        self.width = abs(max([x for x, _ in pts]) - self.topleft_x)
-        self.height = abs(max([y for _, y in pts]) - self.topleft_y)
+        # pts is a view of the network shape point array, shape (n, 2).
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.polyline = QPolygonF([QPointF(x, y) for x, y in self.pts.tolist()])
+
+        self.topleft_x, self.topleft_y = self.pts.min(axis=0).tolist()
+        max_x, max_y = self.pts.max(axis=0).tolist()
+        self.width = abs(max_x - self.topleft_x)
+        self.height = abs(max_y - self.topleft_y)
 
         self.is_on_selected_path = False
     
@@ -4,6 +4,7 @@ from .schematic_items import LinkItem, NodeItem
 from typing import TYPE_CHECKING, Protocol
 
 if TYPE_CHECKING:
+    import numpy as np
     import PySide2.QtWidgets    
 
 class NodeData(Protocol):
@@ -22,7 +23,7 @@ class LinkData(Protocol):
     def key(self) -> tuple[int, int]:
         ...
     @property
-    def shape_points(self) -> list[tuple[float, float]]:
+    def shape_points(self) -> 'np.ndarray':
         ...    
 
 class RouteInfo(Protocol):
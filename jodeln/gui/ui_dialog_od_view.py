@@ -26,6 +26,9 @@ class Ui_ODView(object):
         self.actionODME_cmaes.setObjectName(u"actionODME_cmaes")
         self.actionODME_leastsq = QAction(ODView)
         self.actionODME_leastsq.setObjectName(u"actionODME_leastsq")
+        self.actionODME_cancel = QAction(ODView)
+        self.actionODME_cancel.setObjectName(u"actionODME_cancel")
+        self.actionODME_cancel.setEnabled(False)
         self.centralwidget = QWidget(ODView)
         self.centralwidget.setObjectName(u"centralwidget")
         self.gridLayout_3 = QGridLayout(self.centralwidget)
@@ -82,6 +85,8 @@ class Ui_ODView(object):
         self.menuODME.addAction(self.actionODME_fratar)
         self.menuODME.addAction(self.actionODME_leastsq)
         self.menuODME.addAction(self.actionODME_cmaes)
+        self.menuODME.addSeparator()
+        self.menuODME.addAction(self.actionODME_cancel)
 
         self.retranslateUi(ODView)
 
@@ -96,6 +101,7 @@ class Ui_ODView(object):
         self.actionODME_fratar.setText(QCoreApplication.translate("ODView", u"Bi-proportional matrix factoring (Fratar Method)", None))
         self.actionODME_cmaes.setText(QCoreApplication.translate("ODView", u"CMA-ES Method", None))
         self.actionODME_leastsq.setText(QCoreApplication.translate("ODView", u"Least Squares Method", None))
+        self.actionODME_cancel.setText(QCoreApplication.translate("ODView", u"Cancel OD Estimation", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tabSeed), QCoreApplication.translate("ODView", u"Seed Matrix", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tabEst), QCoreApplication.translate("ODView", u"Estimated Matrix", None))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tabDiff), QCoreApplication.translate("ODView", u"Diff Matrix", None))
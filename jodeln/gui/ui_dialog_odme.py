@@ -82,14 +82,25 @@ class Ui_Dialog(object):
         sizePolicy1.setHeightForWidth(self.pbEstimateOD.sizePolicy().hasHeightForWidth())
         self.pbEstimateOD.setSizePolicy(sizePolicy1)
 
-        self.gridLayout.addWidget(self.pbEstimateOD, 5, 0, 1, 3)
+        self.gridLayout.addWidget(self.pbEstimateOD, 5, 0, 1, 2)
+
+        self.pbCancel = QPushButton(Dialog)
+        self.pbCancel.setObjectName(u"pbCancel")
+        self.pbCancel.setEnabled(False)
+
+        self.gridLayout.addWidget(self.pbCancel, 5, 2, 1, 1)
+
+        self.lblProgress = QLabel(Dialog)
+        self.lblProgress.setObjectName(u"lblProgress")
+
+        self.gridLayout.addWidget(self.lblProgress, 6, 0, 1, 3)
 
         self.buttonBox = QDialogButtonBox(Dialog)
         self.buttonBox.setObjectName(u"buttonBox")
         self.buttonBox.setOrientation(Qt.Horizontal)
         self.buttonBox.setStandardButtons(QDialogButtonBox.Close)
 
-        self.gridLayout.addWidget(self.buttonBox, 6, 0, 1, 3)
+        self.gridLayout.addWidget(self.buttonBox, 7, 0, 1, 3)
 
 
         self.retranslateUi(Dialog)
@@ -109,5 +120,6 @@ class Ui_Dialog(object):
         self.leWeightRouteRatio.setText(QCoreApplication.translate("Dialog", u"1", None))
         self.pbExportFolder.setText(QCoreApplication.translate("Dialog", u"Export Folder", None))
         self.pbEstimateOD.setText(QCoreApplication.translate("Dialog", u"Estimate and Export OD", None))
+        self.pbCancel.setText(QCoreApplication.translate("Dialog", u"Cancel", None))
     # retranslateUi
 
@@ -44,6 +44,12 @@ class Ui_DialogODME_LeastSq(object):
 
         self.horizontalLayout.addWidget(self.pbRunOdme)
 
+        self.pbCancel = QPushButton(DialogODME_LeastSq)
+        self.pbCancel.setObjectName(u"pbCancel")
+        self.pbCancel.setEnabled(False)
+
+        self.horizontalLayout.addWidget(self.pbCancel)
+
         self.pbClose = QPushButton(DialogODME_LeastSq)
         self.pbClose.setObjectName(u"pbClose")
 
@@ -76,6 +82,11 @@ class Ui_DialogODME_LeastSq(object):
 
         self.verticalLayout_2.addLayout(self.verticalLayout)
 
+        self.lblProgress = QLabel(DialogODME_LeastSq)
+        self.lblProgress.setObjectName(u"lblProgress")
+
+        self.verticalLayout_2.addWidget(self.lblProgress)
+
 #if QT_CONFIG(shortcut)
 #endif // QT_CONFIG(shortcut)
 
@@ -89,6 +100,7 @@ class Ui_DialogODME_LeastSq(object):
         self.label.setText(QCoreApplication.translate("DialogODME_LeastSq", u"Seed OD Matrix Weight", None))
         self.leSeedODWeight.setText(QCoreApplication.translate("DialogODME_LeastSq", u"0.5", None))
         self.pbRunOdme.setText(QCoreApplication.translate("DialogODME_LeastSq", u"Estimate OD", None))
+        self.pbCancel.setText(QCoreApplication.translate("DialogODME_LeastSq", u"Cancel", None))
         self.pbClose.setText(QCoreApplication.translate("DialogODME_LeastSq", u"Close", None))
         self.label_2.setText(QCoreApplication.translate("DialogODME_LeastSq", u"Diagnostics", None))
     # retranslateUi
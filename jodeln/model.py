@@ -2,13 +2,22 @@
 """
 
 import os
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+import copy
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import TYPE_CHECKING, Callable
 
-from network import net_read, net_write
+import numpy as np
 
-from od import od_read, od_write, odme_fratar, odme_cmaes, odme_leastsq
+from network import net_read, net_write, net_snapshot
+from network.netselect import SelectIndex
+from network.route_cache import RouteCache
+from network.table_write import EXPORT_FORMATS
+
+from od import od_read, od_write, odme_fratar, odme_cmaes, odme_leastsq, od_snapshot
 from od.od_matrix import ODMatrix, create_od_from_source
+from od.odme_progress import ODMEProgress
 
 if TYPE_CHECKING:
     from .network.netnode import NetNode
@@ -20,6 +29,45 @@ LinkKey = tuple[int, int]
 TurnKey = tuple[int, int, int]
 ZonePairKey = tuple[int, int]
 
+# Files written by Model.export_all()
+EXPORTS = ('od', 'od_by_route', 'turns', 'node_sequence', 'route_list')
+
+@dataclass(slots=True)
+class ZonePairFlow:
+    """Volume of one zone pair through a link or turn."""
+    origin: int
+    destination: int
+    o_name: str
+    d_name: str
+    ratio: float
+    volume: float
+
+
+@dataclass(slots=True)
+class ODMEResult:
+    """Estimated OD from an ODME run, not yet applied to the Model.
+
+    See Model.apply_od_estimate().
+
+    Attributes
+    ----------
+    od_estimated : ODMatrix
+        Estimated OD matrix.
+    diagnostics : object
+        Return value of the ODME method, e.g. FratarDiagnostics.
+    solution : odme_cmaes.ODMESolution
+        Route volumes to save to the network. None if the method only
+        estimates the OD matrix.
+    source : tuple[Network, ODMatrix, RouteIncidence]
+        Network, seed OD, and route incidence the result was estimated from.
+        The route incidence is None if the method does not use the routes.
+    """
+    od_estimated: ODMatrix
+    diagnostics: object = None
+    solution: odme_cmaes.ODMESolution = None
+    source: tuple = None
+
+
 @dataclass(slots=True)
 class RouteInfo:
     """Basic OD information for a route."""
@@ -36,7 +84,7 @@ class Model():
     
     These methods are the API for a view/controller to interact with the data.
     """
-    __slots__ = ['net', 'od_seed', 'od_estimated', 'od_diff']
+    __slots__ = ['net', 'od_seed', 'od_estimated', 'od_diff', '_select_index']
 
     def __init__(self):
         """Initialize Model with an empty network and empty OD Seed Matrix.
@@ -57,13 +105,19 @@ class Model():
         #: ODMatrix: Difference matrix = od_estimated - od_seed
         self.od_diff: ODMatrix = None
 
+        #: SelectIndex: Cached select-link / select-turn index, see select_index().
+        self._select_index: SelectIndex = None
+
     def load(self, 
              node_file=None, 
              links_file=None, 
              od_seed_file=None, 
              turns_file=None, 
              od_routes_file=None,
-             zone_targets_file=None) -> bool:
+             zone_targets_file=None,
+             route_cache_dir=None,
+             snap_tolerance=None,
+             od_sparse=None) -> bool:
         """Populate network and od variables with user supplied data.
 
         Parameters
@@ -80,6 +134,18 @@ class Model():
             File path to OD routes, by default None.
         zone_targets_file : str, optional
             File path to OD zone targets, by default None.
+        route_cache_dir : str, optional
+            Folder for the on-disk route cache, by default None which does not
+            cache routes. Reloading the same nodes and links then skips the
+            shortest route search.
+        snap_tolerance : float, optional
+            Largest distance between a shapefile link end point and its node,
+            by default None which adds every link. Links that are not added 
+            are listed in net.skipped_links.
+        od_sparse : bool, optional
+            Store the OD matrices as sparse matrices. By default None, which
+            uses sparse storage for seed matrices with at least 
+            od_read.SPARSE_OD_ZONES zones.
 
         Returns
         -------
@@ -101,7 +167,12 @@ class Model():
                 # their inputs are invalid.
                 return False
             
-            self.net = net_read.create_network(node_file, links_file)
+            route_cache = None
+            if route_cache_dir is not None:
+                route_cache = RouteCache(route_cache_dir.replace('"', ''))
+
+            self.net = net_read.create_network(node_file, links_file, route_cache=route_cache,
+                                               snap_tolerance=snap_tolerance)
         
         if self.net is None:
             # can't continue loading OD or turns without a Network
@@ -114,7 +185,7 @@ class Model():
             net_read.import_routes(od_routes_file, self.net)
 
         if od_seed_file is not None:
-            self.od_seed = od_read.od_from_csv(od_seed_file, self.net)
+            self.od_seed = od_read.od_from_csv(od_seed_file, self.net, sparse_output=od_sparse)
             self.init_od_seed_targets()
             
             self.od_estimated = create_od_from_source(self.od_seed, copy_targets=True)
@@ -129,12 +200,63 @@ class Model():
 
         return True
 
+    def save_snapshot(self, folder: str) -> None:
+        """Save the network and OD matrices as binary arrays for a fast reload.
+
+        The network is saved to folder/network, the seed and estimated OD
+        matrices to folder/od_seed and folder/od_estimated.
+
+        Parameters
+        ----------
+        folder : str
+            Folder to save the snapshot to. Created if it does not exist.
+        """
+        if self.net is None:
+            return
+
+        net_snapshot.save_network(self.net, os.path.join(folder, 'network'))
+
+        if self.od_seed is not None:
+            od_snapshot.save_od(self.od_seed, os.path.join(folder, 'od_seed'))
+            od_snapshot.save_od(self.od_estimated, os.path.join(folder, 'od_estimated'))
+
+    def load_snapshot(self, folder: str) -> bool:
+        """Populate network and od variables from a folder saved with save_snapshot.
+
+        Parameters
+        ----------
+        folder : str
+            Folder containing the snapshot.
+
+        Returns
+        -------
+        bool
+            True if load was successful, otherwise False.
+        """
+        self.reset()
+
+        folder = _clean_folder_path(folder)
+        if folder is None or not os.path.isdir(os.path.join(folder, 'network')):
+            return False
+
+        self.net = net_snapshot.load_network(os.path.join(folder, 'network'))
+
+        if os.path.isdir(os.path.join(folder, 'od_seed')):
+            # The seed matrix is only read, so it can stay memory-mapped.
+            self.od_seed = od_snapshot.load_od(os.path.join(folder, 'od_seed'))
+            self.od_estimated = od_snapshot.load_od(os.path.join(folder, 'od_estimated'), mmap=False)
+            self.od_diff = create_od_from_source(self.od_seed, copy_targets=True)
+            self.compute_od_diff()
+
+        return True
+
     def reset(self):
         """Reset network and OD to empty state."""
         self.net = None
         self.od_seed = None
         self.od_estimated = None
         self.od_diff = None
+        self._select_index = None
 
     def has_od(self) -> bool:
         return self.od_seed is not None
@@ -173,47 +295,84 @@ class Model():
         # ---------------------------------------------------------
         # Check turn targets at flagged origins and destinations.
         # ---------------------------------------------------------
+        turns = self.net.turn_store()
+        turn_target = np.where(turns.target_volume > 0, turns.target_volume, 0)
+
         # Origin Turn Targets
         for i in check_origin_turns:
             self.od_seed.targets_o[i] = 0
             for j in self.net.node(i).neighbors:
-                for k in self.net.node(j).neighbors:
-                    turn = self.net.turn(i, j, k)
-                    if turn.target_volume > 0:
-                        self.od_seed.targets_o[i] += turn.target_volume  
+                self.od_seed.targets_o[i] += float(turn_target[turns.turn_ids_from_link(i, j)].sum())
 
         # Destination Turn Targets
         for k in check_destination_turns:
             self.od_seed.targets_d[k] = 0
             for j in self.net.node(k).up_neighbors:
-                for i in self.net.node(j).up_neighbors:
-                    turn = self.net.turn(i, j, k)
-                    if turn.target_volume > 0:
-                        self.od_seed.targets_d[k] += turn.target_volume
+                self.od_seed.targets_d[k] += float(turn_target[turns.turn_ids_to_link(j, k)].sum())
 
 
     def compute_od_diff(self):
         """Calculate difference between Estimated and Seed OD matrices."""
-        for k in self.od_estimated.volume:
-            self.od_diff.volume[k] = self.od_estimated.volume[k] - self.od_seed.volume[k]
+        self.od_diff.set_array(self.od_estimated.array - self.od_seed.array)
+
+    def estimate_od_fratar(self, tol: float = 1e-6, max_iterations: int = 100):
+        result = self.solve_od_fratar(tol, max_iterations)
+        self.apply_od_estimate(result)
+
+        return result.diagnostics
+
+    def solve_od_fratar(self, tol: float = 1e-6, max_iterations: int = 100,
+                        progress: Callable[[ODMEProgress], None] = None, 
+                        cancel: Callable[[], bool] = None) -> ODMEResult | None:
+        """Run Fratar factoring without changing the Model. See estimate_od_fratar.
 
-    def estimate_od_fratar(self):
+        See odme_fratar.balance for progress and cancel. Returns None if cancelled.
+        """
         print(f"Running Fratar Factoring")
-        self.od_estimated = odme_fratar.estimate_od(self.od_seed)
-        self.compute_od_diff()
+        source = self._odme_source(uses_routes=False)
+        balanced = odme_fratar.balance(self.od_seed, tol, max_iterations, progress, cancel)
+        if balanced is None:
+            return
+
+        od_estimated, diagnostics = balanced
+        return ODMEResult(od_estimated, diagnostics, source=source)
 
     def estimate_od_leastsq(self, seed_od_weight: float):
-        diagnostics, self.od_estimated = odme_leastsq.estimate_od(
-                                            self.od_seed, 
-                                            self.net, 
-                                            self.select_link(only_target_links=True),
-                                            self.select_turn(only_target_turns=True),
-                                            seed_od_weight)
-        self.compute_od_diff()
+        result = self.solve_od_leastsq(seed_od_weight)
+        self.apply_od_estimate(result)
+
+        return result.diagnostics
 
-        return diagnostics
+    def solve_od_leastsq(self, seed_od_weight: float, 
+                         progress: Callable[[ODMEProgress], None] = None, 
+                         cancel: Callable[[], bool] = None) -> ODMEResult | None:
+        """Run least squares ODME without changing the Model. See estimate_od_leastsq.
 
-    def estimate_od_cmaes(self, weight_total_geh=None, weight_odsse=None, weight_route_ratio=None):
+        See odme_leastsq.estimate_od for progress and cancel. Returns None if cancelled.
+        """
+        source = self._odme_source(uses_routes=True)
+        index = self._select_index
+        if (index is None or not index.is_current(self.net) 
+                or not np.array_equal(index.current_ratios(), index.ratios)):
+            # Local index, the cached index is only replaced by select_index().
+            index = SelectIndex(self.net)
+
+        estimate = odme_leastsq.estimate_od(
+                                        self.od_seed, 
+                                        self.net, 
+                                        self.select_link(only_target_links=True, index=index),
+                                        self.select_turn(only_target_turns=True, index=index),
+                                        seed_od_weight,
+                                        progress=progress,
+                                        cancel=cancel)
+        if estimate is None:
+            return
+
+        diagnostics, od_estimated = estimate
+        return ODMEResult(od_estimated, diagnostics, source=source)
+
+    def estimate_od_cmaes(self, weight_total_geh=None, weight_odsse=None, weight_route_ratio=None,
+                          batch=False, workers=None):
         """Estimate an OD matrix that attempts to meet various network volume targets.
         
         By default the ODME objective function weights are None. Passing None 
@@ -229,6 +388,11 @@ class Model():
             seed matrix, even if that means sacrificing link and turn GEH.
         weight_route_ratio : float, optional
             Objective function weight of the OD route ratios.
+        batch : bool, optional
+            Evaluate each cma-es population at once, by default False.
+        workers : int, optional
+            Number of processes used to evaluate each cma-es population, 
+            by default None. See odme_cmaes.estimate_od.
             
         Returns
         -------
@@ -238,43 +402,203 @@ class Model():
         if self.od_seed is None or self.net is None:
             return
 
-        res = odme_cmaes.estimate_od(
+        result = self.solve_od_cmaes(weight_total_geh, weight_odsse, weight_route_ratio, 
+                                     batch, workers)
+        self.apply_od_estimate(result)
+        
+        return result.diagnostics
+
+    def solve_od_cmaes(self, weight_total_geh=None, weight_odsse=None, weight_route_ratio=None,
+                       batch=False, workers=None, 
+                       progress: Callable[[ODMEProgress], None] = None, 
+                       cancel: Callable[[], bool] = None) -> ODMEResult | None:
+        """Run cma-es ODME without changing the results in the Model.
+
+        The Model is only read, so this can run in a background thread after 
+        prepare_odme(). See estimate_od_cmaes and odme_cmaes.solve for the 
+        parameters.
+
+        Returns
+        -------
+        ODMEResult | None
+            Result to pass to apply_od_estimate(), diagnostics are the final 
+            values of the ODME objective function variables. None if cancelled, 
+            or if the Model has no seed OD or network.
+        """
+        if self.od_seed is None or self.net is None:
+            return
+
+        solution = odme_cmaes.solve(
                 self.net, 
                 self.od_seed, 
-                self.od_estimated, 
                 weight_total_geh, 
                 weight_odsse, 
-                weight_route_ratio)
-        
+                weight_route_ratio,
+                batch,
+                workers,
+                progress,
+                cancel)
+
+        if solution is None:
+            return
+
+        od_estimated = create_od_from_source(self.od_estimated, copy_volume=True, copy_targets=True)
+        return ODMEResult(od_estimated, solution.x, solution, 
+                          source=(self.net, self.od_seed, solution.incidence))
+
+    def prepare_odme(self) -> None:
+        """Build the cached network data read by the solve_od_* methods.
+
+        The solve_od_* methods only read the Model. Call this on the thread 
+        that owns the Model (e.g. the GUI thread) before running them in a 
+        background thread, so the caches are not built on both threads.
+        """
+        if self.net is None:
+            return
+
+        self.net.route_incidence()
+        self.select_index()
+
+    def _odme_source(self, uses_routes: bool) -> tuple:
+        """Model data an ODME result is estimated from, see ODMEResult.source."""
+        incidence = self.net.route_incidence() if uses_routes else None
+        return (self.net, self.od_seed, incidence)
+
+    def apply_od_estimate(self, result: ODMEResult) -> None:
+        """Replace the estimated OD, and the network route volumes, with an ODME result.
+
+        Raises
+        ------
+        ValueError
+            If the network, seed OD, or (for methods that use them) the network
+            routes changed since the result was estimated.
+        """
+        net, od_seed, incidence = result.source
+        if net is not self.net or od_seed is not self.od_seed:
+            raise ValueError("Network or seed OD changed since the OD was estimated.")
+        if incidence is not None and incidence is not self.net.route_incidence():
+            raise ValueError("Network routes changed since the OD was estimated.")
+
+        if result.solution is not None:
+            result.solution.apply(self.net, result.od_estimated)
+
+        self.od_estimated = result.od_estimated
         self.compute_od_diff()
-        
-        return res
 
-    def export_od(self, output_folder=None) -> None:
+    def export_od(self, output_folder=None, fmt='csv') -> None:
         """Write estimated OD to csv."""
         output_folder = _clean_folder_path(output_folder)
-        od_write.export_od_as_list(self.net, self.od_estimated, output_folder)
+        od_write.export_od_as_list(self.net, self.od_estimated, output_folder, fmt)
 
-    def export_turns(self, output_folder=None) -> None:
+    def export_turns(self, output_folder=None, fmt='csv') -> None:
         """Write turns to csv."""
         output_folder = _clean_folder_path(output_folder)
-        net_write.export_turns(self.net, output_folder)
+        net_write.export_turns(self.net, output_folder, fmt)
 
-    def export_od_by_route(self, output_folder=None) -> None:
+    def export_od_by_route(self, output_folder=None, fmt='csv') -> None:
         """Write estimated OD to csv, in list format, one row per OD pair."""
         output_folder = _clean_folder_path(output_folder)
-        od_write.export_od_by_route(self.net, output_folder)
+        od_write.export_od_by_route(self.net, output_folder, fmt)
 
-    def export_node_sequence(self, output_folder=None) -> None:
+    def export_node_sequence(self, output_folder=None, fmt='csv') -> None:
         """Write the links and turns on every OD route to csv."""
         output_folder = _clean_folder_path(output_folder)
-        net_write.export_node_sequences(self.net, output_folder)
+        net_write.export_node_sequences(self.net, output_folder, fmt)
 
     def export_route_list(self, output_folder=None) -> None:
         """Export the nodes along each route. One row per route."""
         output_folder = _clean_folder_path(output_folder)
         net_write.export_route_list(self.net, output_folder)
 
+    def export_all(self, output_folder=None, formats='csv', workers=None, 
+                   compression=None, wait=True) -> list[Future]:
+        """Write every export file at once, each file in its own thread.
+
+        The route and OD results are copied before the files are written, so 
+        the files match the model at the time of the call even if the model 
+        changes (e.g. another OD estimation) while they are written.
+
+        Parameters
+        ----------
+        output_folder : str, optional
+            Folder to export the files, by default None indicates the current 
+            working directory.
+        formats : str | dict[str, str], optional
+            Output format of every file, by default 'csv'. See 
+            table_write.EXPORT_FORMATS. Or a dict of {export: format} to write 
+            only some of the EXPORTS. route_list is always csv.
+        workers : int, optional
+            Number of threads, by default None which uses one thread per export.
+        compression : str, optional
+            None (default), 'gzip', or 'zstd'.
+        wait : bool, optional
+            Wait until every file is written, by default True. Use False to 
+            return immediately, e.g. to keep the GUI responsive.
+
+        Returns
+        -------
+        list[Future]
+            One future per export. Future.result() raises any error from 
+            writing the export.
+        """
+        if self.net is None:
+            return []
+
+        if isinstance(formats, str):
+            formats = dict.fromkeys(EXPORTS, formats)
+
+        for export, fmt in formats.items():
+            if export not in EXPORTS:
+                raise ValueError(f"Unknown export: {export}. Expected one of {EXPORTS}.")
+            if fmt not in EXPORT_FORMATS:
+                raise ValueError(f"Unknown export format: {fmt}. Expected one of {EXPORT_FORMATS}.")
+
+        output_folder = _clean_folder_path(output_folder)
+        net, od_estimated = self._results_snapshot()
+
+        tasks = {
+            'od': partial(od_write.export_od_as_list, net, od_estimated, output_folder),
+            'od_by_route': partial(od_write.export_od_by_route, net, output_folder),
+            'turns': partial(net_write.export_turns, net, output_folder),
+            'node_sequence': partial(net_write.export_node_sequences, net, output_folder),
+        }
+
+        executor = ThreadPoolExecutor(max_workers=workers or max(len(formats), 1), 
+                                      thread_name_prefix='export')
+        futures = []
+        for export, fmt in formats.items():
+            if export == 'route_list':
+                task = partial(net_write.export_route_list, net, output_folder)
+            else:
+                task = partial(tasks[export], fmt=fmt)
+            futures.append(executor.submit(task, compression=compression))
+
+        # Threads finish the submitted files without blocking the caller.
+        executor.shutdown(wait=False)
+
+        if wait:
+            for future in futures:
+                future.result()
+
+        return futures
+
+    def _results_snapshot(self) -> tuple['Network', ODMatrix]:
+        """Copy of the network routes and the estimated OD, for exporting.
+
+        Routes are copied since estimation updates their volumes in place. 
+        Nodes, links, and turns are shared with the model network.
+        """
+        net = copy.copy(self.net)
+        if net.od_pairs is not None:
+            net.od_pairs = [replace(od, routes=[copy.copy(route) for route in od.routes]) 
+                            for od in net.od_pairs]
+
+        od_estimated = None
+        if self.od_estimated is not None:
+            od_estimated = create_od_from_source(self.od_estimated, copy_volume=True, copy_targets=True)
+
+        return net, od_estimated
+
     def get_node_name(self, node: int) -> str:
         """Return the name of the node."""
         return self.net.node(node).name
@@ -313,80 +637,102 @@ class Model():
 
         return routes
 
-    def select_link(self, only_target_links=False) -> dict[LinkKey, dict[ZonePairKey, float]]:
-        """Return zone pairs that flow through each network link."""
+    def select_index(self, check_ratios: bool = True) -> SelectIndex:
+        """Return the select-link / select-turn index of the network routes.
 
-        select_link: dict[LinkKey, dict[ZonePairKey, float]] = \
-            self._init_select_element("link", only_target_links)
-        
-        for od in self.net.od_pairs:
-            zone_pair_key = (od.origin, od.destination)
-            for route in od.routes:
-                route_ratio = route.target_ratio
-                n_route_nodes = len(route.nodes)
+        The index is built once and reused until the routes change (e.g. 
+        import_routes). If only route target ratios changed, the index values 
+        are updated without rebuilding it.
 
-                if n_route_nodes <= 1:
-                    # route is O == D
-                    continue
+        Parameters
+        ----------
+        check_ratios : bool, optional
+            Check every route for target ratio changes, by default True. 
+            Single element queries that read the ratios from the routes 
+            themselves skip the check.
+        """
+        index = self._select_index
 
-                # route has 2 or more nodes
-                for x in range(0, n_route_nodes - 1):
-                    i = route.nodes[x]
-                    j = route.nodes[x + 1]
-                    if (i, j) not in select_link: continue
-                    select_link[(i, j)].setdefault(zone_pair_key, 0)
-                    select_link[(i, j)][zone_pair_key] += route_ratio
+        if index is None or not index.is_current(self.net):
+            index = SelectIndex(self.net)
+            self._select_index = index
+        elif check_ratios:
+            ratios = index.current_ratios()
+            if not np.array_equal(ratios, index.ratios):
+                index.update_ratios(ratios)
 
-        return select_link  
+        return index
 
+    def select_link(self, only_target_links=False, 
+                    index: SelectIndex = None) -> dict[LinkKey, dict[ZonePairKey, float]]:
+        """Return zone pairs that flow through each network link.
 
-    def select_turn(self, only_target_turns=False) -> dict[TurnKey, dict[ZonePairKey, float]]:
-        """Return zone pairs that flow through each network turn."""
+        index is the SelectIndex to read, by default None uses select_index().
+        """
+        if index is None:
+            index = self.select_index()
 
-        select_turn: dict[TurnKey, dict[ZonePairKey, float]] = \
-            self._init_select_element("turn", only_target_turns)
+        rows = None
+        if only_target_links:
+            rows = [e for e, key in enumerate(index.incidence.link_keys) 
+                    if self.net.link(*key).target_volume != -1]
 
-        for od in self.net.od_pairs:
-            zone_pair_key = (od.origin, od.destination)
-            for route in od.routes:
-                route_ratio = route.target_ratio
-                n_route_nodes = len(route.nodes)
-
-                if n_route_nodes <= 2:
-                    # Need at least 3 nodes in a sequence to have turns
-                    continue
-
-                # route has 3 or more nodes
-                for x in range(0, n_route_nodes - 2):
-                    i = route.nodes[x]
-                    j = route.nodes[x + 1]
-                    k = route.nodes[x + 2]
-                    if (i, j, k) not in select_turn: continue
-                    select_turn[(i, j, k)].setdefault(zone_pair_key, 0)
-                    select_turn[(i, j, k)][zone_pair_key] += route_ratio
-
-        return select_turn 
-
-    def _init_select_element(self, element: str = "link", only_elements_with_targets=False) -> dict:
-        select_element = {}
-        
-        if element == "link":
-            elements = self.net.links(True)
-        elif element == "turn":
-            elements = self.net.turns(True)
-        else:
-            raise Exception(f"Unknown element {element}. Expected 'link' or 'turn'.")
-
-        if only_elements_with_targets:
-            for key, element in elements:
-                if element.target_volume == -1:
-                    continue
-                select_element[key] = {}
-        else:
-            for key, _ in elements:
-                select_element[key] = {}
-
-        return select_element
+        return index.link_dict(rows)
+
+    def select_turn(self, only_target_turns=False, 
+                    index: SelectIndex = None) -> dict[TurnKey, dict[ZonePairKey, float]]:
+        """Return zone pairs that flow through each network turn.
+
+        index is the SelectIndex to read, by default None uses select_index().
+        """
+        if index is None:
+            index = self.select_index()
+
+        rows = None
+        if only_target_turns:
+            # Incidence turn rows are turn ids.
+            rows = np.flatnonzero(self.net.turn_store().target_volume != -1).tolist()
+
+        return index.turn_dict(rows)
+
+    def zone_pairs_through(self, key: LinkKey | TurnKey) -> list[ZonePairFlow]:
+        """Return the zone pairs that use one link or turn, with their route
+        ratio and assigned volume through it.
+
+        Only the routes through the link or turn are read, so this is fast 
+        enough to call when the user selects a link in the GUI.
+
+        Parameters
+        ----------
+        key : LinkKey | TurnKey
+            Link key (i, j) or turn key (i, j, k).
+
+        Returns
+        -------
+        list[ZonePairFlow]
+            Zone pairs in OD order. Empty if no route uses the link or turn.
+        """
+        index = self.select_index(check_ratios=False)
+
+        flows = []
+        for (o, d), ratio, volume in index.zone_pairs_through(tuple(key)):
+            flows.append(ZonePairFlow(
+                origin=o,
+                destination=d,
+                o_name=self.net.node(o).name,
+                d_name=self.net.node(d).name,
+                ratio=ratio,
+                volume=volume))
+
+        return flows
+
+    def select_link_at(self, i: int, j: int) -> dict[ZonePairKey, float]:
+        """Return the zone pairs, and their route ratio, through one link."""
+        return self.select_index().link(i, j)
+
+    def select_turn_at(self, i: int, j: int, k: int) -> dict[ZonePairKey, float]:
+        """Return the zone pairs, and their route ratio, through one turn."""
+        return self.select_index().turn(i, j, k)
 
 
 def _clean_file_path(file_path: str) -> str:
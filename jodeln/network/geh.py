@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 def geh(m, c):
     """Calculates the GEH between two hourly traffic volumes.
 
@@ -30,3 +32,39 @@ def geh(m, c):
     geh = math.sqrt(quotient)
     
     return geh
+
+
+def geh_array(m, c, mask=None) -> tuple[np.ndarray, float]:
+    """Calculates the GEH of many pairs of traffic volumes at once.
+
+    Element-wise equivalent of geh(). Pairs with a zero or negative average
+    volume have a GEH of 0.
+
+    Parameters
+    ----------
+    m : array_like
+        Modeled traffic volumes.
+    c : array_like
+        Counted traffic volumes, same shape as m.
+    mask : array_like, optional
+        Boolean array, same shape as m. Only pairs where mask is True are
+        included, all others have a GEH of 0. By default None includes all pairs.
+
+    Returns
+    -------
+    tuple[np.ndarray, float]
+        GEH statistic of each pair, and the sum of all the GEH values.
+    """
+    m = np.asarray(m, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+
+    denominator = (m + c) / 2.0
+    valid = denominator > 0
+    if mask is not None:
+        valid &= mask
+
+    diff = m - c
+    quotient = np.divide(diff * diff, denominator, out=np.zeros_like(denominator), where=valid)
+    result = np.sqrt(quotient)
+
+    return result, float(result.sum())
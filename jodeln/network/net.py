@@ -1,21 +1,43 @@
 """Contains the Network class and related classes.
 """
 
+import heapq
+import os
 import sys
 from collections import Counter
-from typing import TYPE_CHECKING, Generator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Generator, Iterable
 
-from .geh import geh
+import numpy as np
+
+from .geh import geh_array
+from .netcsr import NetCSR
+from .netincidence import RouteIncidence
 from .netlink import NetLinkData
 from .netnode import NetNode
 from .netod import NetODpair
 from .netroute import NetRoute
-from .netturns import TurnData
+from .netturns import TurnData, TurnStore
 
 if TYPE_CHECKING:
+    from .net_read import LinkSnap
     from .netnode import NetNodeData
+    from .route_cache import RouteCache
     from ..od.od_matrix import ODMatrix
-    
+
+
+class NodeNotFoundError(KeyError):
+    """Raised when a node name is not found in the Network.
+
+    Attributes
+    ----------
+    node_name : str
+        Name that was looked up.
+    """
+    def __init__(self, node_name: str):
+        super().__init__(f'node name {node_name} not found')
+        self.node_name = node_name
+
 
 class Network():
     """Contains the network nodes and links, turns, and assigned origin-destination 
@@ -29,8 +51,8 @@ class Network():
     ----------
     _graph : Dict[int, NetNode]
         nodes within the Network graph.
-    turns : Dict[int, TurnData]
-        Turns within the Network graph.
+    _turns : TurnStore
+        Turns within the Network graph, keyed by (i, j, k).
     od_pairs : List[NetODpair]
         OD data for the network.
     total_geh : float
@@ -39,15 +61,49 @@ class Network():
     coord_scale : float
         Scalar to convert node x,y position to real-world coordinates. Required
         to ensure the network is displayed legibly in the GUI.
+    skipped_links : List[LinkSnap]
+        Shapefile links that were not added because an end point was further
+        than the snap tolerance from a node. See net_read.create_network.
+    _csr : NetCSR
+        Cached CSR view of the graph. None until requested by csr(), and reset
+        whenever nodes or links are added.
+    _node_names : Dict[str, int]
+        Node key of each node name. If names are duplicated, the first node 
+        added with that name is kept.
+    _incidence : RouteIncidence
+        Cached route incidence matrices. None until requested by route_incidence(),
+        and reset whenever the graph or the routes change.
+    _shape_xy : np.ndarray
+        Shape points of all links, shape (n_points, 2). None until requested by
+        shape_points(), and reset whenever links are added.
+    _shape_offsets : np.ndarray
+        Shape points of link e (in Network.links() order) are 
+        _shape_xy[_shape_offsets[e]:_shape_offsets[e + 1]].
+    _unscaled_node_xy : np.ndarray
+        Node coordinates before the coord_scale was applied. None until
+        apply_coord_scale() is called, and reset whenever nodes or links are added.
+    _unscaled_shape_xy : np.ndarray
+        Link shape points before the coord_scale was applied, same layout as 
+        _shape_xy.
     """
-    __slots__ = ['_graph', '_turns', 'n_links', 'od_pairs', 'total_geh', 'coord_scale']
+    __slots__ = ['_graph', '_turns', 'n_links', 'od_pairs', 'total_geh', 'coord_scale', 
+                 'skipped_links', '_csr', '_node_names', '_incidence', '_shape_xy', '_shape_offsets',
+                 '_unscaled_node_xy', '_unscaled_shape_xy']
 
     def __init__(self):
         self._graph: dict[int, NetNode] = {}
-        self._turns: dict[tuple[int, int, int], TurnData] = {}
+        self._turns: TurnStore = TurnStore()
         self.od_pairs: list[NetODpair] = []
         self.total_geh: float = 0
         self.coord_scale: float = 1
+        self.skipped_links: list[LinkSnap] = []
+        self._csr: NetCSR = None
+        self._node_names: dict[str, int] = {}
+        self._incidence: RouteIncidence = None
+        self._shape_xy: np.ndarray = None
+        self._shape_offsets: np.ndarray = None
+        self._unscaled_node_xy: np.ndarray = None
+        self._unscaled_shape_xy: np.ndarray = None
 
     def add_node(self, node_data: 'NetNodeData') -> None:
         """Add a node to the network graph.
@@ -60,6 +116,11 @@ class Network():
         # FIXME: length not guaranteed to return a unique key number.
         key = len(self._graph)
         self._graph[key] = NetNode(key, node_data)
+        self._node_names.setdefault(node_data.name, key)
+        self._csr = None
+        self._incidence = None
+        self._unscaled_node_xy = None
+        self._unscaled_shape_xy = None
 
     def add_link(self, i_name, j_name, link_data: 'NetLinkData') -> None:
         """Connects two nodes to form an link in the network graph.
@@ -76,11 +137,163 @@ class Network():
         i_key, _ = self.get_node_by_name(i_name) 
         j_key, _ = self.get_node_by_name(j_name) 
         
+        self.add_link_by_key(i_key, j_key, link_data)
+
+    def add_link_by_key(self, i_key: int, j_key: int, link_data: 'NetLinkData') -> None:
+        """Connects two nodes, given by node key, to form an link in the network graph.
+
+        Parameters
+        ----------
+        i_key : int
+            Origin node key
+        j_key : int
+            Destination node key
+        link_data : NetLinkData
+            Data belonging to the link. Name, cost, etc.
+        """
         link_data.key = (i_key, j_key)
 
         self._graph[i_key].add_neighbor(j_key, link_data)
 
         self._graph[j_key].up_neighbors.append(i_key)
+        self._csr = None
+        self._incidence = None
+        self._shape_xy = None
+        self._unscaled_node_xy = None
+        self._unscaled_shape_xy = None
+
+    def add_nodes(self, nodes: Iterable['NetNodeData']) -> list[int]:
+        """Add many nodes to the network graph.
+
+        Same as calling add_node for each node, but the cached views are only 
+        reset once.
+
+        Parameters
+        ----------
+        nodes : Iterable[NetNodeData]
+            Data about each node.
+
+        Returns
+        -------
+        list[int]
+            Key of each new node.
+        """
+        graph = self._graph
+        node_names = self._node_names
+        keys = []
+
+        # FIXME: length not guaranteed to return a unique key number.
+        key = len(graph)
+        for node_data in nodes:
+            graph[key] = NetNode(key, node_data)
+            node_names.setdefault(node_data.name, key)
+            keys.append(key)
+            key += 1
+
+        self._csr = None
+        self._incidence = None
+        self._unscaled_node_xy = None
+        self._unscaled_shape_xy = None
+
+        return keys
+
+    def add_links(self, links: Iterable[tuple[int, int, 'NetLinkData']]) -> None:
+        """Add many links, given by node keys, to the network graph.
+
+        Same as calling add_link_by_key for each link, but the cached views are
+        only reset once.
+
+        Parameters
+        ----------
+        links : Iterable[tuple[int, int, NetLinkData]]
+            Upstream node key, downstream node key, and link data of each link.
+        """
+        graph = self._graph
+
+        for i_key, j_key, link_data in links:
+            link_data.key = (i_key, j_key)
+            graph[i_key].add_neighbor(j_key, link_data)
+            graph[j_key].up_neighbors.append(i_key)
+
+        self._csr = None
+        self._incidence = None
+        self._shape_xy = None
+        self._unscaled_node_xy = None
+        self._unscaled_shape_xy = None
+
+    def csr(self) -> NetCSR:
+        """Return a compressed sparse row (CSR) view of the network graph.
+
+        The view is built on first use and reused until nodes or links are added.
+        See NetCSR for how to keep the view and the NetLinkData volumes in sync.
+        """
+        if self._csr is None:
+            self._csr = NetCSR(self)
+        return self._csr
+
+    def shape_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the shape points of all links as one array.
+
+        On first use the shape points of every link are copied into one float64
+        array of shape (n_points, 2), and each NetLinkData.shape_points is 
+        replaced by a view of its rows. Editing the array edits the links.
+        The array is rebuilt after links are added.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Shape points, and the offsets of each link in Network.links() order.
+            Link e has points xy[offsets[e]:offsets[e + 1]].
+        """
+        if self._shape_xy is None:
+            links = list(self.links())
+
+            offsets = np.zeros(len(links) + 1, dtype=np.int64)
+            np.cumsum([len(link.shape_points) for link in links], out=offsets[1:])
+
+            xy = np.empty((offsets[-1], 2), dtype=np.float64)
+            for link, start, end in zip(links, offsets[:-1].tolist(), offsets[1:].tolist()):
+                if end > start:
+                    xy[start:end] = link.shape_points
+
+            self.set_shape_points(xy, offsets)
+
+        return self._shape_xy, self._shape_offsets
+
+    def set_shape_points(self, xy: np.ndarray, offsets: np.ndarray) -> None:
+        """Use an array as the shape points of all links, see shape_points().
+
+        Parameters
+        ----------
+        xy : np.ndarray
+            Shape points of all links, shape (n_points, 2).
+        offsets : np.ndarray
+            Offsets of each link in Network.links() order, length n_links + 1.
+        """
+        for link, start, end in zip(self.links(), offsets[:-1].tolist(), offsets[1:].tolist()):
+            link.shape_points = xy[start:end]
+
+        self._shape_xy = xy
+        self._shape_offsets = offsets
+
+    def route_incidence(self) -> RouteIncidence:
+        """Return the sparse link-route and turn-route incidence matrices.
+
+        The matrices are built on first use and reused until the routes change.
+        Code that edits od_pairs or route node sequences directly must call
+        reset_route_incidence() afterwards.
+        """
+        if self._incidence is None:
+            self._incidence = RouteIncidence(self)
+        return self._incidence
+
+    def reset_route_incidence(self) -> None:
+        """Discard the cached route incidence matrices after routes have changed."""
+        self._incidence = None
+
+    def set_route_incidence(self, incidence: RouteIncidence) -> None:
+        """Use incidence matrices built earlier for the current routes, see route_incidence()."""
+        self._incidence = incidence
 
     def node(self, key: int) -> NetNode:
         """Convenience function to access node properties."""
@@ -120,42 +333,68 @@ class Network():
         Generator[TurnData, None, None] | \
         Generator[tuple[tuple[int, int, int], TurnData], None, None]:
         """Generator function to itertate through all the turns."""
-        for key, turn in self._turns.items():
-            if return_keys:
-                yield key, turn
-            else:
-                yield turn
+        if return_keys:
+            yield from self._turns.items()
+        else:
+            yield from self._turns.values()
+
+    def turn_store(self) -> TurnStore:
+        """Return the array-based store of all the turns, see TurnStore."""
+        return self._turns
+
+    def set_turn_store(self, turns: TurnStore) -> None:
+        """Use a TurnStore built earlier from the current network links, see init_turns()."""
+        self._turns = turns
+        self._incidence = None
 
 
     def init_turns(self) -> None:
-        """Initialize all turns within the network."""
-
-        for i, node1 in self._graph.items():
-            for j, _ in node1.neighbors.items():
-                for k, _ in self._graph[j].neighbors.items():
-                    self._turns[(i, j, k)] = TurnData(key=(i, j, k),
-                                                     name=f'{i}_{j}_{k}',
-                                                     seed_volume=0,
-                                                     target_volume=-1,
-                                                     assigned_volume=0,
-                                                     geh=0)
-
-    def init_routes(self) -> None:
+        """Initialize all turns within the network.
+        
+        Every turn i-j-k joins an incoming link i-j to an outgoing link j-k.
+        Turns start with no target volume (-1).
+        """
+        self._turns = TurnStore(self.csr())
+        self._incidence = None
+
+    def init_routes(self, workers: int = None, cache: 'RouteCache' = None) -> None:
         """Initialize routes by determining shortest route from all origins
-        to all destinations."""
+        to all destinations.
 
-        for i, o_node in self._graph.items():
-            if not o_node.is_origin:
-                continue
+        Parameters
+        ----------
+        workers : int, optional
+            Number of processes used to search the origins in parallel. By default
+            None, which searches all origins in this process. Use 0 for one 
+            process per cpu.
+        cache : RouteCache, optional
+            On-disk route cache. If the same nodes, links, and link costs have
+            been searched before, the routes are read from the cache and the
+            search is skipped. By default None, which always searches.
+        """
+
+        csr = self.csr()
+        node_keys = csr.node_keys.tolist()
+
+        origins = [i for i, o_node in self._graph.items() if o_node.is_origin]
+        destinations = [j for j, d_node in self._graph.items() if d_node.is_destination]
+        o_indices = [csr.node_index[i] for i in origins]
+        d_indices = [csr.node_index[j] for j in destinations]
 
-            result = _dijkstra(self, i)
+        route_trees = None
+        if cache is not None:
+            cache_key = cache.key(csr, o_indices, d_indices)
+            route_trees = cache.get(cache_key)
 
+        if route_trees is None:
+            route_trees = _search_routes(csr.adjacency(), o_indices, d_indices, workers)
+            if cache is not None:
+                cache.put(cache_key, route_trees)
+
+        for i, index_seqs in zip(origins, route_trees):
             # for each destination, get route from O to D
-            for j, d_node in self._graph.items():
-                if not d_node.is_destination:
-                    continue
-                
-                node_seq = _node_seq_from_dijkstra(result, i, j)
+            for j, index_seq in zip(destinations, index_seqs):
+                node_seq = [node_keys[u] for u in index_seq]
                 
                 if len(node_seq) == 0:
                     continue
@@ -166,39 +405,189 @@ class Network():
                             routes=[NetRoute(nodes=node_seq, name="")])
                 self.od_pairs.append(od_pair)
         
+        self._incidence = None
+
         # Update route names
         self.set_route_names()
 
-    def get_node_by_name(self, node_name):
-        """Helper function to return a node by name."""
-        for k, node in self._graph.items():
-            if node.name == node_name:
-                return k, node
-        else:
-            # TODO: handle error if didn't find the node
-            print(f'node name {node_name} not found')
-            pass
+    def set_link_costs(self, costs: dict[tuple[int, int], float], 
+                       workers: int = None) -> list[int]:
+        """Change link costs and update the shortest routes that are affected.
+
+        Only origins whose shortest routes can change are searched again:
+
+        - a link cost increased and one of the origin's routes uses the link, or
+        - a link cost decreased and, with the new cost, the link gives a shorter
+          route from the origin to the downstream node of the link.
+
+        User-defined routes (see net_read.import_routes) are kept as they are. 
+        If a new route has the same cost as the existing route, the existing 
+        route is kept.
+
+        Parameters
+        ----------
+        costs : dict[tuple[int, int], float]
+            New cost of each link key (i, j).
+        workers : int, optional
+            Number of processes used to search the affected origins, 
+            see init_routes.
+
+        Returns
+        -------
+        list[int]
+            Node keys of the origins that were searched again.
+        """
+        csr = self.csr()
+
+        increased = []
+        decreased = []
+        old_cost = csr.cost.copy()
+        for (i, j), new_cost in costs.items():
+            e = csr.link_index[(i, j)]
+            if new_cost > old_cost[e]:
+                increased.append(e)
+            elif new_cost < old_cost[e]:
+                decreased.append(e)
+
+        if not increased and not decreased:
+            return []
+
+        origins = [i for i, o_node in self._graph.items() if o_node.is_origin]
+        o_indices = [csr.node_index[i] for i in origins]
+
+        affected = set()
 
-    def calc_network_geh(self) -> None:
-        """Sum up the total geh of all the links & turns in the network."""
+        # Increased costs: origins with a (searched) route on the link.
+        if increased:
+            increased_keys = {csr.link_keys[e] for e in increased}
+            for od in self.od_pairs:
+                if od.origin in affected:
+                    continue
+                for route in od.routes:
+                    if route.user_defined:
+                        continue
+                    nodes = route.nodes
+                    if any((nodes[x], nodes[x + 1]) in increased_keys 
+                           for x in range(len(nodes) - 1)):
+                        affected.add(od.origin)
+                        break
+
+        # Decreased costs: compare against distances with only the increases applied.
+        if decreased:
+            partial_cost = old_cost.copy()
+            for e in increased:
+                partial_cost[e] = costs[csr.link_keys[e]]
+
+            reverse = csr.reverse_adjacency(partial_cost)
+            for e in decreased:
+                i, j = csr.link_keys[e]
+                dist_i, _ = _dijkstra_csr(reverse, csr.node_index[i])
+                dist_j, _ = _dijkstra_csr(reverse, csr.node_index[j])
+                new_cost = costs[(i, j)]
+                for o, u in zip(origins, o_indices):
+                    if dist_i[u] + new_cost < dist_j[u]:
+                        affected.add(o)
+
+        # Apply the new costs.
+        for (i, j), new_cost in costs.items():
+            self._graph[i].neighbors[j].cost = new_cost
+            csr.cost[csr.link_index[(i, j)]] = new_cost
+
+        affected = [o for o in origins if o in affected]
+        if not affected:
+            return affected
+
+        destinations = [j for j, d_node in self._graph.items() if d_node.is_destination]
+        d_indices = [csr.node_index[j] for j in destinations]
+        route_trees = _search_routes(csr.adjacency(), 
+                                     [csr.node_index[o] for o in affected], 
+                                     d_indices, 
+                                     workers)
         
-        self.total_geh = 0
+        node_keys = csr.node_keys.tolist()
+        new_routes = {}
+        for i, index_seqs in zip(affected, route_trees):
+            for j, index_seq in zip(destinations, index_seqs):
+                new_routes[(i, j)] = [node_keys[u] for u in index_seq]
+
+        for od in self.od_pairs:
+            node_seq = new_routes.get((od.origin, od.destination))
+            if not node_seq:
+                continue
+
+            if any(route.user_defined for route in od.routes):
+                continue
+
+            if not od.routes:
+                od.routes.append(NetRoute(nodes=node_seq, name=""))
+                continue
+
+            # Keep the existing route if it is still a shortest route.
+            existing_cost = _route_cost(csr, od.routes[0].nodes)
+            new_cost = _route_cost(csr, node_seq)
+            if existing_cost <= new_cost or np.isclose(existing_cost, new_cost):
+                continue
+
+            od.routes[0].nodes = node_seq
+
+        self._incidence = None
+        self.set_route_names()
+
+        return affected
+
+    def get_node_by_name(self, node_name) -> tuple[int, NetNode]:
+        """Helper function to return a node key and node by name.
+
+        Raises
+        ------
+        NodeNotFoundError
+            If no node in the network has the name.
+        """
+        try:
+            k = self._node_names[node_name]
+        except KeyError:
+            raise NodeNotFoundError(node_name) from None
         
-        # calc link geh
-        for link in self.links(): 
-            # TODO: handle case when link has no raw volume
-            link_geh = geh(link.target_volume, link.assigned_volume)
-            link.geh = link_geh
-            self.total_geh += link_geh
+        return k, self._graph[k]
+
+    def calc_network_geh(self, link_volume: np.ndarray = None, 
+                         turn_volume: np.ndarray = None) -> None:
+        """Sum up the total geh of all the links & turns in the network.
         
-        # calc turn geh
-        for t in self.turns():
-            # TODO: better handling when turn has no target volume
-            if t.target_volume <= 0:
-                continue
-            turn_geh = geh(t.target_volume, t.assigned_volume)
-            t.geh = turn_geh
-            self.total_geh += turn_geh
+        Every link is included. Turns are only included if they have a target 
+        volume greater than zero.
+
+        Parameters
+        ----------
+        link_volume : np.ndarray, optional
+            Assigned link volumes as returned by set_link_and_turn_volume_from_route.
+            By default None, which uses the assigned_volume of each link.
+        turn_volume : np.ndarray, optional
+            Assigned turn volumes as returned by set_link_and_turn_volume_from_route.
+            By default None, which uses the assigned_volume of each turn.
+        """
+        links = list(self.links())
+        turns = self._turns
+
+        if link_volume is None:
+            link_volume = [link.assigned_volume for link in links]
+        
+        if turn_volume is None:
+            turn_volume = turns.assigned_volume
+
+        # TODO: handle case when link has no raw volume
+        link_geh, link_total = geh_array([link.target_volume for link in links], link_volume)
+
+        # TODO: better handling when turn has no target volume
+        has_target = turns.target_volume > 0
+        turn_geh, turn_total = geh_array(turns.target_volume, turn_volume, has_target)
+
+        for link, v in zip(links, link_geh.tolist()):
+            link.geh = v
+
+        turns.geh[has_target] = turn_geh[has_target]
+
+        self.total_geh = link_total + turn_total
 
     def init_seed_volumes(self, od_mat: 'ODMatrix') -> None:
         """Assign route, link, and turn seed volumes based on an od matrix.
@@ -219,45 +608,44 @@ class Network():
         for link in self.links():
             link.seed_volume = link.assigned_volume
         
-        for t in self.turns():
-            t.seed_volume = t.assigned_volume
+        self._turns.seed_volume[:] = self._turns.assigned_volume
     
-    def set_link_and_turn_volume_from_route(self) -> None:
-        """Calculate the volume on all links and turns based on the OD route volumes."""
-        # reset link & turn volumes to zero
-        for link in self.links():
-            link.assigned_volume = 0
-        
-        for t in self.turns():
-            t.assigned_volume = 0
-        
-        # assign link & turn volumes
-        for od in self.od_pairs:
-            for route in od.routes:
-                n_route_nodes = len(route.nodes)
-                
-                if n_route_nodes <= 1:
-                    # route is O == D
-                    continue
+    def set_link_and_turn_volume_from_route(self, route_volume: np.ndarray = None, 
+                                            write_back: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate the volume on all links and turns based on the OD route volumes.
 
-                if n_route_nodes == 2:
-                    # route is one link
-                    i = route.nodes[0]
-                    j = route.nodes[1]
-                    self.link(i, j).assigned_volume += route.assigned_volume
-                    continue
+        Volumes are one sparse matrix-vector product with the route incidence 
+        matrices, see route_incidence().
 
-                # route has 3 or more nodes
-                for x in range(0, len(route.nodes) - 2):
-                    i = route.nodes[x]
-                    j = route.nodes[x + 1]
-                    k = route.nodes[x + 2]
-                    self.link(i, j).assigned_volume += route.assigned_volume
-                    self.turn(i, j, k).assigned_volume += route.assigned_volume
-
-                j = route.nodes[x + 1]
-                k = route.nodes[x + 2]
-                self.link(j, k).assigned_volume += route.assigned_volume
+        Parameters
+        ----------
+        route_volume : np.ndarray, optional
+            Volume of each route, in RouteIncidence.routes order. By default None,
+            which uses the assigned_volume of each route.
+        write_back : bool, optional
+            If True (default), save the volumes to the assigned_volume of each 
+            link and turn object.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Assigned link volumes (NetCSR link id order) and turn volumes 
+            (TurnStore turn id order, same as Network.turns()).
+        """
+        incidence = self.route_incidence()
+
+        if route_volume is None:
+            route_volume = incidence.route_volumes()
+
+        link_volume, turn_volume = incidence.assign(route_volume)
+
+        if write_back:
+            for (i, j), v in zip(incidence.link_keys, link_volume.tolist()):
+                self._graph[i].neighbors[j].assigned_volume = v
+            
+            self._turns.assigned_volume[:] = turn_volume
+
+        return link_volume, turn_volume
    
     def set_route_names(self) -> None:
         """Assign unique route names within each OD.
@@ -293,48 +681,108 @@ class Network():
                         unique_links.remove((a, b))
                         break
 
-    def set_coord_scale(self):
+    def set_coord_scale(self, legible_diff: float = 1000) -> None:
         """Scales the node x,y coordinates to to ensure the network is displayed
         legibly in the GUI. Scale value is saved in self.coord_scale
+
+        The scale is chosen so the shorter side of the network extents (nodes
+        and link shape points) is legible_diff long. If every point has the 
+        same x and y the scale is 1. The unscaled coordinates are kept, see 
+        unscaled_coordinates(), and calling this again scales from them rather
+        than compounding the scale.
         """
-        coords = []
-        for node in self.nodes():
-            coords.append((node.x, node.y))
-        
-        # Calculate extents, min/max on x-axis and y-axis
-        min_x = min([x for x, _ in coords])
-        max_x = max([x for x, _ in coords])
-        
-        min_y = min([y for _, y in coords])
-        max_y = max([y for _, y in coords])
+        node_xy, shape_xy, _ = self.unscaled_coordinates()
 
-        # Calculate scale factor
-        legible_diff = 1000
-        scale_factor_x = legible_diff / abs(max_x - min_x)
-        scale_factor_y = legible_diff / abs(max_y - min_y) 
-        self.coord_scale = max(scale_factor_x, scale_factor_y)
+        min_xy, max_xy = _extents(node_xy, shape_xy)
+        span = max_xy - min_xy
+        span = span[span > 0]
 
-        # Scale node coordinates and link shape points
-        for node in self.nodes():
-            node.x *= self.coord_scale
-            node.y *= self.coord_scale
+        scale = legible_diff / span.min() if len(span) > 0 else 1
+        self.apply_coord_scale(float(scale))
 
-        for link in self.links():
-            new_shape_points = [(x * self.coord_scale, y * self.coord_scale) for x, y in link.shape_points]
-            link.shape_points = new_shape_points
+    def apply_coord_scale(self, coord_scale: float) -> None:
+        """Set the node x,y coordinates and link shape points to the unscaled
+        coordinates multiplied by coord_scale.
 
-           
-                    
-    
+        Parameters
+        ----------
+        coord_scale : float
+            Scalar from real-world to display coordinates.
+        """
+        node_xy, shape_xy, _ = self.unscaled_coordinates()
+
+        # Keep the real-world coordinates before the first scale is applied.
+        if self._unscaled_node_xy is None:
+            self._unscaled_node_xy = node_xy.copy()
+            self._unscaled_shape_xy = shape_xy.copy()
+            node_xy = self._unscaled_node_xy
+            shape_xy = self._unscaled_shape_xy
+
+        self.coord_scale = coord_scale
+
+        for node, (x, y) in zip(self.nodes(), (node_xy * coord_scale).tolist()):
+            node.x = x
+            node.y = y
+
+        scaled_xy, _ = self.shape_points()
+        np.multiply(shape_xy, coord_scale, out=scaled_xy)
+
+    def unscaled_coordinates(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the node coordinates and link shape points in real-world units.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Node x,y in Network.nodes() order, shape (n_nodes, 2). Shape points
+            and offsets of each link, as returned by shape_points().
+        """
+        shape_xy, shape_offsets = self.shape_points()
+
+        if self._unscaled_node_xy is not None:
+            return self._unscaled_node_xy, self._unscaled_shape_xy, shape_offsets
+
+        node_xy = np.array([(node.x, node.y) for node in self.nodes()], 
+                           dtype=np.float64).reshape(-1, 2)
+
+        if self.coord_scale != 1:
+            # Nodes or links were added after scaling, only the scaled values are known.
+            return node_xy / self.coord_scale, shape_xy / self.coord_scale, shape_offsets
+
+        return node_xy, shape_xy, shape_offsets
+
+
+def _extents(*xy_arrays: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Minimum and maximum x,y over (n, 2) coordinate arrays. 
     
+    Returns zeros if there are no coordinates.
+    """
+    xy_arrays = [xy for xy in xy_arrays if len(xy) > 0]
+    if not xy_arrays:
+        return np.zeros(2), np.zeros(2)
+
+    min_xy = np.min([xy.min(axis=0) for xy in xy_arrays], axis=0)
+    max_xy = np.max([xy.max(axis=0) for xy in xy_arrays], axis=0)
+    return min_xy, max_xy
+
+
+def _route_cost(csr: NetCSR, nodes: list[int]) -> float:
+    """Total cost of the links along a node sequence, inf if a link is not in the network."""
+    cost = 0.0
+    for x in range(len(nodes) - 1):
+        e = csr.link_index.get((nodes[x], nodes[x + 1]))
+        if e is None:
+            return np.inf
+        cost += float(csr.cost[e])
+    return cost
 
 
-def _dijkstra(net: Network, source: int):
+def _dijkstra(net: Network, source: int, targets: list[int] = None):
     """Uses dijkstra's algorithm to compute the shortest route between
     source and all destinations.
     
     The 'shortest route' returned is a sequence of nodes.
-    Used the pseudocode on wikipedia: https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm#Pseudocode
+    Unvisited nodes are kept in a binary heap, so each search is O((V + E) log V).
+    Based on the pseudocode on wikipedia: https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm#Using_a_priority_queue
 
     Parameters
     ----------
@@ -342,6 +790,10 @@ def _dijkstra(net: Network, source: int):
         Network to use in this shortest route algorithm.
     source : int
         ID of the origin node.
+    targets : list[int], optional
+        IDs of the destination nodes. If given, the search stops as soon as the
+        shortest route to every target is known. By default None, which searches
+        the whole network.
 
     Returns
     -------
@@ -350,38 +802,200 @@ def _dijkstra(net: Network, source: int):
         to extract the shortest routes from this dictionary.
     """
     
-    # unvisited nodes
-    Q = []
-    
     # shortest distance to each node
-    dist = {}
+    dist = dict.fromkeys(net._graph, sys.maxsize)
 
     # previous node on shortest route
-    prev = {}
+    prev = dict.fromkeys(net._graph, None)
 
-    for i in net._graph:
-        Q.append(i)  
-        dist[i] = sys.maxsize
-        prev[i] = None
     dist[source] = 0
 
+    # nodes with a final shortest distance
+    visited = set()
+
+    # targets whose shortest distance is not yet final
+    unsettled = set(targets) if targets is not None else None
+
+    # Heap entries are (distance, -node key). Ties on distance pop the highest
+    # node key first, which keeps routes identical to the original list scan.
+    Q = [(0, -source)]
+
     while len(Q) > 0:
-        min_dist = sys.maxsize
-        for i in Q:
-            if dist[i] <= min_dist:
-                u, min_dist = i, dist[i]
+        dist_u, u = heapq.heappop(Q)
+        u = -u
+
+        if u in visited:
+            # stale entry, node was already reached by a shorter route
+            continue
+        
+        visited.add(u)
 
-        Q.remove(u)
+        if unsettled is not None:
+            unsettled.discard(u)
+            if len(unsettled) == 0:
+                break
 
         for v, link in net._graph[u].neighbors.items():
-            alt = dist[u] + link.cost
+            alt = dist_u + link.cost
             if alt < dist[v]:   
                 dist[v] = alt
                 prev[v] = u
+                heapq.heappush(Q, (alt, -v))
 
     return {'dist': dist, 'prev': prev}
 
 
+def _dijkstra_csr(adjacency: tuple[list[int], list[int], list[float]],
+                  source: int, 
+                  targets: list[int] = None) -> tuple[list[float], list[int]]:
+    """Same search as _dijkstra, but runs on the arrays of a NetCSR view.
+
+    Parameters
+    ----------
+    adjacency : tuple[list[int], list[int], list[float]]
+        Offsets, targets, and link costs as returned by NetCSR.adjacency().
+    source : int
+        Node index of the origin.
+    targets : list[int], optional
+        Node indices of the destinations. The search stops once the shortest 
+        route to all of them is known. By default None, which searches the 
+        whole network.
+
+    Returns
+    -------
+    tuple[list[float], list[int]]
+        Shortest distance to, and previous node index of, each node index.
+        The previous node index is -1 if the node was not reached (or is the source).
+    """
+    offsets, link_targets, cost = adjacency
+    n_nodes = len(offsets) - 1
+
+    dist = [sys.maxsize] * n_nodes
+    prev = [-1] * n_nodes
+    visited = [False] * n_nodes
+    
+    dist[source] = 0
+    n_unsettled = len(set(targets)) if targets is not None else -1
+    is_target = set(targets) if targets is not None else ()
+
+    # Ties on distance pop the highest node index first, see _dijkstra.
+    Q = [(0, -source)]
+
+    while len(Q) > 0:
+        dist_u, u = heapq.heappop(Q)
+        u = -u
+
+        if visited[u]:
+            continue
+
+        visited[u] = True
+
+        if u in is_target:
+            n_unsettled -= 1
+            if n_unsettled == 0:
+                break
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = link_targets[e]
+            alt = dist_u + cost[e]
+            if alt < dist[v]:
+                dist[v] = alt
+                prev[v] = u
+                heapq.heappush(Q, (alt, -v))
+
+    return dist, prev
+
+
+def _search_routes(adjacency: tuple[list[int], list[int], list[float]],
+                   origins: list[int],
+                   destinations: list[int],
+                   workers: int = None) -> list[list[list[int]]]:
+    """Shortest route node index sequences from each origin to each destination.
+
+    See Network.init_routes for workers. Returns route_trees[origin][destination].
+    """
+    if workers == 0:
+        workers = os.cpu_count()
+
+    if workers is None or workers <= 1 or len(origins) <= 1:
+        return [_routes_from_origin(adjacency, o_index, destinations) 
+                for o_index in origins]
+
+    # Each worker receives the graph snapshot once, then only origin indices.
+    # map() returns results in origin order, so od_pairs does not depend
+    # on which worker finishes first.
+    executor = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_init_route_worker,
+                                   initargs=(adjacency, destinations))
+    with executor:
+        chunksize = max(1, len(origins) // (workers * 4))
+        return list(executor.map(_route_worker, origins, chunksize=chunksize))
+
+
+def _routes_from_origin(adjacency: tuple[list[int], list[int], list[float]],
+                        origin: int, 
+                        destinations: list[int]) -> list[list[int]]:
+    """Shortest route node index sequences from one origin to each destination.
+
+    Routes are in the same order as destinations. Unreachable destinations 
+    have an empty route.
+    """
+    _, prev = _dijkstra_csr(adjacency, origin, destinations)
+    return [_index_seq_from_prev(prev, origin, d) for d in destinations]
+
+
+# Graph snapshot held by each process in the init_routes process pool.
+_worker_adjacency = None
+_worker_destinations = None
+
+
+def _init_route_worker(adjacency, destinations) -> None:
+    """Process pool initializer. Stores the graph snapshot in the worker process."""
+    global _worker_adjacency, _worker_destinations
+    _worker_adjacency = adjacency
+    _worker_destinations = destinations
+
+
+def _route_worker(origin: int) -> list[list[int]]:
+    """Process pool task. See _routes_from_origin."""
+    return _routes_from_origin(_worker_adjacency, origin, _worker_destinations)
+
+
+def _index_seq_from_prev(prev: list[int], origin: int, destination: int) -> list[int]:
+    """Node index sequence from origin to destination, see _node_seq_from_dijkstra.
+
+    Parameters
+    ----------
+    prev : list[int]
+        Previous node index of each node index, from _dijkstra_csr.
+    origin : int
+        Origin node index.
+    destination : int
+        Destination node index.
+
+    Returns
+    -------
+    list[int]
+        Sequence of node indices along the shortest route. Empty if the 
+        destination is unreachable or is the origin.
+    """
+    if prev[destination] == -1: return [] # D unreachable from O, or O == D
+
+    node_seq = []
+    u = destination
+
+    while prev[u] != -1:
+        node_seq.append(u)
+        u = prev[u]
+
+    if u == origin:
+        node_seq.append(origin)
+
+    node_seq.reverse()
+
+    return node_seq
+
+
 def _node_seq_from_dijkstra(dijkstra_result, origin, destination):
     """Helper function to convert dijkstra result to usable route data.
 
@@ -11,17 +11,26 @@ For example:
 
 import csv
 import os
-from sys import maxsize as MAXSIZE
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
 
+import numpy as np
 import shapefile
 
 from .net import Network
 from .netlink import NetLinkData
-from .netnode import NetNode, NetNodeData
+from .netnode import NetNodeData
 from .netroute import NetRoute
+from .netspatial import NodeSpatialIndex
+from .route_cache import RouteCache
 
+# Number of shapefile records read and added to the network at a time.
+SHP_CHUNK_SIZE = 10_000
 
-def create_network(node_file: str, link_file: str) -> Network:
+
+def create_network(node_file: str, link_file: str, workers: int = None,
+                   route_cache: RouteCache = None, snap_tolerance: float = None) -> Network:
     """Create a new network from user-supplied files.
     
     The network turns and potential OD routes are also initialized so that the new
@@ -33,12 +42,20 @@ def create_network(node_file: str, link_file: str) -> Network:
         File path to node file.
     link_file : str
         File path to link file.
+    workers : int, optional
+        Number of processes used to initialize routes, see Network.init_routes.
+    route_cache : RouteCache, optional
+        On-disk cache of initialized routes, see Network.init_routes.
+    snap_tolerance : float, optional
+        Largest distance between a shapefile link end point and its node, see 
+        add_links_from_shp.
 
     Returns
     -------
     Network
         New network containing nodes and links. Turns and routes are initialized
-        from the nodes and links.
+        from the nodes and links. Links that were further than snap_tolerance
+        from a node are listed in Network.skipped_links.
     """
     
     node_handler = {
@@ -60,10 +77,13 @@ def create_network(node_file: str, link_file: str) -> Network:
     new_network = Network()
 
     node_handler[node_file_ext](new_network, node_file)
-    link_handler[link_file_ext](new_network, link_file)
+    if link_file_ext == '.shp':
+        new_network.skipped_links = add_links_from_shp(new_network, link_file, snap_tolerance)
+    else:
+        link_handler[link_file_ext](new_network, link_file)
 
     new_network.init_turns()
-    new_network.init_routes()
+    new_network.init_routes(workers, route_cache)
     new_network.set_coord_scale()
 
     return new_network
@@ -166,18 +186,20 @@ def add_links_from_csv(net: Network, link_csv: str) -> None:
                 link_target_volume = 0
 
 
+            _, i_node = net.get_node_by_name(i_name)
+            _, j_node = net.get_node_by_name(j_name)
+
             link_data = NetLinkData(
                 name=payload[3],
                 cost=link_cost,
                 target_volume=link_target_volume,
-                shape_points=[(net.get_node_by_name(i_name)[1].x, net.get_node_by_name(i_name)[1].y), 
-                              (net.get_node_by_name(j_name)[1].x, net.get_node_by_name(j_name)[1].y)]
+                shape_points=[(i_node.x, i_node.y), (j_node.x, j_node.y)]
             )
             
             net.add_link(i_name, j_name, link_data)
 
 
-def add_nodes_from_shp(net: Network, node_shp: str) -> None:
+def add_nodes_from_shp(net: Network, node_shp: str, chunk_size: int = SHP_CHUNK_SIZE) -> None:
     """Adds nodes to the network from the given shapefile path.
 
     Parameters
@@ -186,24 +208,58 @@ def add_nodes_from_shp(net: Network, node_shp: str) -> None:
         Network object where nodes will be added.
     node_shp : str
         File path to node shapefile.
+    chunk_size : int, optional
+        Number of shapes read from the file and added to the network at a time.
     """
-    node_sf = shapefile.Reader(node_shp)
-
-    for node_sr in node_sf.shapeRecords():
-        node_data = NetNodeData(
-            name=node_sr.record['name'],
-            x=node_sr.shape.points[0][0],
-            y=node_sr.shape.points[0][1],
-            is_origin=int(node_sr.record['is_origin']) == 1,
-            is_destination=int(node_sr.record['is_destina']) == 1
-        )
-        net.add_node(node_data)
+    with shapefile.Reader(node_shp) as node_sf:
+        field = _shp_field_index(node_sf)
+        name = field['name']
+        is_origin = field['is_origin']
+        is_destination = field['is_destina']
+
+        for chunk in _chunks(node_sf.iterShapeRecords(), chunk_size):
+            net.add_nodes(
+                NetNodeData(
+                    name=node_sr.record[name],
+                    x=node_sr.shape.points[0][0],
+                    y=node_sr.shape.points[0][1],
+                    is_origin=int(node_sr.record[is_origin]) == 1,
+                    is_destination=int(node_sr.record[is_destination]) == 1)
+                for node_sr in chunk)
+
+
+@dataclass(slots=True)
+class LinkSnap():
+    """Nodes that a shapefile link was snapped to.
+
+    Attributes
+    ----------
+    name : str
+        Link name.
+    i_name : str
+        Name of the node closest to the link start point.
+    j_name : str
+        Name of the node closest to the link end point.
+    i_dist : float
+        Distance from the link start point to node i.
+    j_dist : float
+        Distance from the link end point to node j.
+    """
+    name: str
+    i_name: str
+    j_name: str
+    i_dist: float
+    j_dist: float
 
 
-def add_links_from_shp(net: Network, link_shp: str) -> None:
+def add_links_from_shp(net: Network, 
+                       link_shp: str, 
+                       snap_tolerance: float = None,
+                       chunk_size: int = SHP_CHUNK_SIZE) -> list[LinkSnap]:
     """Adds links to the network from the given shapefile paths.
     
-    Requires that the network already has nodes in it.
+    Requires that the network already has nodes in it. Each end of a link is
+    snapped to the closest node.
 
     Parameters
     ----------
@@ -211,54 +267,101 @@ def add_links_from_shp(net: Network, link_shp: str) -> None:
         Network object where links will be added.
     link_shp : str
         File path to link shapefile.
+    snap_tolerance : float, optional
+        Largest allowed distance between a link end point and its node, in
+        shapefile units. Links with an end point further away are not added.
+        By default None, which adds every link.
+    chunk_size : int, optional
+        Number of shapes read from the file and added to the network at a time.
+
+    Returns
+    -------
+    list[LinkSnap]
+        Links that were not added because they were further than snap_tolerance
+        from a node.
     """
-    link_sf = shapefile.Reader(link_shp)
+    node_index = NodeSpatialIndex(net)
+    flagged: list[LinkSnap] = []
+
+    with shapefile.Reader(link_shp) as link_sf:
+        field = _shp_field_index(link_sf)
+        name = field['name']
+        cost = field['cost']
+        target_vol = field['target_vol']
+        oneway = field['oneway']
+
+        for chunk in _chunks(link_sf.iterShapeRecords(), chunk_size):
+            # Snap the start and end point of every link in the chunk in one batch.
+            end_points = np.array([(sr.shape.points[0], sr.shape.points[-1]) for sr in chunk],
+                                  dtype=np.float64).reshape(-1, 2)
+            node_keys, snap_dist = node_index.closest(end_points)
+            node_keys = node_keys.reshape(-1, 2).tolist()
+            snap_dist = snap_dist.reshape(-1, 2).tolist()
+
+            new_links = []
+
+            for link_sr, (i, j), (i_dist, j_dist) in zip(chunk, node_keys, snap_dist):
+                record = link_sr.record
+
+                if snap_tolerance is not None and max(i_dist, j_dist) > snap_tolerance:
+                    snap = LinkSnap(
+                        name=record[name],
+                        i_name=net.node(i).name,
+                        j_name=net.node(j).name,
+                        i_dist=i_dist,
+                        j_dist=j_dist)
+                    print(f'Cannot import link {snap.name}. End point is {max(i_dist, j_dist):.2f} '
+                          f'from the closest node, further than the snap tolerance {snap_tolerance}.')
+                    flagged.append(snap)
+                    continue
+                
+                try:
+                    link_cost = float(record[cost])
+                except ValueError:
+                    link_cost = 0
+                    
+                try:
+                    link_target_volume = float(record[target_vol])
+                except ValueError:
+                    link_target_volume = 0
 
-    for link_sr in link_sf.shapeRecords():
+                new_links.append((i, j, NetLinkData(
+                    name=record[name],
+                    cost=link_cost,
+                    target_volume=link_target_volume,
+                    shape_points=link_sr.shape.points
+                )))
 
-        link_start_xy = link_sr.shape.points[0]
-        link_end_xy = link_sr.shape.points[-1]
+                # Add link in opposite direction (if two-way)
+                if record[oneway] == 2:
 
-        start_pt = _find_closest_node(link_start_xy, net)
-        end_pt = _find_closest_node(link_end_xy, net)
-        
-        i_name = start_pt.name
-        j_name = end_pt.name
-           
-        try:
-            link_cost = float(link_sr.record['cost'])
-        except ValueError:
-            link_cost = 0
-            
-        try:
-            link_target_volume = float(link_sr.record['target_vol'])
-        except ValueError:
-            link_target_volume = 0
-
-        link_data = NetLinkData(
-            name=link_sr.record['name'],
-            cost=link_cost,
-            target_volume=link_target_volume,
-            shape_points=link_sr.shape.points
-        )
-        
-        net.add_link(i_name, j_name, link_data)
+                    rev_pts = list(link_sr.shape.points)
+                    rev_pts.reverse()
 
-        # Add link in opposite direction (if two-way)
-        if link_sr.record['oneway'] == 2:
+                    # TODO: opposite direction link needs a different name?
+                    new_links.append((j, i, NetLinkData(
+                        name=record[name],
+                        cost=link_cost,
+                        target_volume=link_target_volume,
+                        shape_points=rev_pts
+                    )))
 
-            rev_pts = list(link_sr.shape.points)
-            rev_pts.reverse()
+            net.add_links(new_links)
+
+    return flagged
+
+
+def _shp_field_index(sf: shapefile.Reader) -> dict[str, int]:
+    """Position of each attribute field in a shapefile record."""
+    # The first field is the DeletionFlag, which is not part of the records.
+    return {f[0]: x for x, f in enumerate(sf.fields[1:])}
 
-            # TODO: opposite direction link needs a different name?
-            link_data = NetLinkData(
-                name=link_sr.record['name'],
-                cost=link_cost,
-                target_volume=link_target_volume,
-                shape_points=rev_pts
-            )
 
-            net.add_link(j_name, i_name, link_data)
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of up to size items."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 def import_turns(turn_csv, net: Network) -> None:
@@ -293,11 +396,14 @@ def import_turns(turn_csv, net: Network) -> None:
             turn_name = payload[0]
             turn_target = float(payload[1])
 
-            if (i, j, k) not in net._turns:
+            turns = net.turn_store()
+            if (i, j, k) not in turns:
                 print(f'Cannot import turn {turn_name}. Turn not found in Network.')
+                continue
 
-            net._turns[(i, j, k)].name = turn_name
-            net._turns[(i, j, k)].target_volume = turn_target
+            t = turns.turn_id(i, j, k)
+            turns.set_name(t, turn_name)
+            turns.target_volume[t] = turn_target
 
 
 def import_routes(route_csv, net: Network) -> None:
@@ -353,7 +459,8 @@ def import_routes(route_csv, net: Network) -> None:
                         name="",
                         target_ratio=user_ratio,
                         target_rel_diff=0, 
-                        assigned_ratio=0))
+                        assigned_ratio=0,
+                        user_defined=True))
 
         # Normalize target_ratios
         for od in net.od_pairs:
@@ -368,38 +475,7 @@ def import_routes(route_csv, net: Network) -> None:
                 route.target_ratio = route.target_ratio / ratio_sum
                 route.target_rel_diff = route.target_ratio - (1 - route.target_ratio)
         
+        net.reset_route_incidence()
+
         # Update route names
         net.set_route_names()
-
-
-def _find_closest_node(search_pt: tuple, net: Network) -> NetNode:
-    """Given a search point, find the closest point within a group of points.
-    
-    Parameters
-    ----------
-    search_pt : tuple
-        x, y coordinate of the search point
-    net : Network
-        Network that already has nodes loaded. search_pt will be compared against
-        the nodes in this network.
-
-    Returns
-    -------
-    closest_node
-        NetNode object of closest point within the network. Returns None if nothing found.
-    """
-    x1 = search_pt[0]
-    y1 = search_pt[1]
-    
-    min_dist = MAXSIZE
-    closest_node = None
-
-    for node in net.nodes():
-        x2 = node.x
-        y2 = node.y
-        dist = (x1 - x2) ** 2 + (y1 - y2) ** 2
-        if dist < min_dist:
-            min_dist = dist
-            closest_node = node
-
-    return closest_node
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""Save and load a fully built Network as a folder of binary numpy arrays.
+
+A snapshot skips reading the input files and searching for routes, so a large network can be reopened quickly. Each array is stored
+in its own .npy file so it can be memory-mapped when loaded.
+
+Node and link names keep their type (e.g. integer names read from a
+shapefile), other names are stored as strings. Node coordinates and
+link shape points are stored in real-world units, and the coord_scale is 
+applied again when loaded.
+
+The turn store and the route incidence matrices are saved as their arrays,
+so they are not rebuilt when loaded. Turn and route volume arrays are
+memory-mapped copy-on-write.
+"""
+
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+from .net import Network
+from .netincidence import RouteIncidence
+from .netlink import NetLinkData
+from .netnode import NetNodeData
+from .netod import NetODpair
+from .netroute import NetRoute
+from .netturns import TurnStore
+
+# Increment when the snapshot layout changes.
+SNAPSHOT_VERSION = 3
+
+
+def save_network(net: Network, folder: str) -> None:
+    """Save the network nodes, links, turns, routes, and volumes to a folder.
+
+    Parameters
+    ----------
+    net : Network
+        Network to save.
+    folder : str
+        Folder to save the snapshot arrays to. Created if it does not exist.
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    nodes = list(net.nodes())
+    links = list(net.links())
+    node_xy, shape_xy, shape_offsets = net.unscaled_coordinates()
+    turns = net.turn_store()
+    turn_names = turns.renamed()
+    routes = [route for od in net.od_pairs for route in od.routes]
+    incidence = net.route_incidence()
+
+    arrays = {
+        # Nodes
+        'node_name': _name_array([node.name for node in nodes]),
+        'node_xy': node_xy,
+        'node_is_origin': np.array([node.is_origin for node in nodes], dtype=bool),
+        'node_is_destination': np.array([node.is_destination for node in nodes], dtype=bool),
+
+        # Links
+        'link_key': np.array([link.key for link in links], dtype=np.int64).reshape(-1, 2),
+        'link_name': _name_array([link.name for link in links]),
+        'link_cost': np.array([link.cost for link in links], dtype=np.float64),
+        'link_target_volume': np.array([link.target_volume for link in links], dtype=np.float64),
+        'link_assigned_volume': np.array([link.assigned_volume for link in links], dtype=np.float64),
+        'link_seed_volume': np.array([link.seed_volume for link in links], dtype=np.float64),
+        'link_geh': np.array([link.geh for link in links], dtype=np.float64),
+        'link_shape_offsets': shape_offsets,
+        'link_shape_xy': shape_xy,
+
+        # Turns, as the TurnStore arrays. Only renamed turns store a name.
+        'turn_offsets': turns.offsets,
+        'turn_in_link': turns.in_link,
+        'turn_out_link': turns.out_link,
+        'turn_in_rank': turns.in_rank,
+        'turn_name_id': np.array(list(turn_names), dtype=np.int64),
+        'turn_name': _str_array(list(turn_names.values())),
+        'turn_seed_volume': turns.seed_volume,
+        'turn_target_volume': turns.target_volume,
+        'turn_assigned_volume': turns.assigned_volume,
+        'turn_geh': turns.geh,
+
+        # OD pairs and routes. Routes of OD o are route_offsets[o] to route_offsets[o + 1] - 1,
+        # nodes of route r are route_nodes[node_offsets[r]:node_offsets[r + 1]].
+        'od_key': np.array([(od.origin, od.destination) for od in net.od_pairs],
+                           dtype=np.int64).reshape(-1, 2),
+        'od_route_offsets': _offsets([len(od.routes) for od in net.od_pairs]),
+        'route_node_offsets': _offsets([len(route.nodes) for route in routes]),
+        'route_nodes': np.array([n for route in routes for n in route.nodes], dtype=np.int64),
+        'route_name': _str_array([route.name for route in routes]),
+        'route_seed_volume': np.array([route.seed_volume for route in routes], dtype=np.float64),
+        'route_target_ratio': np.array([route.target_ratio for route in routes], dtype=np.float64),
+        'route_target_rel_diff': np.array([route.target_rel_diff for route in routes],
+                                          dtype=np.float64),
+        'route_assigned_volume': np.array([route.assigned_volume for route in routes],
+                                          dtype=np.float64),
+        'route_assigned_ratio': np.array([route.assigned_ratio for route in routes],
+                                         dtype=np.float64),
+        'route_user_defined': np.array([route.user_defined for route in routes], dtype=bool),
+    }
+
+    # Route incidence matrices, as CSR arrays.
+    for name, matrix in (('link', incidence.links), ('turn', incidence.turns)):
+        arrays[f'incidence_{name}_data'] = matrix.data
+        arrays[f'incidence_{name}_indices'] = matrix.indices
+        arrays[f'incidence_{name}_indptr'] = matrix.indptr
+
+    # Each file is replaced rather than overwritten, so a network loaded from
+    # the same folder keeps its memory-mapped arrays.
+    for name, array in arrays.items():
+        path = os.path.join(folder, f'{name}.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(path + '.tmp', path)
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'coord_scale': net.coord_scale,
+        'total_geh': net.total_geh,
+    }
+
+    with open(os.path.join(folder, 'network.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_network(folder: str) -> Network:
+    """Load a network saved with save_network.
+
+    Parameters
+    ----------
+    folder : str
+        Folder containing the snapshot arrays.
+
+    Returns
+    -------
+    Network
+        Network with nodes, links, turns, and routes as they were when saved.
+    """
+    with open(os.path.join(folder, 'network.json')) as f:
+        meta = json.load(f)
+
+    if meta['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"Network snapshot version {meta['version']} is not supported. "
+                         f"Expected version {SNAPSHOT_VERSION}.")
+
+    def load(name: str) -> list:
+        """Read an array that is converted to Python objects."""
+        return np.load(os.path.join(folder, f'{name}.npy')).tolist()
+
+    def load_array(name: str) -> np.ndarray:
+        """Memory-map an array that is kept as an array. Copy-on-write, so it can be edited."""
+        return np.load(os.path.join(folder, f'{name}.npy'), mmap_mode='c')
+
+    net = Network()
+    net.total_geh = meta['total_geh']
+
+    # Nodes. Node keys are assigned in the saved order, same as when first built.
+    for name, (x, y), is_origin, is_destination in zip(
+            load('node_name'), load('node_xy'),
+            load('node_is_origin'), load('node_is_destination')):
+        net.add_node(NetNodeData(
+            name=name,
+            x=x,
+            y=y,
+            is_origin=is_origin,
+            is_destination=is_destination))
+
+    # Links. Added in the saved order, so the NetCSR link ids match the saved ids.
+    net.add_links(
+        (i, j, NetLinkData(
+            cost=cost,
+            name=name,
+            target_volume=target,
+            shape_points=[],
+            assigned_volume=assigned,
+            seed_volume=seed,
+            geh=geh))
+        for (i, j), name, cost, target, assigned, seed, geh in zip(
+            load('link_key'), load('link_name'), load('link_cost'), load('link_target_volume'),
+            load('link_assigned_volume'), load('link_seed_volume'), load('link_geh')))
+
+    net.set_shape_points(load_array('link_shape_xy'), load_array('link_shape_offsets'))
+
+    # Coordinates are saved in real-world units.
+    net.apply_coord_scale(meta['coord_scale'])
+
+    # Turns
+    turn_offsets = load_array('turn_offsets')
+    if len(turn_offsets) == net.csr().n_nodes + 1:
+        turns = TurnStore(net.csr(), turn_offsets, load_array('turn_in_link'),
+                          load_array('turn_out_link'), load_array('turn_in_rank'))
+    else:
+        # Turns were not initialized when saved.
+        turns = TurnStore()
+    turns.seed_volume = load_array('turn_seed_volume')
+    turns.target_volume = load_array('turn_target_volume')
+    turns.assigned_volume = load_array('turn_assigned_volume')
+    turns.geh = load_array('turn_geh')
+
+    for t, name in zip(load('turn_name_id'), load('turn_name')):
+        turns.set_name(t, name)
+
+    net.set_turn_store(turns)
+
+    # Routes
+    node_offsets = load('route_node_offsets')
+    route_nodes = load('route_nodes')
+
+    routes = [
+        NetRoute(
+            nodes=route_nodes[node_offsets[r]:node_offsets[r + 1]],
+            name=name,
+            seed_volume=seed,
+            target_ratio=target_ratio,
+            target_rel_diff=target_rel_diff,
+            assigned_volume=assigned,
+            assigned_ratio=assigned_ratio,
+            user_defined=user_defined)
+        for r, (name, seed, target_ratio, target_rel_diff, assigned, assigned_ratio,
+                user_defined) in enumerate(zip(
+            load('route_name'), load('route_seed_volume'), load('route_target_ratio'),
+            load('route_target_rel_diff'), load('route_assigned_volume'),
+            load('route_assigned_ratio'), load('route_user_defined')))
+    ]
+
+    route_offsets = load('od_route_offsets')
+    for o, (origin, destination) in enumerate(load('od_key')):
+        net.od_pairs.append(NetODpair(
+            origin=origin,
+            destination=destination,
+            routes=routes[route_offsets[o]:route_offsets[o + 1]]))
+
+    incidence = {}
+    for name, n_rows in (('link', net.csr().n_links), ('turn', turns.n_turns)):
+        incidence[name] = sparse.csr_matrix(
+            (load_array(f'incidence_{name}_data'), load_array(f'incidence_{name}_indices'),
+             load_array(f'incidence_{name}_indptr')),
+            shape=(n_rows, len(routes)))
+
+    net.set_route_incidence(RouteIncidence(net, incidence['link'], incidence['turn']))
+
+    return net
+
+
+def _name_array(values: list) -> np.ndarray:
+    """Array of names that keeps the name type if every name has the same type.
+
+    Names of mixed or unsupported types are saved as strings.
+    """
+    if len({type(v) for v in values}) == 1:
+        array = np.array(values)
+        if array.dtype.kind in 'biufU':
+            return array
+    return _str_array(values)
+
+
+def _str_array(values: list) -> np.ndarray:
+    """Fixed-width unicode array, so it can be saved without pickling."""
+    return np.array([str(v) for v in values], dtype=str)
+
+
+def _offsets(lengths: list[int]) -> np.ndarray:
+    """Start position of each item in a flat array, followed by the total length."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
@@ -1,15 +1,30 @@
 """Export network features to csv files.
+
+Tables are written in bulk chunks by table_write. Turns and route sequences
+can also be written to a columnar binary file, see table_write.EXPORT_FORMATS.
 """
 
 import os
 import csv
+import itertools
+
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
 
-from typing import TYPE_CHECKING
+from .table_write import (CHUNK_ROWS, TableWriter, node_names, open_text,
+                          resolve_compression, write_table)
 
 if TYPE_CHECKING:
     from .net import Network
+    from .netod import NetODpair
+    from .netroute import NetRoute
+
+# Number of routes gathered before each write of the route exports.
+ROUTE_CHUNK_SIZE = 10_000
+
 
-def export_turns(net: 'Network', output_folder=None) -> None:
+def export_turns(net: 'Network', output_folder=None, fmt='csv', compression=None) -> None:
     """Exports network turns to a csv file.
 
     Parameters
@@ -19,33 +34,37 @@ def export_turns(net: 'Network', output_folder=None) -> None:
     output_folder : str, optional
         Folder to export turn file, by default None indicates the current working
         directory as returned by os.getcwd().
+    fmt : str, optional
+        Output format, by default 'csv'. See table_write.EXPORT_FORMATS.
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
     """
-    if len(net._turns) == 0:
+    if len(net.turn_store()) == 0:
         print("Network does not contain any turns.")
         return
 
     if output_folder is None:
         output_folder = os.getcwd()
 
-    output_file = os.path.join(output_folder, 'exported_turns.csv')
+    names = node_names(net)
+    keys = net.turn_store().keys_array()
 
-    print('Output turns to: ', output_file)
-
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["a_node", "b_node", "c_node"])
-
-        for (i, j, k), _ in net.turns(True):
-            A = net.node(i).name
-            B = net.node(j).name
-            C = net.node(k).name
-            writer.writerow([A, B, C])
+    output_file = write_table(os.path.join(output_folder, 'exported_turns'),
+                              {"a_node": names[keys[:, 0]],
+                               "b_node": names[keys[:, 1]],
+                               "c_node": names[keys[:, 2]]},
+                              fmt, compression)
 
+    print('Output turns to: ', output_file)
 
 
-def export_node_sequences(net: 'Network', output_folder=None) -> None:
+def export_node_sequences(net: 'Network', output_folder=None, fmt='csv',
+                          chunk_size=ROUTE_CHUNK_SIZE, compression=None) -> None:
     """Export the links and turns on every OD route to csv.
 
+    Routes are read and written chunk_size routes at a time, so memory use
+    does not grow with the number of exported rows.
+
     Parameters
     ----------
     net : Network
@@ -53,6 +72,12 @@ def export_node_sequences(net: 'Network', output_folder=None) -> None:
     output_folder : str
         Folder to export the node file, by default None indicates the current working
         directory as returned by os.getcwd().
+    fmt : str, optional
+        Output format, by default 'csv'. See table_write.EXPORT_FORMATS.
+    chunk_size : int, optional
+        Number of routes per chunk, by default ROUTE_CHUNK_SIZE.
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
     """
     if net.od_pairs is None:
         print("Network does not contain any OD.")
@@ -61,55 +86,55 @@ def export_node_sequences(net: 'Network', output_folder=None) -> None:
     if output_folder is None:
         output_folder = os.getcwd()
 
-    output_turn_seq_file = os.path.join(output_folder, 'exported_route_turn_seq.csv')
-    output_link_seq_file = os.path.join(output_folder, 'exported_route_link_seq.csv')
-    
-    with open(output_turn_seq_file, 'w', newline='') as turn_f, \
-         open(output_link_seq_file, 'w', newline='') as link_f:
-        
-        turn_writer = csv.writer(turn_f)
-        link_writer = csv.writer(link_f)
-
-        turn_writer.writerow(["o_node", "d_node", "route", "a_node", "b_node", "c_node"])
-        link_writer.writerow(["o_node", "d_node", "route", "a_node", "b_node"])
-
-        for od in net.od_pairs:
-            o_name = net.node(od.origin).name
-            d_name = net.node(od.destination).name
-
-            for route in od.routes:
-                n_route_nodes = len(route.nodes)
-                
-                if n_route_nodes <= 1:
-                    # route is O == D
-                    continue
-
-                if n_route_nodes == 2:
-                    # route is one link
-                    a = net.node(route.nodes[0]).name
-                    b = net.node(route.nodes[1]).name
-                    link_writer.writerow([o_name, d_name, a, b])
-                    continue
-
-                # route has 3 or more nodes
-                for x in range(0, len(route.nodes) - 2):
-                    a = net.node(route.nodes[x]).name
-                    b = net.node(route.nodes[x + 1]).name
-                    c = net.node(route.nodes[x + 2]).name
-                    turn_writer.writerow([o_name, d_name, route.name, a, b, c])
-                    link_writer.writerow([o_name, d_name, route.name, a, b])
-
-                # last link
-                b = net.node(route.nodes[x + 1]).name
-                c = net.node(route.nodes[x + 2]).name
-                link_writer.writerow([o_name, d_name, route.name, b, c])
-
-    
-
-def export_route_list(net: 'Network', output_folder=None) -> None:
+    names = node_names(net)
+
+    # Row counts and the route name width are needed up front for npz output.
+    n_turn_rows = 0
+    n_link_rows = 0
+    name_width = 1
+    for _, route in _routes(net):
+        n_turn_rows += max(len(route.nodes) - 2, 0)
+        n_link_rows += max(len(route.nodes) - 1, 0)
+        name_width = max(name_width, len(str(route.name)))
+    route_name_dtype = f'U{name_width}'
+
+    turn_table = TableWriter(os.path.join(output_folder, 'exported_route_turn_seq'),
+                             ["o_node", "d_node", "route", "a_node", "b_node", "c_node"],
+                             fmt, n_turn_rows, compression)
+    link_table = TableWriter(os.path.join(output_folder, 'exported_route_link_seq'),
+                             ["o_node", "d_node", "route", "a_node", "b_node"],
+                             fmt, n_link_rows, compression)
+
+    with turn_table, link_table:
+        for chunk in _chunks(_routes(net), chunk_size):
+            o_keys = np.array([od.origin for od, _ in chunk], dtype=np.int64)
+            d_keys = np.array([od.destination for od, _ in chunk], dtype=np.int64)
+            route_names = np.array([str(route.name) for _, route in chunk], dtype=route_name_dtype)
+
+            lengths = np.array([len(route.nodes) for _, route in chunk], dtype=np.int64)
+            nodes = np.fromiter(itertools.chain.from_iterable(route.nodes for _, route in chunk),
+                                dtype=np.int64, count=int(lengths.sum()))
+
+            # Route of each node position, and the position within the route.
+            route_of = np.repeat(np.arange(len(chunk)), lengths)
+            starts = np.cumsum(lengths) - lengths
+            pos = np.arange(len(nodes)) - starts[route_of]
+            n_after = lengths[route_of] - pos - 1
+
+            for table, n_nodes in ((link_table, 2), (turn_table, 3)):
+                first = np.flatnonzero(n_after >= n_nodes - 1)
+                r = route_of[first]
+                columns = [names[o_keys[r]], names[d_keys[r]], route_names[r]]
+                columns += [names[nodes[first + x]] for x in range(n_nodes)]
+                table.write(dict(zip(table.columns, columns)))
+
+    print('Output node sequences to: ', turn_table.path, link_table.path)
+
+
+def export_route_list(net: 'Network', output_folder=None, compression=None) -> None:
     """Export the nodes along each route. One row per route.
 
-    Sample csv output. First two rows of the sample output are the same origin-destination, 
+    Sample csv output. First two rows of the sample output are the same origin-destination,
     but have different routes.
     --
     100,101,103,105
@@ -124,8 +149,10 @@ def export_route_list(net: 'Network', output_folder=None) -> None:
     output_folder : str, optional
         Folder to export route file, by default None indicates the current working
         directory as returned by os.getcwd().
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
     """
-    
+
     if net.od_pairs is None:
         print("Network does not contain any OD.")
         return
@@ -134,13 +161,27 @@ def export_route_list(net: 'Network', output_folder=None) -> None:
         output_folder = os.getcwd()
 
     print('Output OD to: ', output_folder)
-    
-    output_list_file = os.path.join(output_folder, 'exported_nodes_on_routes.csv')
-    with open(output_list_file, 'w', newline='') as list_f:
-        
+
+    names = node_names(net).tolist()
+
+    _, list_f = open_text(os.path.join(output_folder, 'exported_nodes_on_routes.csv'),
+                          resolve_compression(compression))
+    with list_f:
+
         list_writer = csv.writer(list_f)
 
-        for od in net.od_pairs:
-            for route in od.routes:
-                list_writer.writerow([str(net.node(x).name) for x in route.nodes])
+        for chunk in _chunks(_routes(net), CHUNK_ROWS):
+            list_writer.writerows([names[x] for x in route.nodes] for _, route in chunk)
+
+
+def _routes(net: 'Network') -> Iterator[tuple['NetODpair', 'NetRoute']]:
+    """Every OD pair and route, in OD order."""
+    for od in net.od_pairs:
+        for route in od.routes:
+            yield od, route
+
 
+def _chunks(iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
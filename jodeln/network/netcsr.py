@@ -0,0 +1,142 @@
+"""Compressed sparse row (CSR) view of the Network graph."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .net import Network
+
+
+class NetCSR():
+    """Frozen, array-based copy of the Network nodes and links.
+
+    Nodes are numbered 0..n_nodes-1 in the order they were added to the network,
+    links are numbered 0..n_links-1 in the same order as Network.links().
+    The outgoing links of node index u are the link ids offsets[u] to
+    offsets[u + 1] - 1, and targets holds the downstream node index of each link.
+
+    The view is a snapshot. It does not change when the Network changes, use
+    Network.csr() to get a view that matches the current network graph.
+    Volumes can be copied to and from the NetLinkData objects with
+    pull_volumes() and push_volumes().
+
+    Attributes
+    ----------
+    node_keys : np.ndarray
+        Network node key of each node index.
+    node_index : dict[int, int]
+        Node index of each Network node key.
+    offsets : np.ndarray
+        Position of the first outgoing link of each node. Length n_nodes + 1.
+    targets : np.ndarray
+        Downstream node index of each link.
+    link_keys : list[tuple[int, int]]
+        Network link key (i, j) of each link id.
+    link_index : dict[tuple[int, int], int]
+        Link id of each Network link key.
+    cost : np.ndarray
+        Cost of each link.
+    target_volume : np.ndarray
+        Target volume of each link.
+    assigned_volume : np.ndarray
+        Assigned volume of each link.
+    """
+    __slots__ = ['node_keys', 'node_index', 'offsets', 'targets', 'link_keys',
+                 'link_index', 'cost', 'target_volume', 'assigned_volume']
+
+    def __init__(self, net: 'Network'):
+        """Build the CSR view from the current state of the network graph.
+
+        Parameters
+        ----------
+        net : Network
+            Network to copy the nodes and links from.
+        """
+        self.node_keys = np.fromiter((key for key, _ in net.nodes(True)),
+                                     dtype=np.int64)
+        self.node_index: dict[int, int] = {
+            key: u for u, key in enumerate(self.node_keys.tolist())}
+
+        n_nodes = len(self.node_keys)
+        n_links = sum(len(node.neighbors) for node in net.nodes())
+
+        self.offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+        self.targets = np.zeros(n_links, dtype=np.int64)
+        self.cost = np.zeros(n_links, dtype=np.float64)
+        self.target_volume = np.zeros(n_links, dtype=np.float64)
+        self.assigned_volume = np.zeros(n_links, dtype=np.float64)
+        self.link_keys: list[tuple[int, int]] = []
+
+        e = 0
+        for u, node in enumerate(net.nodes()):
+            self.offsets[u] = e
+            for j, link in node.neighbors.items():
+                self.targets[e] = self.node_index[j]
+                self.cost[e] = link.cost
+                self.target_volume[e] = link.target_volume
+                self.assigned_volume[e] = link.assigned_volume
+                self.link_keys.append((node.key, j))
+                e += 1
+        self.offsets[n_nodes] = e
+
+        self.link_index: dict[tuple[int, int], int] = {
+            key: e for e, key in enumerate(self.link_keys)}
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_keys)
+
+    @property
+    def n_links(self) -> int:
+        return len(self.targets)
+
+    def link_id(self, i: int, j: int) -> int:
+        """Return the link id of the link between node keys i and j."""
+        return self.link_index[(i, j)]
+
+    def out_links(self, u: int) -> range:
+        """Return the link ids leaving node index u."""
+        return range(self.offsets[u], self.offsets[u + 1])
+
+    def adjacency(self) -> tuple[list[int], list[int], list[float]]:
+        """Return offsets, targets, and cost as python lists.
+
+        Indexing a python list is much faster than indexing a numpy array one
+        element at a time, so use these lists in pure python graph searches.
+        """
+        return self.offsets.tolist(), self.targets.tolist(), self.cost.tolist()
+
+    def reverse_adjacency(self, cost: list[float] = None) -> tuple[list[int], list[int], list[float]]:
+        """Return offsets, sources, and cost of the graph with every link reversed.
+
+        The incoming links of node index v are positions offsets[v] to 
+        offsets[v + 1] - 1. Searching this graph from v finds the shortest 
+        distance from every node to v.
+
+        Parameters
+        ----------
+        cost : list[float], optional
+            Cost of each link id, by default None which uses the cost array.
+        """
+        cost = self.cost if cost is None else np.asarray(cost, dtype=np.float64)
+        order = np.argsort(self.targets, kind='stable')
+        sources = np.repeat(np.arange(self.n_nodes), np.diff(self.offsets))
+
+        offsets = np.zeros(self.n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.targets, minlength=self.n_nodes), out=offsets[1:])
+
+        return offsets.tolist(), sources[order].tolist(), cost[order].tolist()
+
+    def pull_volumes(self, net: 'Network') -> None:
+        """Copy link cost and volumes from the NetLinkData objects into the arrays."""
+        for e, (i, j) in enumerate(self.link_keys):
+            link = net.link(i, j)
+            self.cost[e] = link.cost
+            self.target_volume[e] = link.target_volume
+            self.assigned_volume[e] = link.assigned_volume
+
+    def push_volumes(self, net: 'Network') -> None:
+        """Copy the assigned volume array back to the NetLinkData objects."""
+        for (i, j), v in zip(self.link_keys, self.assigned_volume.tolist()):
+            net.link(i, j).assigned_volume = v
@@ -0,0 +1,112 @@
+"""Sparse route incidence matrices for assigning route volumes to links and turns."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy import sparse
+
+if TYPE_CHECKING:
+    from .net import Network
+    from .netroute import NetRoute
+
+
+class RouteIncidence():
+    """Sparse matrices of which links and turns each route passes through.
+
+    Routes are numbered in the order of Network.od_pairs, then OD.routes.
+    Links are numbered by their NetCSR link id, turns by their TurnStore
+    turn id (the order of Network.turns()). Entry [e, r] is the number of times route r uses link
+    (or turn) e, so assigned volumes are one matrix-vector product:
+
+        link_volume = links @ route_volume
+        turn_volume = turns @ route_volume
+
+    Attributes
+    ----------
+    routes : list[NetRoute]
+        Routes in column order.
+    link_keys : list[tuple[int, int]]
+        Link key of each row in links.
+    turn_keys : list[tuple[int, int, int]]
+        Turn key of each row in turns.
+    links : scipy.sparse.csr_matrix
+        Link-route incidence matrix, shape (n_links, n_routes).
+    turns : scipy.sparse.csr_matrix
+        Turn-route incidence matrix, shape (n_turns, n_routes).
+    """
+    __slots__ = ['routes', 'link_keys', 'turn_keys', 'links', 'turns']
+
+    def __init__(self, net: 'Network', links: sparse.csr_matrix = None,
+                 turns: sparse.csr_matrix = None):
+        """Build the incidence matrices for the current routes in the network.
+
+        Parameters
+        ----------
+        net : Network
+            Network with links, turns, and OD routes initialized.
+        links, turns : scipy.sparse.csr_matrix, optional
+            Incidence matrices built earlier for the same routes, e.g. loaded
+            from a snapshot. Used as they are instead of being rebuilt.
+        """
+        csr = net.csr()
+        turn_store = net.turn_store()
+        self.link_keys = csr.link_keys
+        self.turn_keys = [tuple(key) for key in turn_store.keys_array().tolist()]
+
+        self.routes: list[NetRoute] = [route for od in net.od_pairs for route in od.routes]
+
+        if links is not None and turns is not None:
+            self.links = links
+            self.turns = turns
+            return
+
+        link_rows = []
+        link_cols = []
+        turn_rows = []
+        turn_cols = []
+
+        for r, route in enumerate(self.routes):
+            nodes = route.nodes
+            for x in range(0, len(nodes) - 1):
+                link_rows.append(csr.link_index[(nodes[x], nodes[x + 1])])
+                link_cols.append(r)
+
+            for x in range(0, len(nodes) - 2):
+                turn_rows.append(turn_store.turn_id(nodes[x], nodes[x + 1], nodes[x + 2]))
+                turn_cols.append(r)
+
+        n_routes = len(self.routes)
+
+        # Duplicate (row, col) entries are summed, e.g. a route using a link twice.
+        self.links = sparse.csr_matrix(
+            (np.ones(len(link_rows)), (link_rows, link_cols)),
+            shape=(len(self.link_keys), n_routes))
+
+        self.turns = sparse.csr_matrix(
+            (np.ones(len(turn_rows)), (turn_rows, turn_cols)),
+            shape=(len(self.turn_keys), n_routes))
+
+    @property
+    def n_routes(self) -> int:
+        return len(self.routes)
+
+    def route_volumes(self) -> np.ndarray:
+        """Return the assigned volume of each route as an array."""
+        return np.fromiter((route.assigned_volume for route in self.routes),
+                           dtype=np.float64, count=len(self.routes))
+
+    def assign(self, route_volume: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the link and turn volumes that result from the route volumes.
+
+        Parameters
+        ----------
+        route_volume : np.ndarray
+            Volume of each route, shape (n_routes,). A 2-D array of shape
+            (n_routes, n) assigns n sets of route volumes at once.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Link volumes and turn volumes.
+        """
+        return self.links @ route_volume, self.turns @ route_volume
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 @dataclass(slots=True)
 class NetLinkData():
     """Data on Network links.
@@ -12,6 +14,10 @@ class NetLinkData():
         Human-readable name for the link. Does not have to be unique.
     target_volume: float
         Desired volume on this link.
+    shape_points: list[tuple[float, float]] | np.ndarray
+        x, y coordinates along the link, from i to j. Once the network has
+        packed its link geometry (see Network.shape_points) this is a (n, 2)
+        view into the network's shape point array.
     key: tuple[int, int]
         Unique identifier for this link. Defaults to an invalid (-1, -1). 
         Create a valid value when adding the link to the network based on the 
@@ -26,7 +32,7 @@ class NetLinkData():
     cost: float
     name: str
     target_volume: float
-    shape_points: list[tuple[float, float]]
+    shape_points: list[tuple[float, float]] | np.ndarray
     key: tuple[int, int] = (-1, -1)
     assigned_volume: float = 0
     seed_volume: float = 0
@@ -31,6 +31,10 @@ class NetRoute():
         Helper variable for the OD optimization algorithm. The OD optimization
         takes a list of variables. opt_var_index is the position of this route 
         within the list of optimization variables.
+    user_defined : bool
+        True if the route was imported from a user route file, rather than 
+        found by the shortest route search. User-defined routes are not 
+        changed when link costs change.
     """
     nodes: list[int]
     name: str
@@ -40,3 +44,4 @@ class NetRoute():
     assigned_volume: float = 0
     assigned_ratio: float = 1
     opt_var_index: int = -1
+    user_defined: bool = False
@@ -0,0 +1,203 @@
+"""Sparse select-link and select-turn analysis of the network routes."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy import sparse
+
+if TYPE_CHECKING:
+    from .net import Network
+    from .netincidence import RouteIncidence
+
+
+class SelectIndex():
+    """Route ratio of each zone pair (OD) through each link and turn.
+
+    Entry [e, z] of links (or turns) is the sum of the target_ratio of every
+    route of zone pair z that uses link (or turn) e, counted once per use.
+    Rows are in RouteIncidence order: NetCSR link ids and TurnStore turn ids.
+    Columns are in Network.od_pairs order.
+
+    The index is built from the network route incidence matrices. If only the
+    route target ratios change, call update_ratios() to refresh the values
+    without rebuilding the structure.
+
+    Attributes
+    ----------
+    incidence : RouteIncidence
+        Route incidence matrices the index was built from.
+    zone_pairs : list[tuple[int, int]]
+        (origin, destination) of each column.
+    ratios : np.ndarray
+        Target ratio of each route when the values were last updated.
+    links : scipy.sparse.csr_matrix
+        Link-zone pair route ratios, shape (n_links, n_zone_pairs).
+    turns : scipy.sparse.csr_matrix
+        Turn-zone pair route ratios, shape (n_turns, n_zone_pairs).
+    """
+    __slots__ = ['incidence', 'zone_pairs', 'ratios', 'links', 'turns',
+                 '_route_od', '_link_coo', '_turn_coo', '_link_index', '_turn_index']
+
+    def __init__(self, net: 'Network'):
+        """Build the index for the current routes in the network.
+
+        Parameters
+        ----------
+        net : Network
+            Network with links, turns, and OD routes initialized.
+        """
+        self.incidence: RouteIncidence = net.route_incidence()
+        self.zone_pairs = [(od.origin, od.destination) for od in net.od_pairs]
+
+        self._route_od = np.repeat(np.arange(len(net.od_pairs)),
+                                   [len(od.routes) for od in net.od_pairs])
+
+        links = self.incidence.links.tocoo()
+        turns = self.incidence.turns.tocoo()
+        self._link_coo = (links.row, links.col, links.data)
+        self._turn_coo = (turns.row, turns.col, turns.data)
+
+        self._link_index = {key: e for e, key in enumerate(self.incidence.link_keys)}
+        self._turn_index = {key: t for t, key in enumerate(self.incidence.turn_keys)}
+
+        self.update_ratios()
+
+    def current_ratios(self) -> np.ndarray:
+        """Return the target ratio of each route as it is now."""
+        return np.fromiter((route.target_ratio for route in self.incidence.routes),
+                           dtype=np.float64, count=self.incidence.n_routes)
+
+    def is_current(self, net: 'Network') -> bool:
+        """True if the network routes have not changed since the index was built.
+
+        Changes to the route target ratios are not checked, see update_ratios().
+        """
+        return net.route_incidence() is self.incidence
+
+    def update_ratios(self, ratios: np.ndarray = None) -> None:
+        """Recompute the index values from the route target ratios.
+
+        Parameters
+        ----------
+        ratios : np.ndarray, optional
+            Target ratio of each route in RouteIncidence.routes order. By default
+            None, which reads the target_ratio of each route.
+        """
+        if ratios is None:
+            ratios = self.current_ratios()
+
+        self.ratios = ratios
+
+        # Zero ratios are kept as explicit entries, so zone pairs with a
+        # zero ratio route still appear in the results.
+        self.links = self._ratio_matrix(self._link_coo, ratios, self.incidence.links.shape[0])
+        self.turns = self._ratio_matrix(self._turn_coo, ratios, self.incidence.turns.shape[0])
+
+    def _ratio_matrix(self, coo: tuple, ratios: np.ndarray, n_rows: int) -> sparse.csr_matrix:
+        """Element-zone pair matrix from element-route incidence entries."""
+        rows, cols, counts = coo
+        matrix = sparse.csr_matrix(
+            (counts * ratios[cols], (rows, self._route_od[cols])),
+            shape=(n_rows, len(self.zone_pairs)))
+        # Sums routes of the same zone pair and sorts each row by zone pair.
+        matrix.sum_duplicates()
+        return matrix
+
+    def link(self, i: int, j: int) -> dict[tuple[int, int], float]:
+        """Return the zone pairs, and their route ratio, through link (i, j)."""
+        return self._row(self.links, self._link_index[(i, j)])
+
+    def turn(self, i: int, j: int, k: int) -> dict[tuple[int, int], float]:
+        """Return the zone pairs, and their route ratio, through turn (i, j, k)."""
+        return self._row(self.turns, self._turn_index[(i, j, k)])
+
+    def routes_through(self, key: tuple[int, int] | tuple[int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+        """Return the routes that use a link or turn.
+
+        Parameters
+        ----------
+        key : tuple[int, int] | tuple[int, int, int]
+            Link key (i, j) or turn key (i, j, k).
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Route ids (RouteIncidence.routes order) and the number of times each
+            route uses the link or turn.
+        """
+        if len(key) == 2:
+            matrix, row = self.incidence.links, self._link_index[key]
+        else:
+            matrix, row = self.incidence.turns, self._turn_index[key]
+
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        return matrix.indices[start:end], matrix.data[start:end]
+
+    def zone_pairs_through(self, key: tuple[int, int] | tuple[int, int, int]
+                           ) -> list[tuple[tuple[int, int], float, float]]:
+        """Return the zone pairs that use a link or turn, with their route 
+        ratio and assigned volume through it.
+
+        Ratios and volumes are read from the routes when called, so they are 
+        current even if update_ratios() has not been called.
+
+        Parameters
+        ----------
+        key : tuple[int, int] | tuple[int, int, int]
+            Link key (i, j) or turn key (i, j, k).
+
+        Returns
+        -------
+        list[tuple[tuple[int, int], float, float]]
+            (zone pair, ratio, volume) of each zone pair, in Network.od_pairs order.
+        """
+        route_ids, counts = self.routes_through(key)
+        routes = self.incidence.routes
+
+        results = []
+        last_zone_pair = -1
+        for r, n, z in zip(route_ids.tolist(), counts.tolist(), self._route_od[route_ids].tolist()):
+            route = routes[r]
+            ratio = route.target_ratio * n
+            volume = route.assigned_volume * n
+
+            # Routes of one zone pair have consecutive route ids.
+            if z == last_zone_pair:
+                zone_pair, prev_ratio, prev_volume = results[-1]
+                results[-1] = (zone_pair, prev_ratio + ratio, prev_volume + volume)
+            else:
+                results.append((self.zone_pairs[z], ratio, volume))
+                last_zone_pair = z
+
+        return results
+
+    def link_dict(self, rows: list[int] = None) -> dict[tuple[int, int], dict[tuple[int, int], float]]:
+        """Return the select-link results as nested dicts, {link key: {zone pair: ratio}}.
+
+        Parameters
+        ----------
+        rows : list[int], optional
+            Link ids to include, by default None which includes every link.
+        """
+        return self._dict(self.links, self.incidence.link_keys, rows)
+
+    def turn_dict(self, rows: list[int] = None) -> dict[tuple[int, int, int], dict[tuple[int, int], float]]:
+        """Return the select-turn results as nested dicts, {turn key: {zone pair: ratio}}.
+
+        Parameters
+        ----------
+        rows : list[int], optional
+            Turn ids to include, by default None which includes every turn.
+        """
+        return self._dict(self.turns, self.incidence.turn_keys, rows)
+
+    def _row(self, matrix: sparse.csr_matrix, row: int) -> dict[tuple[int, int], float]:
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        zone_pairs = self.zone_pairs
+        return {zone_pairs[z]: v for z, v in zip(matrix.indices[start:end].tolist(),
+                                                 matrix.data[start:end].tolist())}
+
+    def _dict(self, matrix: sparse.csr_matrix, keys: list, rows: list[int] = None) -> dict:
+        if rows is None:
+            rows = range(len(keys))
+        return {keys[e]: self._row(matrix, e) for e in rows}
@@ -0,0 +1,60 @@
+"""Spatial index of the Network nodes for nearest node searches."""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+if TYPE_CHECKING:
+    from .net import Network
+
+
+class NodeSpatialIndex():
+    """KD-tree of the node x, y coordinates.
+
+    The index is a snapshot of the node positions when it was built. Build a
+    new index after adding or moving nodes.
+
+    Attributes
+    ----------
+    node_keys : np.ndarray
+        Network node key of each point in the tree.
+    tree : scipy.spatial.cKDTree
+        KD-tree of the node coordinates.
+    """
+    __slots__ = ['node_keys', 'tree']
+
+    def __init__(self, net: 'Network'):
+        """Build the index from the current node coordinates.
+
+        Parameters
+        ----------
+        net : Network
+            Network with nodes.
+        """
+        nodes = list(net.nodes())
+        self.node_keys = np.fromiter((node.key for node in nodes), dtype=np.int64, count=len(nodes))
+        xy = np.array([(node.x, node.y) for node in nodes], dtype=np.float64).reshape(-1, 2)
+        self.tree = cKDTree(xy)
+
+    def closest(self, points) -> tuple[np.ndarray, np.ndarray]:
+        """Find the closest node to each point.
+
+        Parameters
+        ----------
+        points : array_like
+            x, y coordinates, shape (n, 2).
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Node key of the closest node to each point, and the distance to it.
+            If the network has no nodes the keys are -1 and the distances inf.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+        if len(self.node_keys) == 0:
+            return np.full(len(points), -1, dtype=np.int64), np.full(len(points), np.inf)
+
+        dist, index = self.tree.query(points)
+        return self.node_keys[index], dist
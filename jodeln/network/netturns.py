@@ -1,12 +1,21 @@
-from dataclasses import dataclass
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .netcsr import NetCSR
+
 
-@dataclass(slots=True)
 class TurnData():
     """Data on Network turns.
-    
+
     A turn is a sequence of three consecutive nodes: A-B-C. In this case "B"
     is the intersection, A is upstream, and C is downstream.
 
+    TurnData objects are created on demand by TurnStore. Reads and writes go
+    directly to the TurnStore arrays.
+
     Attributes
     ----------
     key: tuple[int, int, int]
@@ -22,9 +31,271 @@ class TurnData():
     geh: float
         GEH statistic comparing the target_volume and assigned_volume.
     """
-    key: tuple[int, int, int]
-    name: str
-    seed_volume: float
-    target_volume: float
-    assigned_volume: float
-    geh: float
\ No newline at end of file
+    __slots__ = ('_store', '_id')
+
+    def __init__(self, store: 'TurnStore', turn_id: int) -> None:
+        self._store = store
+        self._id = turn_id
+
+    @property
+    def key(self) -> tuple[int, int, int]:
+        return self._store.key(self._id)
+
+    @property
+    def name(self) -> str:
+        return self._store.name(self._id)
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self._store.set_name(self._id, value)
+
+    @property
+    def seed_volume(self) -> float:
+        return float(self._store.seed_volume[self._id])
+
+    @seed_volume.setter
+    def seed_volume(self, value: float) -> None:
+        self._store.seed_volume[self._id] = value
+
+    @property
+    def target_volume(self) -> float:
+        return float(self._store.target_volume[self._id])
+
+    @target_volume.setter
+    def target_volume(self, value: float) -> None:
+        self._store.target_volume[self._id] = value
+
+    @property
+    def assigned_volume(self) -> float:
+        return float(self._store.assigned_volume[self._id])
+
+    @assigned_volume.setter
+    def assigned_volume(self, value: float) -> None:
+        self._store.assigned_volume[self._id] = value
+
+    @property
+    def geh(self) -> float:
+        return float(self._store.geh[self._id])
+
+    @geh.setter
+    def geh(self, value: float) -> None:
+        self._store.geh[self._id] = value
+
+    def _fields(self) -> tuple:
+        return (self.key, self.name, self.seed_volume, self.target_volume,
+                self.assigned_volume, self.geh)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TurnData):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        key, name, seed, target, assigned, geh = self._fields()
+        return (f'TurnData(key={key}, name={name!r}, seed_volume={seed}, '
+                f'target_volume={target}, assigned_volume={assigned}, geh={geh})')
+
+
+class TurnStore(Mapping):
+    """All the turns of a network, stored in flat arrays.
+
+    Turns are grouped by their middle node. The turns through node index v
+    are turn ids offsets[v] to offsets[v + 1] - 1: every incoming link of v
+    (in NetCSR link id order) paired with every outgoing link of v. A turn id
+    is found from its two link ids without a search:
+
+        turn id = offsets[v] + in_rank[in link] * n_out[v] + (out link - csr.offsets[v])
+
+    Dict-style access by turn key (i, j, k) returns a TurnData view of the
+    arrays. Only turns that were renamed store a name, other turns are named
+    'i_j_k'.
+
+    Attributes
+    ----------
+    csr : NetCSR
+        CSR view of the network the turns were built from.
+    offsets : np.ndarray
+        First turn id of each middle node index. Length n_nodes + 1.
+    in_link : np.ndarray
+        Link id of the incoming link i-j of each turn.
+    out_link : np.ndarray
+        Link id of the outgoing link j-k of each turn.
+    in_rank : np.ndarray
+        Position of each link among the incoming links of its downstream node.
+    seed_volume : np.ndarray
+        Seed volume of each turn.
+    target_volume : np.ndarray
+        Target volume of each turn. -1 if the turn has no target.
+    assigned_volume : np.ndarray
+        Assigned volume of each turn.
+    geh : np.ndarray
+        GEH of each turn.
+    """
+    __slots__ = ('csr', 'offsets', 'in_link', 'out_link', 'in_rank', 'seed_volume',
+                 'target_volume', 'assigned_volume', 'geh', '_names', '_sources')
+
+    def __init__(self, csr: 'NetCSR' = None, offsets: np.ndarray = None,
+                 in_link: np.ndarray = None, out_link: np.ndarray = None,
+                 in_rank: np.ndarray = None) -> None:
+        """Build the turns of the network.
+
+        Parameters
+        ----------
+        csr : NetCSR, optional
+            CSR view of the network. By default None, which creates an empty store.
+        offsets, in_link, out_link, in_rank : np.ndarray, optional
+            Turn arrays of a TurnStore built earlier from the same csr, e.g.
+            loaded from a snapshot. Used as they are instead of being rebuilt.
+        """
+        self.csr = csr
+        self._names: dict[int, str] = {}
+
+        if csr is not None and offsets is not None:
+            self._sources = np.repeat(np.arange(csr.n_nodes), np.diff(csr.offsets))
+            self.offsets = offsets
+            self.in_link = in_link
+            self.out_link = out_link
+            self.in_rank = in_rank
+        elif csr is None:
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.in_link = np.zeros(0, dtype=np.int64)
+            self.out_link = np.zeros(0, dtype=np.int64)
+            self.in_rank = np.zeros(0, dtype=np.int64)
+            self._sources = np.zeros(0, dtype=np.int64)
+        else:
+            n_nodes = csr.n_nodes
+            n_out = np.diff(csr.offsets)
+
+            # Source node index of each link.
+            self._sources = np.repeat(np.arange(n_nodes), n_out)
+
+            # Incoming links of each node, in link id order.
+            in_order = np.argsort(csr.targets, kind='stable')
+            n_in = np.bincount(csr.targets, minlength=n_nodes)
+            in_offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+            np.cumsum(n_in, out=in_offsets[1:])
+
+            self.in_rank = np.empty(csr.n_links, dtype=np.int64)
+            self.in_rank[in_order] = np.arange(csr.n_links) - in_offsets[csr.targets[in_order]]
+
+            n_turns = n_in * n_out
+            self.offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+            np.cumsum(n_turns, out=self.offsets[1:])
+
+            # For each turn: its middle node, and its position within the middle node.
+            middle = np.repeat(np.arange(n_nodes), n_turns)
+            local = np.arange(self.offsets[-1]) - self.offsets[middle]
+            n_out_middle = n_out[middle]
+
+            self.in_link = in_order[in_offsets[middle] + local // np.maximum(n_out_middle, 1)]
+            self.out_link = csr.offsets[middle] + local % np.maximum(n_out_middle, 1)
+
+        n = len(self.in_link)
+        self.seed_volume = np.zeros(n, dtype=np.float64)
+        self.target_volume = np.full(n, -1, dtype=np.float64)
+        self.assigned_volume = np.zeros(n, dtype=np.float64)
+        self.geh = np.zeros(n, dtype=np.float64)
+
+    @property
+    def n_turns(self) -> int:
+        return len(self.in_link)
+
+    def turn_id(self, i: int, j: int, k: int) -> int:
+        """Return the turn id of turn key (i, j, k).
+
+        Raises
+        ------
+        KeyError
+            If the turn is not in the network.
+        """
+        if self.csr is None:
+            raise KeyError((i, j, k))
+
+        link_index = self.csr.link_index
+        e_in = link_index[(i, j)]
+        e_out = link_index[(j, k)]
+
+        v = self.csr.node_index[j]
+        out_start = self.csr.offsets[v]
+        n_out = self.csr.offsets[v + 1] - out_start
+        return int(self.offsets[v] + self.in_rank[e_in] * n_out + (e_out - out_start))
+
+    def turn_ids_from_link(self, i: int, j: int) -> np.ndarray:
+        """Return the ids of the turns i-j-k that start with link (i, j)."""
+        e_in = self.csr.link_index[(i, j)]
+        v = self.csr.node_index[j]
+        n_out = self.csr.offsets[v + 1] - self.csr.offsets[v]
+        start = self.offsets[v] + self.in_rank[e_in] * n_out
+        return np.arange(start, start + n_out)
+
+    def turn_ids_to_link(self, j: int, k: int) -> np.ndarray:
+        """Return the ids of the turns i-j-k that end with link (j, k)."""
+        e_out = self.csr.link_index[(j, k)]
+        v = self.csr.node_index[j]
+        out_start = self.csr.offsets[v]
+        n_out = self.csr.offsets[v + 1] - out_start
+        return np.arange(self.offsets[v] + (e_out - out_start), self.offsets[v + 1], n_out)
+
+    def key(self, turn_id: int) -> tuple[int, int, int]:
+        """Return the turn key (i, j, k) of a turn id."""
+        node_keys = self.csr.node_keys
+        e_in = self.in_link[turn_id]
+        return (int(node_keys[self._sources[e_in]]),
+                int(node_keys[self.csr.targets[e_in]]),
+                int(node_keys[self.csr.targets[self.out_link[turn_id]]]))
+
+    def keys_array(self) -> np.ndarray:
+        """Return the turn key of every turn id, shape (n_turns, 3)."""
+        if self.csr is None:
+            return np.zeros((0, 3), dtype=np.int64)
+
+        node_keys = self.csr.node_keys
+        return np.column_stack((node_keys[self._sources[self.in_link]],
+                                node_keys[self.csr.targets[self.in_link]],
+                                node_keys[self.csr.targets[self.out_link]]))
+
+    def name(self, turn_id: int) -> str:
+        """Return the name of a turn id."""
+        name = self._names.get(turn_id)
+        if name is None:
+            i, j, k = self.key(turn_id)
+            name = f'{i}_{j}_{k}'
+        return name
+
+    def set_name(self, turn_id: int, name: str) -> None:
+        """Rename a turn id."""
+        self._names[turn_id] = name
+
+    def renamed(self) -> dict[int, str]:
+        """Return the turn id and name of every turn that was renamed."""
+        return dict(self._names)
+
+    def __getitem__(self, key: tuple[int, int, int]) -> TurnData:
+        try:
+            return TurnData(self, self.turn_id(*key))
+        except (KeyError, TypeError, ValueError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        try:
+            self.turn_id(*key)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[tuple[int, int, int]]:
+        for key in self.keys_array().tolist():
+            yield tuple(key)
+
+    def __len__(self) -> int:
+        return self.n_turns
+
+    def items(self):
+        """Turn key and TurnData of every turn, in turn id order."""
+        for t, key in enumerate(self.keys_array().tolist()):
+            yield tuple(key), TurnData(self, t)
+
+    def values(self):
+        """TurnData of every turn, in turn id order."""
+        for t in range(self.n_turns):
+            yield TurnData(self, t)
@@ -0,0 +1,165 @@
+"""On-disk cache of the shortest routes found by Network.init_routes.
+
+Routes are stored under a hash of everything the shortest route search depends
+on: the node keys, the links and their costs, and the origin and destination
+nodes. Reloading the same nodes and links (for example, with new count files)
+reads the routes from the cache instead of searching the network again.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from .netcsr import NetCSR
+
+# Increment when the cached file layout or route search changes.
+CACHE_VERSION = 1
+
+# Default size limit of the cache folder, in bytes.
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class RouteCache():
+    """Folder of cached route searches, one .npz file per network.
+
+    When the files in the folder exceed max_bytes, the least recently used
+    files are deleted.
+
+    Attributes
+    ----------
+    folder : str
+        Folder containing the cached routes.
+    max_bytes : int
+        Size limit of the cached files.
+    """
+    __slots__ = ['folder', 'max_bytes']
+
+    def __init__(self, folder: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(csr: NetCSR, origins: list[int], destinations: list[int]) -> str:
+        """Hash of the network topology, link costs, origins, and destinations.
+
+        Parameters
+        ----------
+        csr : NetCSR
+            CSR view of the network.
+        origins : list[int]
+            Origin node indices.
+        destinations : list[int]
+            Destination node indices.
+
+        Returns
+        -------
+        str
+            Hex digest that identifies the route search.
+        """
+        h = hashlib.sha256()
+        h.update(f'jodeln-routes-{CACHE_VERSION}'.encode())
+
+        for array in (csr.node_keys, csr.offsets, csr.targets):
+            h.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+
+        h.update(np.ascontiguousarray(csr.cost, dtype=np.float64).tobytes())
+        h.update(np.asarray(origins, dtype=np.int64).tobytes())
+        h.update(b'|')
+        h.update(np.asarray(destinations, dtype=np.int64).tobytes())
+
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, f'{key}.npz')
+
+    def get(self, key: str) -> list[list[list[int]]] | None:
+        """Return the cached routes for the key, or None if they are not cached.
+
+        Routes are node index sequences, route_trees[origin][destination], in
+        the order of the origins and destinations used to create the key.
+        """
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                shape = data['shape'].tolist()
+                offsets = data['offsets'].tolist()
+                nodes = data['nodes'].tolist()
+        except (OSError, KeyError, ValueError):
+            # Missing, or a partly written / corrupt file.
+            return None
+
+        n_origins, n_destinations = shape
+        route_trees = []
+        for o in range(n_origins):
+            start = o * n_destinations
+            route_trees.append([nodes[offsets[r]:offsets[r + 1]]
+                                for r in range(start, start + n_destinations)])
+
+        # Mark as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return route_trees
+
+    def put(self, key: str, route_trees: list[list[list[int]]]) -> None:
+        """Store routes for the key, then evict old files if over max_bytes.
+
+        Parameters
+        ----------
+        key : str
+            Key from RouteCache.key().
+        route_trees : list[list[list[int]]]
+            Node index sequence of each route, route_trees[origin][destination].
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        n_origins = len(route_trees)
+        n_destinations = len(route_trees[0]) if n_origins > 0 else 0
+
+        lengths = [len(seq) for tree in route_trees for seq in tree]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        nodes = np.fromiter((u for tree in route_trees for seq in tree for u in seq),
+                            dtype=np.int64, count=int(offsets[-1]))
+
+        # Write to a temporary file then rename, so a reader never sees a partial file.
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     shape=np.array([n_origins, n_destinations], dtype=np.int64),
+                     offsets=offsets,
+                     nodes=nodes)
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used files until the cache fits in max_bytes."""
+        try:
+            entries = [entry for entry in os.scandir(self.folder)
+                       if entry.is_file() and entry.name.endswith('.npz')]
+        except OSError:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+        total = 0
+        for entry in entries:
+            total += entry.stat().st_size
+            if total > self.max_bytes:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        """Delete all cached files."""
+        max_bytes = self.max_bytes
+        self.max_bytes = -1
+        self.evict()
+        self.max_bytes = max_bytes
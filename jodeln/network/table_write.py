@@ -0,0 +1,301 @@
+"""Write column tables to csv or to a columnar binary file.
+
+Exporters gather their rows into numpy column arrays and pass them here in
+chunks, instead of writing one row at a time.
+
+Supported formats:
+
+- 'csv': comma separated text with a header row.
+- 'arrow': Arrow IPC file. Requires pyarrow.
+- 'parquet': Parquet file. Requires pyarrow.
+- 'npz': numpy .npz archive with one array per column.
+- 'binary': 'arrow' if pyarrow is installed, otherwise 'npz'.
+
+Any format can be compressed with 'gzip' or 'zstd' (see COMPRESSIONS). csv
+files are compressed as a whole, npz archives are deflated, and Arrow and
+Parquet use their own compression.
+"""
+
+import os
+import csv
+import gzip
+import io
+import shutil
+import tempfile
+import zipfile
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+if TYPE_CHECKING:
+    from .net import Network
+
+
+EXPORT_FORMATS = ('csv', 'arrow', 'parquet', 'npz', 'binary')
+EXTENSIONS = {'csv': '.csv', 'arrow': '.arrow', 'parquet': '.parquet', 'npz': '.npz'}
+
+COMPRESSIONS = (None, 'gzip', 'zstd')
+COMPRESSED_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Number of rows gathered before each write.
+CHUNK_ROWS = 100_000
+
+
+def resolve_format(fmt: str) -> str:
+    """Return the format that will be written for a requested format.
+
+    'binary' resolves to 'arrow' or 'npz'. Arrow and Parquet fall back to
+    'npz' if pyarrow is not installed.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}. Expected one of {EXPORT_FORMATS}.")
+
+    if fmt == 'binary':
+        return 'arrow' if pa is not None else 'npz'
+
+    if fmt in ('arrow', 'parquet') and pa is None:
+        print(f"pyarrow is not installed. Writing npz instead of {fmt}.")
+        return 'npz'
+
+    return fmt
+
+
+def resolve_compression(compression: str) -> str:
+    """Return the compression that will be written for a requested compression.
+
+    zstd falls back to gzip if the zstandard package is not installed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Expected one of {COMPRESSIONS}.")
+
+    if compression == 'zstd' and zstandard is None:
+        print("zstandard is not installed. Compressing with gzip instead of zstd.")
+        return 'gzip'
+
+    return compression
+
+
+def open_text(path: str, compression: str = None):
+    """Open a text file for writing, compressed if requested.
+
+    Parameters
+    ----------
+    path : str
+        Output file. The compressed file extension is added if compressed.
+    compression : str, optional
+        None, 'gzip', or 'zstd'. Must already be resolved, see resolve_compression().
+
+    Returns
+    -------
+    tuple[str, file object]
+        Output file and the open text file.
+    """
+    if compression is None:
+        return path, open(path, 'w', newline='')
+
+    path += COMPRESSED_EXTENSIONS[compression]
+    if compression == 'gzip':
+        return path, gzip.open(path, 'wt', newline='')
+
+    raw = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    return path, io.TextIOWrapper(raw, newline='')
+
+
+def node_names(net: 'Network') -> np.ndarray:
+    """Return the name of every node, indexed by node key.
+
+    Use to convert arrays of node keys to names in one step: names[keys].
+    Names are fixed width strings.
+    """
+    keys = []
+    names = []
+    for key, node in net.nodes(True):
+        keys.append(key)
+        names.append(str(node.name))
+
+    names = np.array(names, dtype=str)
+    lookup = np.zeros(max(keys, default=-1) + 1, dtype=names.dtype)
+    lookup[keys] = names
+    return lookup
+
+
+class TableWriter():
+    """Write a table in chunks of columns.
+
+    Use as a context manager. Each call to write() appends a chunk of rows,
+    so only one chunk is held in memory at a time.
+
+    npz archives cannot be appended to, so each npz column is filled in a
+    temporary memory-mapped file and the archive is packed on close. n_rows
+    is required to write npz, and string columns must have the same fixed
+    width string dtype in every chunk.
+
+    Arrow IPC files only support lz4 and zstd compression, so any requested
+    compression is written as zstd.
+
+    Attributes
+    ----------
+    path : str
+        Output file, including the extension of the format.
+    fmt : str
+        Resolved output format.
+    """
+
+    def __init__(self, path: str, columns: list[str], fmt: str = 'csv', n_rows: int = None,
+                 compression: str = None):
+        """Open a table for writing.
+
+        Parameters
+        ----------
+        path : str
+            Output file without an extension.
+        columns : list[str]
+            Column names.
+        fmt : str, optional
+            Output format, by default 'csv'. See EXPORT_FORMATS.
+        n_rows : int, optional
+            Total number of rows. Required for npz output.
+        compression : str, optional
+            None (default), 'gzip', or 'zstd'.
+        """
+        self.fmt = resolve_format(fmt)
+        self.compression = resolve_compression(compression)
+        self.path = path + EXTENSIONS[self.fmt]
+        self.columns = list(columns)
+        self.n_rows = n_rows
+
+        self._file = None
+        self._writer = None
+        self._tmp_folder = None
+        self._npy = None
+        self._row = 0
+
+    def __enter__(self) -> 'TableWriter':
+        if self.fmt == 'csv':
+            self.path, self._file = open_text(self.path, self.compression)
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+        elif self.fmt == 'npz':
+            if self.n_rows is None:
+                raise ValueError("n_rows is required to write npz.")
+            self._tmp_folder = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.path)))
+            self._npy = {}
+        return self
+
+    def write(self, data: dict[str, np.ndarray]) -> None:
+        """Append rows. data has one array per column, all the same length."""
+        n = len(data[self.columns[0]])
+        if n == 0:
+            return
+
+        if self.fmt == 'csv':
+            self._writer.writerows(zip(*(_as_list(data[c]) for c in self.columns)))
+
+        elif self.fmt == 'npz':
+            for c in self.columns:
+                self._npy_column(c, data[c])[self._row:self._row + n] = data[c]
+
+        else:
+            batch = pa.record_batch([pa.array(_as_list(data[c])) for c in self.columns],
+                                    names=self.columns)
+            if self._writer is None:
+                if self.fmt == 'arrow':
+                    options = pa.ipc.IpcWriteOptions(
+                        compression='zstd' if self.compression else None)
+                    self._writer = pa.ipc.new_file(self.path, batch.schema, options=options)
+                else:
+                    self._writer = pa.parquet.ParquetWriter(
+                        self.path, batch.schema, compression=self.compression or 'none')
+
+            if self.fmt == 'arrow':
+                self._writer.write_batch(batch)
+            else:
+                self._writer.write_table(pa.Table.from_batches([batch]))
+
+        self._row += n
+
+    def _npy_column(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Temporary .npy file of one npz column. Created on the first chunk."""
+        column = self._npy.get(name)
+        if column is None:
+            # String columns must be fixed width (e.g. from node_names()), so
+            # the archive does not need pickle and every chunk fits the first.
+            dtype = np.asarray(values).dtype
+            column = np.lib.format.open_memmap(os.path.join(self._tmp_folder, name + '.npy'),
+                                               mode='w+', dtype=dtype, shape=(self.n_rows,))
+            self._npy[name] = column
+        return column
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self.fmt == 'csv':
+                self._file.close()
+            elif self.fmt == 'npz':
+                if exc_type is None:
+                    self._write_npz()
+            elif self._writer is not None:
+                self._writer.close()
+        finally:
+            if self._tmp_folder is not None:
+                self._npy = None
+                shutil.rmtree(self._tmp_folder, ignore_errors=True)
+
+    def _write_npz(self) -> None:
+        method = zipfile.ZIP_DEFLATED if self.compression else zipfile.ZIP_STORED
+        with zipfile.ZipFile(self.path, 'w', method, allowZip64=True) as zf:
+            for c in self.columns:
+                column = self._npy.get(c)
+                if column is None:
+                    # No rows were written.
+                    np.save(os.path.join(self._tmp_folder, c + '.npy'), np.zeros(0))
+                else:
+                    column.flush()
+                    del self._npy[c], column
+                zf.write(os.path.join(self._tmp_folder, c + '.npy'), c + '.npy')
+
+
+def write_table(path: str, data: dict[str, np.ndarray], fmt: str = 'csv',
+                compression: str = None) -> str:
+    """Write a whole table at once, in CHUNK_ROWS chunks.
+
+    Parameters
+    ----------
+    path : str
+        Output file without an extension.
+    data : dict[str, np.ndarray]
+        Column name and values of each column, in output order.
+    fmt : str, optional
+        Output format, by default 'csv'. See EXPORT_FORMATS.
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
+
+    Returns
+    -------
+    str
+        Output file, including the extension of the format.
+    """
+    columns = list(data)
+    n_rows = len(data[columns[0]]) if columns else 0
+
+    with TableWriter(path, columns, fmt, n_rows, compression) as writer:
+        for start in range(0, n_rows, CHUNK_ROWS):
+            writer.write({c: v[start:start + CHUNK_ROWS] for c, v in data.items()})
+
+    return writer.path
+
+
+def _as_list(values) -> list:
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
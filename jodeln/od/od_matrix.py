@@ -1,16 +1,123 @@
-from copy import deepcopy
+from collections.abc import Iterable, Mapping, MutableMapping
+
+import numpy as np
+from scipy import sparse
+
+
+class ODVolume(MutableMapping):
+    """Dict-style access to the volumes of an ODMatrix.
+
+    Keys are (origin, destination) node keys, for every origin and destination
+    in the matrix. Reads and writes go directly to ODMatrix.array. As with the
+    original dict storage, writes do not update the margin sums until 
+    ODMatrix.set_margin_sums() is called.
+    """
+    __slots__ = ('_od',)
+
+    def __init__(self, od: 'ODMatrix') -> None:
+        self._od = od
+
+    def __getitem__(self, key: tuple[int, int]) -> float:
+        o, d = key
+        return float(self._od.array[self._od.o_index[o], self._od.d_index[d]])
+
+    def __setitem__(self, key: tuple[int, int], value: float) -> None:
+        o, d = key
+        i = self._od.o_index[o]
+        j = self._od.d_index[d]
+        array = self._od.array
+
+        if not sparse.issparse(array):
+            array[i, j] = value
+            return
+
+        # A stored entry is changed in place. Adding an entry changes the
+        # sparse structure, use ODMatrix.set_volumes() to write many at once.
+        start, end = array.indptr[i], array.indptr[i + 1]
+        stored = np.flatnonzero(array.indices[start:end] == j)
+        if len(stored):
+            array.data[start + stored[0]] = value
+        else:
+            self._od._set_sparse(np.array([i]), np.array([j]), np.array([value], dtype=np.float64))
+
+    def __delitem__(self, key: tuple[int, int]) -> None:
+        raise TypeError("OD pairs cannot be removed from an ODMatrix.")
+
+    def __contains__(self, key) -> bool:
+        try:
+            o, d = key
+        except (TypeError, ValueError):
+            return False
+        return o in self._od.o_index and d in self._od.d_index
+
+    def __iter__(self):
+        for o in self._od.origins:
+            for d in self._od.destinations:
+                yield (o, d)
+
+    def __len__(self) -> int:
+        return len(self._od.origins) * len(self._od.destinations)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class ODMargin(Mapping):
+    """Read-only dict-style access to the origin or destination sums of an ODMatrix.
+
+    Keys are zone node keys.
+    """
+    __slots__ = ('_od', '_axis')
+
+    def __init__(self, od: 'ODMatrix', axis: int) -> None:
+        self._od = od
+        self._axis = axis
+
+    def _zones(self) -> tuple[list[int], dict[int, int]]:
+        if self._axis == 0:
+            return self._od.origins, self._od.o_index
+        return self._od.destinations, self._od.d_index
+
+    def __getitem__(self, zone: int) -> float:
+        _, index = self._zones()
+        return float(self._od.margin_array(self._axis)[index[zone]])
+
+    def __contains__(self, zone) -> bool:
+        _, index = self._zones()
+        return zone in index
+
+    def __iter__(self):
+        zones, _ = self._zones()
+        return iter(zones)
+
+    def __len__(self) -> int:
+        zones, _ = self._zones()
+        return len(zones)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
 
 class ODMatrix:
     """OD Matrix data structure.
 
+    Volumes are stored in one 2-D float64 array, either a dense numpy array or a
+    scipy.sparse CSR matrix. Row i is origins[i], column j is destinations[j].
+
     Attributes
     ----------
-    volume: dict[tuple[int, int], float]
-        OD volume for zone pair
+    array: np.ndarray | scipy.sparse.csr_matrix
+        OD volumes, shape (len(origins), len(destinations)).
+    volume: ODVolume
+        OD volume for zone pair, dict-style access to array: volume[(o, d)]
     origins: list[int]
         List of origin nodes
     destination: list[int]
         List of destination nodes
+    o_index: dict[int, int]
+        Row of each origin node in array
+    d_index: dict[int, int]
+        Column of each destination node in array
     names_o: list[str]
         Origin zone names
     names_d: list[str]
@@ -19,37 +126,140 @@ class ODMatrix:
         Origin zone total target volumes
     targets_d: dict[int, float]
         Destination zone total target volumes
-    sums_o: dict[int, float]
-        Origin zone total volume
-    sums_d: dict[int, float]
-        Destination zone total volume
+    sums_o: ODMargin
+        Origin zone total volume, as of the last set_margin_sums() or set_array()
+    sums_d: ODMargin
+        Destination zone total volume, as of the last set_margin_sums() or set_array()
     """
-    __slots__ = ('volume', 'origins', 'destinations', 'names_o', 'names_d', 
-                 'targets_o', 'targets_d', 'sums_o', 'sums_d')
+    __slots__ = ('array', 'origins', 'destinations', 'o_index', 'd_index', 'names_o',
+                 'names_d', 'targets_o', 'targets_d', '_volume', '_sums_o_array', 
+                 '_sums_d_array')
 
     def __init__(self, volume, origins, destinations, names_o, names_d, targets_o, targets_d) -> None:
-        self.volume: dict[tuple[int, int], float] = volume
+        """Create an OD matrix.
+
+        volume is either a dict of {(o, d): volume}, where missing OD pairs are
+        zero, or a dense/sparse array of shape (len(origins), len(destinations)).
+        """
         self.origins: list[int] = origins
         self.destinations: list[int] = destinations
+        self.o_index: dict[int, int] = {o: i for i, o in enumerate(origins)}
+        self.d_index: dict[int, int] = {d: j for j, d in enumerate(destinations)}
         self.names_o: list[str] = names_o
         self.names_d: list[str] = names_d
         self.targets_o: dict[int, float] = targets_o
         self.targets_d: dict[int, float] = targets_d
 
-        self.sums_o: dict[int, float] = dict.fromkeys(self.origins, 0)
-        self.sums_d: dict[int, float] = dict.fromkeys(self.destinations, 0)
+        self._volume = ODVolume(self)
+
+        if isinstance(volume, Mapping):
+            array = np.zeros((len(origins), len(destinations)), dtype=np.float64)
+            for (o, d), v in volume.items():
+                array[self.o_index[o], self.d_index[d]] = v
+            volume = array
+        
+        self.set_array(volume)
+
+    @property
+    def volume(self) -> ODVolume:
+        return self._volume
+
+    @property
+    def sums_o(self) -> ODMargin:
+        return ODMargin(self, 0)
+
+    @property
+    def sums_d(self) -> ODMargin:
+        return ODMargin(self, 1)
+
+    @property
+    def is_sparse(self) -> bool:
+        return sparse.issparse(self.array)
+
+    def set_array(self, array) -> None:
+        """Replace all the OD volumes and update the margin sums.
+        
+        array has shape (len(origins), len(destinations)).
+        """
+        if sparse.issparse(array):
+            array = sparse.csr_matrix(array, dtype=np.float64)
+        else:
+            array = np.asarray(array, dtype=np.float64)
+
+        if array.shape != (len(self.origins), len(self.destinations)):
+            raise ValueError(f"OD array shape {array.shape} does not match "
+                             f"{len(self.origins)} origins and {len(self.destinations)} destinations.")
+
+        self.array = array
         self.set_margin_sums()
 
+    def pair_index(self, pairs: Iterable[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+        """Return the rows and columns in array of (origin, destination) node key pairs."""
+        o_index = self.o_index
+        d_index = self.d_index
+        index = np.array([(o_index[o], d_index[d]) for o, d in pairs], dtype=np.int64).reshape(-1, 2)
+        return index[:, 0], index[:, 1]
+
+    def volumes(self, pairs: Iterable[tuple[int, int]]) -> np.ndarray:
+        """Return the volume of each (origin, destination) pair, in one lookup."""
+        rows, cols = self.pair_index(pairs)
+        return np.asarray(self.array[rows, cols], dtype=np.float64).ravel()
+
+    def set_volumes(self, pairs: Iterable[tuple[int, int]], values) -> None:
+        """Set the volume of many (origin, destination) pairs and update the margin sums.
+
+        Writing the volumes in one batch changes the sparse structure once,
+        instead of once for every new pair as with volume[(o, d)] = value.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[int, int]]
+            Unique (origin, destination) node key pairs.
+        values : array_like
+            Volume of each pair.
+        """
+        rows, cols = self.pair_index(pairs)
+        values = np.asarray(values, dtype=np.float64)
+
+        if self.is_sparse:
+            self._set_sparse(rows, cols, values)
+        else:
+            self.array[rows, cols] = values
+
+        self.set_margin_sums()
+
+    def _set_sparse(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray) -> None:
+        """Replace the sparse array with one where array[rows, cols] = values.
+
+        Does not update the margin sums.
+        """
+        current = self.array.tocoo()
+        n_cols = self.array.shape[1]
+
+        # Stored entries that are not overwritten.
+        keep = ~np.isin(current.row.astype(np.int64) * n_cols + current.col,
+                        rows * n_cols + cols)
+
+        self.array = sparse.csr_matrix(
+            (np.concatenate((current.data[keep], values)),
+             (np.concatenate((current.row[keep], rows)), np.concatenate((current.col[keep], cols)))),
+            shape=self.array.shape)
+
+    def dense_array(self) -> np.ndarray:
+        """Return the OD volumes as a dense numpy array."""
+        if self.is_sparse:
+            return self.array.toarray()
+        return self.array
+
+    def margin_array(self, axis: int) -> np.ndarray:
+        """Origin (axis=0) or destination (axis=1) sums as an array."""
+        return self._sums_o_array if axis == 0 else self._sums_d_array
+
     def set_margin_sums(self):
-        for k in self.sums_o:
-            self.sums_o[k] = 0
-        
-        for k in self.sums_d:
-            self.sums_d[k] = 0
+        """Recompute the origin and destination sums."""
+        self._sums_o_array = np.asarray(self.array.sum(axis=1), dtype=np.float64).ravel()
+        self._sums_d_array = np.asarray(self.array.sum(axis=0), dtype=np.float64).ravel()
 
-        for (o, d), v in self.volume.items():
-            self.sums_o[o] += v
-            self.sums_d[d] += v
 
 def create_od_from_source(
         source_od: ODMatrix,
@@ -57,27 +267,29 @@ def create_od_from_source(
         copy_targets: bool = False
         ) -> ODMatrix:
     """Create an OD matrix based on the input source matrix.
-    
+
     If the copy parameters are False, then the new OD matrix is filled with zeros.
     """
     if copy_volume:
-        new_volume = deepcopy(source_od.volume)
+        new_volume = source_od.array.copy()
+    elif source_od.is_sparse:
+        new_volume = sparse.csr_matrix(source_od.array.shape, dtype=np.float64)
     else:
-        new_volume = dict.fromkeys(source_od.volume, 0)
+        new_volume = np.zeros_like(source_od.array)
 
     if copy_targets:
-        new_targets_o = deepcopy(source_od.targets_o)
-        new_targets_d = deepcopy(source_od.targets_d)
+        new_targets_o = dict(source_od.targets_o)
+        new_targets_d = dict(source_od.targets_d)
     else:
         new_targets_o = dict.fromkeys(source_od.targets_o, 0)
         new_targets_d = dict.fromkeys(source_od.targets_d, 0)
 
     return ODMatrix(
         volume=new_volume,
-        origins=deepcopy(source_od.origins),
-        destinations=deepcopy(source_od.destinations),
-        names_o=deepcopy(source_od.names_o),
-        names_d=deepcopy(source_od.names_d),
+        origins=list(source_od.origins),
+        destinations=list(source_od.destinations),
+        names_o=list(source_od.names_o),
+        names_d=list(source_od.names_d),
         targets_o=new_targets_o,
         targets_d=new_targets_d
-    )  
+    )
@@ -2,16 +2,35 @@
 """
 
 import csv
-from collections import OrderedDict
 
 from typing import TYPE_CHECKING
 
+import numpy as np
+from scipy import sparse
+
 from od.od_matrix import ODMatrix
 
 if TYPE_CHECKING:
     from ..network.net import Network
 
-def od_from_csv(od_csv, net: 'Network') -> ODMatrix:
+# OD matrices with at least this many zones are read into a sparse matrix
+# when od_from_csv is called with sparse_output=None.
+SPARSE_OD_ZONES = 2000
+
+class ZoneNotFoundError(KeyError):
+    """Raised when zones in an OD matrix file are not nodes in the Network.
+
+    Attributes
+    ----------
+    zone_names : list[str]
+        Zone names that were not found.
+    """
+    def __init__(self, zone_names: list[str]):
+        super().__init__(f'OD zones not found in network: {", ".join(zone_names)}')
+        self.zone_names = zone_names
+
+
+def od_from_csv(od_csv, net: 'Network', sparse_output: bool | None = False) -> ODMatrix:
     """Creates an OD object from a csv OD matrix.
     
     csv is a square OD matrix (n rows = n columns), zones are ordered the same in the rows
@@ -24,66 +43,90 @@ def od_from_csv(od_csv, net: 'Network') -> ODMatrix:
     C,0,0,0,0 
     D,10,12,12,0
 
+    The file is read twice. The first pass only reads the zone names, which are
+    checked against the network before any volumes are read. The second pass 
+    parses one row at a time straight into the OD array.
+
     Parameters
     ----------
     od_csv : str
         File path to OD csv file.
     net : Network
         Network to assign the OD to.
+    sparse_output : bool, optional
+        If True, zero cells are skipped and the OD volumes are stored in a 
+        sparse matrix. If None, the matrix is sparse if it has at least 
+        SPARSE_OD_ZONES zones. By default False.
 
     Returns
     -------
-    Dict
-        Keyed by a tuple of (origin name, destination name) with a value of 
-        the OD volume.
+    ODMatrix
+        OD matrix with rows and columns in the same zone order as the csv.
+
+    Raises
+    ------
+    ZoneNotFoundError
+        If any zone name is not a node in the network.
     """
-    
 
-    # temp_od contains the data as-is from the csv, before final format
     # order of rows defines order of columns - matrix is assumed square
-    # dictionary contains {zone: [volumes]}
-    temp_od = OrderedDict()
-
     with open(od_csv, newline='') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            temp_od[row[0]] = row[1:]
+        zones = [row[0] for row in csv.reader(f) if len(row) > 0]
+
+    missing = [name for name in zones if not _has_node(net, name)]
+    if len(missing) > 0:
+        raise ZoneNotFoundError(missing)
 
     # convert OD zone names to Network node indices
-    zones = list(temp_od.keys())
     zone_node_keys = [net.get_node_by_name(node_name)[0] for node_name in zones]
+    n_zones = len(zones)
 
-    # TODO: validate that OD matrix is applicable to Network.
-    # i.e. zones in OD are found in Network
+    if sparse_output is None:
+        sparse_output = n_zones >= SPARSE_OD_ZONES
 
-    # convert volume lists into a dictionary of {(o, d): volume}
-    od: dict[tuple[int, int], float] = {}
-    for o_name, volumes  in temp_od.items():
-        o_node_key = net.get_node_by_name(o_name)[0]
-        for i, v in enumerate(volumes):
-            od[(o_node_key, zone_node_keys[i])] = float(v)
+    if sparse_output:
+        indptr = [0]
+        indices = []
+        data = []
+    else:
+        volume = np.zeros((n_zones, n_zones), dtype=np.float64)
 
-    origins = set()
-    destinations = set()
+    with open(od_csv, newline='') as f:
+        rows = (row for row in csv.reader(f) if len(row) > 0)
+        for i, row in enumerate(rows):
+            if len(row) - 1 != n_zones:
+                raise ValueError(f"OD row for zone {row[0]} has {len(row) - 1} volumes, "
+                                 f"expected {n_zones}.")
+
+            row_volume = np.asarray(row[1:], dtype=np.float64)
+
+            if sparse_output:
+                nonzero = np.flatnonzero(row_volume)
+                indices.append(nonzero)
+                data.append(row_volume[nonzero])
+                indptr.append(indptr[-1] + len(nonzero))
+            else:
+                volume[i] = row_volume
 
-    # Assumes matrix has square dimensions.
-    for (o, d), v in od.items():
-        origins.add(o)
-        destinations.add(d)
+    if sparse_output:
+        volume = sparse.csr_matrix(
+            (np.concatenate(data) if n_zones > 0 else [], 
+             np.concatenate(indices) if n_zones > 0 else [], 
+             indptr),
+            shape=(n_zones, n_zones))
 
-    names_o = [net.node(o).name for o in origins]
-    names_d = [net.node(d).name for d in destinations]
+    names = [net.node(k).name for k in zone_node_keys]
 
     # Targets set to zero. Actual targets are obtained from a separate input file.
-    targets_o = dict.fromkeys(origins, 0)
-    targets_d = dict.fromkeys(destinations, 0)
+    targets_o = dict.fromkeys(zone_node_keys, 0)
+    targets_d = dict.fromkeys(zone_node_keys, 0)
 
     od_matrix = ODMatrix(
-        volume=od,
-        origins=list(origins),
-        destinations=list(destinations),
-        names_o=names_o,
-        names_d=names_d,
+        volume=volume,
+        origins=list(zone_node_keys),
+        destinations=list(zone_node_keys),
+        names_o=names,
+        names_d=list(names),
         targets_o=targets_o,
         targets_d=targets_d
     )
@@ -91,6 +134,15 @@ def od_from_csv(od_csv, net: 'Network') -> ODMatrix:
     return od_matrix
 
 
+def _has_node(net: 'Network', node_name: str) -> bool:
+    """Return True if the network has a node with the name."""
+    try:
+        net.get_node_by_name(node_name)
+    except KeyError:
+        return False
+    return True
+
+
 def import_zone_targets(zone_targets_csv, od_matrix: ODMatrix) -> None:
     """Import zone total target volumes for origin/destinations into the ODMatrix."""
     with open(zone_targets_csv, newline='') as f:
@@ -0,0 +1,110 @@
+"""Save and load an ODMatrix as a folder of binary numpy arrays.
+
+Dense matrices are saved as a single 2-D array that is memory-mapped when
+loaded. Sparse matrices are saved as their CSR data, indices, and indptr arrays.
+"""
+
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+from od.od_matrix import ODMatrix
+
+# Increment when the snapshot layout changes.
+SNAPSHOT_VERSION = 1
+
+
+def save_od(od: ODMatrix, folder: str) -> None:
+    """Save the OD volumes, zones, and zone targets to a folder.
+
+    Parameters
+    ----------
+    od : ODMatrix
+        OD matrix to save.
+    folder : str
+        Folder to save the snapshot arrays to. Created if it does not exist.
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    arrays = {
+        'origins': np.array(od.origins, dtype=np.int64),
+        'destinations': np.array(od.destinations, dtype=np.int64),
+        'names_o': np.array([str(n) for n in od.names_o], dtype=str),
+        'names_d': np.array([str(n) for n in od.names_d], dtype=str),
+        'targets_o_key': np.array(list(od.targets_o.keys()), dtype=np.int64),
+        'targets_o': np.array(list(od.targets_o.values()), dtype=np.float64),
+        'targets_d_key': np.array(list(od.targets_d.keys()), dtype=np.int64),
+        'targets_d': np.array(list(od.targets_d.values()), dtype=np.float64),
+    }
+
+    if od.is_sparse:
+        arrays['data'] = od.array.data
+        arrays['indices'] = od.array.indices
+        arrays['indptr'] = od.array.indptr
+    else:
+        arrays['volume'] = od.array
+
+    # Each file is replaced rather than overwritten, so a matrix loaded from
+    # the same folder keeps its memory-mapped volumes.
+    for name, array in arrays.items():
+        path = os.path.join(folder, f'{name}.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(path + '.tmp', path)
+
+    meta = {
+        'version': SNAPSHOT_VERSION,
+        'sparse': od.is_sparse,
+    }
+
+    with open(os.path.join(folder, 'od.json'), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_od(folder: str, mmap: bool = True) -> ODMatrix:
+    """Load an OD matrix saved with save_od.
+
+    Parameters
+    ----------
+    folder : str
+        Folder containing the snapshot arrays.
+    mmap : bool, optional
+        Memory-map a dense volume array instead of reading it into memory,
+        by default True. The mapping is read-only; call
+        ODMatrix.set_array() with a new array before editing volumes.
+
+    Returns
+    -------
+    ODMatrix
+        OD matrix as it was when saved.
+    """
+    with open(os.path.join(folder, 'od.json')) as f:
+        meta = json.load(f)
+
+    if meta['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"OD snapshot version {meta['version']} is not supported. "
+                         f"Expected version {SNAPSHOT_VERSION}.")
+
+    def load(name: str, mmap_mode=None) -> np.ndarray:
+        return np.load(os.path.join(folder, f'{name}.npy'), mmap_mode=mmap_mode)
+
+    origins = load('origins').tolist()
+    destinations = load('destinations').tolist()
+
+    if meta['sparse']:
+        volume = sparse.csr_matrix(
+            (load('data'), load('indices'), load('indptr')),
+            shape=(len(origins), len(destinations)))
+    else:
+        volume = load('volume', 'r' if mmap else None)
+
+    return ODMatrix(
+        volume=volume,
+        origins=origins,
+        destinations=destinations,
+        names_o=load('names_o').tolist(),
+        names_d=load('names_d').tolist(),
+        targets_o=dict(zip(load('targets_o_key').tolist(), load('targets_o').tolist())),
+        targets_d=dict(zip(load('targets_d_key').tolist(), load('targets_d').tolist())))
@@ -1,9 +1,15 @@
 """Export OD volumes.
+
+Tables are written in bulk chunks by table_write, to csv or a columnar binary
+file, see table_write.EXPORT_FORMATS.
 """
 
 from typing import TYPE_CHECKING
 import os
-import csv
+
+import numpy as np
+
+from network.table_write import node_names, write_table
 
 
 if TYPE_CHECKING:
@@ -11,7 +17,7 @@ if TYPE_CHECKING:
     from ..od.od_matrix import ODMatrix
 
 
-def export_od_as_list(net: 'Network', od_mat: 'ODMatrix', output_folder=None) -> None:
+def export_od_as_list(net: 'Network', od_mat: 'ODMatrix', output_folder=None, fmt='csv', compression=None) -> None:
     """Save the estimated OD to a csv file with one row per OD pair.
     
     csv columns are:
@@ -36,6 +42,10 @@ def export_od_as_list(net: 'Network', od_mat: 'ODMatrix', output_folder=None) ->
     output_folder : str, optional
         Folder to export OD file, by default None indicates the current working
         directory as returned by os.getcwd().
+    fmt : str, optional
+        Output format, by default 'csv'. See table_write.EXPORT_FORMATS.
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
     """
     
     if net.od_pairs is None:
@@ -51,22 +61,19 @@ def export_od_as_list(net: 'Network', od_mat: 'ODMatrix', output_folder=None) ->
 
     print('Output OD to: ', output_folder)
     
-    output_list_file = os.path.join(output_folder, 'exported_od_(list format).csv')
-    with open(output_list_file, 'w', newline='') as list_f:
-        
-        list_writer = csv.writer(list_f)
-        list_writer.writerow(["o_node", "d_node", "volume"])
+    names = node_names(net)
+    o_keys = np.array([od.origin for od in net.od_pairs], dtype=np.int64)
+    d_keys = np.array([od.destination for od in net.od_pairs], dtype=np.int64)
 
-        for od in net.od_pairs:
-            o_name = net.node(od.origin).name
-            d_name = net.node(od.destination).name
-            volume = od_mat.volume[(od.origin, od.destination)]
+    volume = od_mat.volumes((od.origin, od.destination) for od in net.od_pairs)
 
-            list_writer.writerow([o_name, d_name, volume])
+    write_table(os.path.join(output_folder, 'exported_od_(list format)'),
+                {"o_node": names[o_keys], "d_node": names[d_keys], "volume": volume},
+                fmt, compression)
 
 
 
-def export_od_by_route(net: 'Network', output_folder=None) -> None:
+def export_od_by_route(net: 'Network', output_folder=None, fmt='csv', compression=None) -> None:
     """Save the estimated OD to a csv file. One row per route.
 
     This export format allows showing the volume assigned to each route, if multiple 
@@ -95,6 +102,10 @@ def export_od_by_route(net: 'Network', output_folder=None) -> None:
     output_folder : str, optional
         Folder to export OD file, by default None indicates the current working
         directory as returned by os.getcwd().
+    fmt : str, optional
+        Output format, by default 'csv'. See table_write.EXPORT_FORMATS.
+    compression : str, optional
+        None (default), 'gzip', or 'zstd'.
     """
     
     if net.od_pairs is None:
@@ -106,15 +117,14 @@ def export_od_by_route(net: 'Network', output_folder=None) -> None:
 
     print('Output OD to: ', output_folder)
     
-    output_list_file = os.path.join(output_folder, 'exported_route_volumes.csv')
-    with open(output_list_file, 'w', newline='') as list_f:
-        
-        list_writer = csv.writer(list_f)
-        list_writer.writerow(["o_node", "d_node", "route", "volume"])
-
-        for od in net.od_pairs:
-            o_name = net.node(od.origin).name
-            d_name = net.node(od.destination).name
-            for route in od.routes:
-                list_writer.writerow([o_name, d_name, route.name, route.assigned_volume])
-    
+    names = node_names(net)
+    routes = [(od, route) for od in net.od_pairs for route in od.routes]
+    o_keys = np.array([od.origin for od, _ in routes], dtype=np.int64)
+    d_keys = np.array([od.destination for od, _ in routes], dtype=np.int64)
+
+    write_table(os.path.join(output_folder, 'exported_route_volumes'),
+                {"o_node": names[o_keys],
+                 "d_node": names[d_keys],
+                 "route": np.array([str(route.name) for _, route in routes], dtype=str),
+                 "volume": np.array([route.assigned_volume for _, route in routes], dtype=np.float64)},
+                fmt, compression)
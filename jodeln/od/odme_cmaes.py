@@ -1,21 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import cma
+import numpy as np
+from scipy import sparse
 
-from typing import TYPE_CHECKING
+from network.geh import geh_array
+from od.odme_progress import ODMEProgress
+from typing import TYPE_CHECKING, Callable
 
 if TYPE_CHECKING:
     from ..network.net import Network
+    from ..network.netincidence import RouteIncidence
     from .od_matrix import ODMatrix
 
-def objective_fn_prep_net_geh(net: 'Network'):
+
+def seed_volumes(net: 'Network', od_seed: 'ODMatrix') -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Route, link, and turn seed volumes of an OD matrix, without changing the network.
+
+    Same volumes as Network.init_seed_volumes assigns.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        Route (RouteIncidence order), link (NetCSR link id order), and turn 
+        (turn id order) seed volumes.
+    """
+    od_seed_vol = od_seed.volumes((od.origin, od.destination) for od in net.od_pairs)
+    route_seed = np.array([v * route.target_ratio 
+                           for od, v in zip(net.od_pairs, od_seed_vol.tolist())
+                           for route in od.routes], dtype=np.float64)
+    link_seed, turn_seed = net.set_link_and_turn_volume_from_route(route_seed, write_back=False)
+
+    return route_seed, link_seed, turn_seed
+
+
+def objective_fn_prep_net_geh(net: 'Network', link_seed: np.ndarray = None, 
+                              turn_seed: np.ndarray = None):
     """ Prepare optimization objective function by estimating maximum network GEH.
 
-    Warning: this function mutates net by directly assigning link and turn volumes.
-    TODO: after calling this function, reset net to its state before calling this funciton.
+    The network is not changed, so the estimation can run while the network
+    is displayed.
     
     Parameters
     ----------
     net : Network
         Network containing OD link and turn target volumes. 
+    link_seed : np.ndarray, optional
+        Link seed volumes in NetCSR link id order, see seed_volumes(). By default 
+        None, which uses the seed_volume of each link.
+    turn_seed : np.ndarray, optional
+        Turn seed volumes in turn id order. By default None, which uses the 
+        seed_volume of each turn.
 
     Returns
     -------
@@ -25,18 +61,26 @@ def objective_fn_prep_net_geh(net: 'Network'):
     # Each volume is scaled by the mulitplier to simulate a worst-case estimation.
     multipler = 5
 
-    for link in net.links():
-        link.assigned_volume = link.seed_volume * multipler
-    
-    for t in net.turns():
-        t.assigned_volume = t.seed_volume * multipler
+    links = [net.link(*key) for key in net.csr().link_keys]
+    if link_seed is None:
+        link_seed = [link.seed_volume for link in links]
+
+    _, link_total = geh_array([link.target_volume for link in links],
+                              np.asarray(link_seed, dtype=np.float64) * multipler)
+
+    # Same as Network.calc_network_geh: turns only count if they have a target.
+    turns = net.turn_store()
+    if turn_seed is None:
+        turn_seed = turns.seed_volume
+
+    has_target = turns.target_volume > 0
+    _, turn_total = geh_array(turns.target_volume, turn_seed * multipler, has_target)
 
-    net.calc_network_geh()
-    return net.total_geh   
+    return link_total + turn_total
 
 
 
-def objective_fn_prep_odsse(net: 'Network', od_seed: 'ODMatrix'):
+def objective_fn_prep_odsse(net: 'Network', od_seed: 'ODMatrix', route_seed: np.ndarray = None):
     """Estimate maximum sum of sq error between seed and final od.
 
     Parameters
@@ -45,6 +89,9 @@ def objective_fn_prep_odsse(net: 'Network', od_seed: 'ODMatrix'):
         Network containing OD seed volumes.
     od_seed : ODMatrix
         Seed OD Matrix.
+    route_seed : np.ndarray, optional
+        Route seed volumes in RouteIncidence order, see seed_volumes(). By 
+        default None, which uses the seed_volume of each route.
 
     Returns
     -------
@@ -53,10 +100,13 @@ def objective_fn_prep_odsse(net: 'Network', od_seed: 'ODMatrix'):
     """
     multiplier = 5
     odsse = 0
+    r = 0
     for od in net.od_pairs:
         for route in od.routes:
+            seed = route.seed_volume if route_seed is None else route_seed[r]
             route_vol = od_seed.volume[(od.origin, od.destination)] * route.target_ratio * multiplier
-            odsse += (route_vol - route.seed_volume) * (route_vol - route.seed_volume)
+            odsse += (route_vol - seed) * (route_vol - seed)
+            r += 1
 
     return odsse
 
@@ -109,29 +159,246 @@ def objective_fn_prep_route_ratios(net: 'Network'):
 
 
 
+class ODMEObjective():
+    """Objective function for the cma-es optimization algorithm.
+
+    Holds the route, OD, link, and turn data as numpy arrays so that the 
+    objective is pure array math. Index r is a route in RouteIncidence order, 
+    index o is an OD in Network.od_pairs order.
+
+    Calling the object evaluates a whole population of candidate solutions at 
+    once. The object is picklable, so it can be sent to worker processes.
+    """
+    __slots__ = ['route_od', 'od_routes', 'route_seed_ratio', 'route_seed_vol', 
+                 'route_tgt_rel_diff', 'link_routes', 'turn_routes', 'link_target', 
+                 'turn_target', 'turn_has_target', 'weight_total_geh', 'weight_odsse', 
+                 'weight_route_ratio', 'max_net_geh', 'max_odsse', 'max_ratio_sse']
+
+    def __init__(self, net: 'Network', od_seed: 'ODMatrix', weights, maximums, 
+                 route_seed: np.ndarray = None):
+        """Gather the objective function data from the network.
+
+        Parameters
+        ----------
+        net : Network
+            Network with seed volumes initialized (see Network.init_seed_volumes),
+            unless route_seed is given.
+        od_seed : ODMatrix
+            Seed OD matrix.
+        weights : tuple[float, float, float]
+            Objective function weights of the total GEH, odsse, and route ratios.
+        maximums : tuple[float, float, float]
+            Estimated maximum total GEH, odsse, and route ratio sse.
+        route_seed : np.ndarray, optional
+            Route seed volumes in RouteIncidence order, see seed_volumes(). By 
+            default None, which uses the seed_volume of each route.
+        """
+        incidence = net.route_incidence()
+
+        self.weight_total_geh, self.weight_odsse, self.weight_route_ratio = weights
+        self.max_net_geh, self.max_odsse, self.max_ratio_sse = maximums
+
+        self.route_od = np.array([o for o, od in enumerate(net.od_pairs) for _ in od.routes], 
+                                 dtype=np.int64)
+        n_routes = len(self.route_od)
+
+        # Sums route volumes into OD volumes, shape (n_od, n_routes)
+        self.od_routes = sparse.csr_matrix(
+            (np.ones(n_routes), (self.route_od, np.arange(n_routes))),
+            shape=(len(net.od_pairs), n_routes))
+
+        od_seed_vol = od_seed.volumes((od.origin, od.destination) for od in net.od_pairs)
+
+        self.route_seed_ratio = od_seed_vol[self.route_od] * np.array(
+            [route.target_ratio for route in incidence.routes], dtype=np.float64)
+        if route_seed is None:
+            route_seed = [route.seed_volume for route in incidence.routes]
+        self.route_seed_vol = np.array(route_seed, dtype=np.float64)
+        self.route_tgt_rel_diff = np.array([route.target_rel_diff for route in incidence.routes], 
+                                           dtype=np.float64)
+
+        self.link_routes = incidence.links
+        self.turn_routes = incidence.turns
+        self.link_target = np.array([net.link(*key).target_volume for key in incidence.link_keys],
+                                    dtype=np.float64)
+        # Incidence turn rows are turn ids.
+        self.turn_target = net.turn_store().target_volume.copy()
+        self.turn_has_target = self.turn_target > 0
+
+    def route_volumes(self, x) -> np.ndarray:
+        """Estimated route volumes. Multiplier m = x * x to ensure m is positive.
+
+        x has shape (n_routes,) for one solution or (n_routes, n) for n solutions.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            return self.route_seed_ratio * (x * x)
+        return self.route_seed_ratio[:, None] * (x * x)
+
+    def od_volumes(self, route_volume: np.ndarray) -> np.ndarray:
+        """Sum the route volumes of each OD."""
+        return self.od_routes @ route_volume
+
+    def total_geh(self, route_volume: np.ndarray) -> np.ndarray | float:
+        """Total network GEH of route volumes, shape (n_routes,) or (n_routes, n)."""
+        route_volume = np.asarray(route_volume, dtype=np.float64)
+        if route_volume.ndim == 1:
+            return float(self.total_geh(route_volume[:, None])[0])
+
+        link_geh, _ = geh_array(self.link_target[:, None], self.link_routes @ route_volume)
+        turn_geh, _ = geh_array(self.turn_target[:, None], self.turn_routes @ route_volume, 
+                                self.turn_has_target[:, None])
+        return link_geh.sum(axis=0) + turn_geh.sum(axis=0)
+
+    def __call__(self, X) -> np.ndarray:
+        """Evaluate the objective function for a population of solutions.
+
+        Parameters
+        ----------
+        X : array_like
+            Candidate solutions, shape (population size, n_routes).
+
+        Returns
+        -------
+        np.ndarray
+            Value to minimize for each solution.
+        """
+        # Route-major arrays, shape (n_routes, population size)
+        est_route_vol = self.route_volumes(np.asarray(X, dtype=np.float64).T)
+
+        diff = est_route_vol - self.route_seed_vol[:, None]
+        odsse = np.einsum('ij,ij->j', diff, diff)
+
+        # Route ratios within each OD
+        route_od_total = self.od_volumes(est_route_vol)[self.route_od]
+        assigned_ratio = np.divide(est_route_vol, route_od_total, 
+                                   out=np.ones_like(est_route_vol), where=route_od_total > 0)
+        
+        ratio_diff = (assigned_ratio - (1 - assigned_ratio)) - self.route_tgt_rel_diff[:, None]
+        ratio_sse = np.einsum('ij,ij->j', ratio_diff, ratio_diff)
+
+        total_geh = self.total_geh(est_route_vol)
+
+        return (self.weight_total_geh * (total_geh / self.max_net_geh) 
+                + self.weight_odsse * (odsse / self.max_odsse)
+                + self.weight_route_ratio * (ratio_sse / self.max_ratio_sse))
+
+
+class ODMESolution():
+    """Result of the cma-es optimization, not yet saved to the network.
+
+    Attributes
+    ----------
+    x : np.ndarray
+        Best solution, the cma-es objective function variables.
+    objective : ODMEObjective
+        Objective function the solution was found with.
+    incidence : RouteIncidence
+        Route incidence of the network when the solution was found. 
+        Variable r is incidence.routes[r].
+    seed : tuple[np.ndarray, np.ndarray, np.ndarray]
+        Route, link, and turn seed volumes, see seed_volumes().
+    """
+    __slots__ = ['x', 'objective', 'incidence', 'seed']
+
+    def __init__(self, x, objective: ODMEObjective, incidence: 'RouteIncidence', seed: tuple):
+        self.x = x
+        self.objective = objective
+        self.incidence = incidence
+        self.seed = seed
+
+    def apply(self, net: 'Network', od_estimated: 'ODMatrix') -> None:
+        """Save the seed and estimated route, OD, link, and turn volumes to the objects.
+
+        This is the only step of the estimation that changes the network.
+        """
+        objective = self.objective
+        est_route_vol = objective.route_volumes(self.x)
+        od_est_total_vol = objective.od_volumes(est_route_vol)
+
+        route_seed, link_seed, turn_seed = self.seed
+        for (i, j), v in zip(self.incidence.link_keys, link_seed.tolist()):
+            net.link(i, j).seed_volume = v
+        net.turn_store().seed_volume[:] = turn_seed
+
+        # Each route is variable r of the cma-es optimizer.
+        for r, (route, seed, v) in enumerate(zip(self.incidence.routes, route_seed.tolist(), 
+                                                 est_route_vol.tolist())):
+            route.opt_var_index = r
+            route.seed_volume = seed
+            route.assigned_volume = v
+
+        od_estimated.set_volumes(((od.origin, od.destination) for od in net.od_pairs),
+                                 od_est_total_vol)
+
+        for od, od_total in zip(net.od_pairs, od_est_total_vol.tolist()):
+            for route in od.routes:
+                if od_total > 0:
+                    route.assigned_ratio = route.assigned_volume / od_total
+                else:
+                    route.assigned_ratio = 1
+
+        link_volume, turn_volume = net.set_link_and_turn_volume_from_route(est_route_vol)
+        net.calc_network_geh(link_volume, turn_volume)
+
+
 def estimate_od(
         net: 'Network', 
         od_seed: 'ODMatrix', 
         od_estimated: 'ODMatrix', 
         weight_total_geh=None, 
         weight_odsse=None, 
-        weight_route_ratio=None) -> list[float]:
+        weight_route_ratio=None,
+        batch: bool = False,
+        workers: int = None) -> list[float]:
     """Estimate an OD matrix based on a seed matrix and target volumes within 
     the network links/turns. 
     
     Estimated matrix is directly saved in the 'od_estimated' variable.
 
     Uses a cma-es optimization algorithm to iteratively manipulate the seed matrix
-    until the target volumes are met.
+    until the target volumes are met. See solve() for the parameters.
 
     Parameters
     ----------
-    net : Network
-    od_seed : ODMatrix
-        OD matrix to use as an initial seed in the optimization process.
     od_estimated : ODMatrix
         Resulting estimated OD. This variable is mutated directly by the 
         optimization process.
+
+    Returns
+    -------
+    List[float]
+        Result from cma-es objective function variables.
+    """
+    solution = solve(net, od_seed, weight_total_geh, weight_odsse, weight_route_ratio, 
+                     batch, workers)
+    solution.apply(net, od_estimated)
+
+    return solution.x
+
+
+def solve(
+        net: 'Network', 
+        od_seed: 'ODMatrix', 
+        weight_total_geh=None, 
+        weight_odsse=None, 
+        weight_route_ratio=None,
+        batch: bool = False,
+        workers: int = None,
+        progress: Callable[[ODMEProgress], None] = None,
+        cancel: Callable[[], bool] = None) -> ODMESolution | None:
+    """Run the cma-es OD estimation without saving the result.
+
+    The network is only read, so the estimation can run in a background 
+    thread. Seed and estimated volumes are saved by ODMESolution.apply().
+    The network route incidence must already be built, see 
+    Network.route_incidence().
+
+    Parameters
+    ----------
+    net : Network
+    od_seed : ODMatrix
+        OD matrix to use as an initial seed in the optimization process.
     weight_total_geh : float, optional
         Objective function weight of the sum of all GEH values in the network.
     weight_odsse : float, optional
@@ -140,11 +407,23 @@ def estimate_od(
         seed matrix, even if that means sacrificing link and turn GEH.
     weight_route_ratio : float, optional
         Objective function weight of the OD route ratios.
+    batch : bool, optional
+        If True, evaluate each cma-es population with one matrix product instead 
+        of one solution at a time. By default False.
+    workers : int, optional
+        Number of processes used to evaluate each population. Implies batch.
+        By default None, which evaluates in this process. Use 0 for one 
+        process per cpu.
+    progress : Callable[[ODMEProgress], None], optional
+        Called after every iteration, by default None.
+    cancel : Callable[[], bool], optional
+        Checked before every iteration. If it returns True the optimization 
+        stops and None is returned. By default None.
 
     Returns
     -------
-    List[float]
-        Result from cma-es objective function variables.
+    ODMESolution | None
+        Best solution, or None if cancelled.
     """
 
     # Assign default objective function weights. Default weights lower importance of odsse.
@@ -152,20 +431,19 @@ def estimate_od(
     weight_odsse = weight_odsse or 0.10
     weight_route_ratio = weight_route_ratio or 1.0
 
-    # Associate each route with a variable in the cma-es optimizer 
-    p_counter = 0
-    for od in net.od_pairs:
-        for route in od.routes:
-            route.opt_var_index = p_counter
-            p_counter += 1
+    # Each route is a variable in the cma-es optimizer. Variables are in 
+    # RouteIncidence order, so route volume arrays can be assigned to links 
+    # and turns directly.
+    incidence = net.route_incidence()
+    p_counter = incidence.n_routes
 
-    net.init_seed_volumes(od_seed)
+    route_seed, link_seed, turn_seed = seed_volumes(net, od_seed)
 
-    estimated_max_net_geh = objective_fn_prep_net_geh(net)
+    estimated_max_net_geh = objective_fn_prep_net_geh(net, link_seed, turn_seed)
     if estimated_max_net_geh <= 0:
         estimated_max_net_geh = 1
     
-    estimated_max_odsse = objective_fn_prep_odsse(net, od_seed) 
+    estimated_max_odsse = objective_fn_prep_odsse(net, od_seed, route_seed) 
     if estimated_max_odsse <= 0:
         estimated_max_odsse = 1
 
@@ -173,63 +451,102 @@ def estimate_od(
     if estimated_max_ratio_sse <= 0:
         estimated_max_ratio_sse = 1
 
-    def objective_fn(x):
-        """Objective function for the cma-es optimization algorithm.
+    objective = ODMEObjective(
+        net, 
+        od_seed, 
+        (weight_total_geh, weight_odsse, weight_route_ratio),
+        (estimated_max_net_geh, estimated_max_odsse, estimated_max_ratio_sse),
+        route_seed)
 
-        Parameters
-        ----------
-        x : List[float]
-            Contains variables to optimize.
+    def objective_fn(x):
+        """Objective function for one solution, see ODMEObjective."""
+        return objective([x])[0]
 
-        Returns
-        -------
-        float
-            Value to minimize.
-        """
+    def report(iteration, es) -> None:
+        x = es.result.xbest
+        progress(ODMEProgress(iteration=iteration, 
+                              objective=float(es.result.fbest),
+                              total_geh=objective.total_geh(objective.route_volumes(x))))
 
-        odsse = 0
-        ratio_sse = 0
+    on_iteration = report if progress is not None else None
 
-        # calculate route volume based on estimated x values.
-        for od in net.od_pairs:
-            od_seed_total_vol = od_seed.volume[(od.origin, od.destination)]
-            od_est_total_vol = 0
-            for route in od.routes:
-                # mulitplier m = x * x to ensure m is positive
-                m = x[route.opt_var_index] * x[route.opt_var_index]
-                est_route_vol = od_seed_total_vol * route.target_ratio * m
-                odsse += (est_route_vol - route.seed_volume) * (est_route_vol - route.seed_volume)
-                route.assigned_volume = est_route_vol
-                od_est_total_vol += est_route_vol
-            
-            od_estimated.volume[(od.origin, od.destination)] = od_est_total_vol
+    # Run optimization algorithm
+    if workers == 0:
+        workers = os.cpu_count()
+
+    if workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_init_objective_worker,
+                                       initargs=(objective,))
+        with executor:
+            def evaluate_population(X):
+                chunks = np.array_split(np.asarray(X), workers)
+                return np.concatenate(list(executor.map(_objective_worker, chunks)))
             
-            # update route ratios
-            for route in od.routes:
-                if od_est_total_vol > 0:
-                    route.assigned_ratio = route.assigned_volume / od_est_total_vol
-                else:
-                    route.assigned_ratio = 1
-                
-                est_rel_diff = route.assigned_ratio - (1 - route.assigned_ratio)
-                ratio_diff = est_rel_diff - route.target_rel_diff
-                ratio_sqdiff = ratio_diff * ratio_diff
-                ratio_sse += ratio_sqdiff
+            x_best = _ask_tell(evaluate_population, p_counter, on_iteration, cancel)
+    elif batch:
+        x_best = _ask_tell(objective, p_counter, on_iteration, cancel)
+    elif progress is not None or cancel is not None:
+        # cma.fmin cannot be stopped between iterations.
+        x_best = _ask_tell(lambda X: [objective_fn(x) for x in X], p_counter, 
+                           on_iteration, cancel)
+    else:
+        res = cma.fmin(objective_fn, [1] * p_counter, 1, {'verbose':-9})
+        x_best = res[0]
 
-        net.set_link_and_turn_volume_from_route()
-        net.calc_network_geh() 
+    if x_best is None:
+        return None
 
-        res = (weight_total_geh * (net.total_geh / estimated_max_net_geh) 
-               + weight_odsse * (odsse / estimated_max_odsse)
-               + weight_route_ratio * (ratio_sse / estimated_max_ratio_sse))
+    return ODMESolution(x_best, objective, incidence, (route_seed, link_seed, turn_seed))
 
-        return res
 
-    # Run optimization algorithm
-    res = cma.fmin(objective_fn, [1] * p_counter, 1, {'verbose':-9})
+def _ask_tell(evaluate_population, n_variables: int, on_iteration=None, 
+              cancel=None) -> np.ndarray | None:
+    """Run cma-es, evaluating one whole population per iteration.
+
+    Parameters
+    ----------
+    evaluate_population : Callable
+        Takes a list of solutions and returns the objective value of each.
+    n_variables : int
+        Number of optimization variables.
+    on_iteration : Callable, optional
+        Called with the iteration number and the CMAEvolutionStrategy after 
+        every iteration.
+    cancel : Callable[[], bool], optional
+        Checked before every iteration. Stops the optimization if True.
+
+    Returns
+    -------
+    np.ndarray | None
+        Best solution found, or None if cancelled.
+    """
+    es = cma.CMAEvolutionStrategy([1] * n_variables, 1, {'verbose':-9})
+    iteration = 0
+    while not es.stop():
+        if cancel is not None and cancel():
+            return None
+
+        X = es.ask()
+        es.tell(X, np.asarray(evaluate_population(X)).tolist())
+
+        iteration += 1
+        if on_iteration is not None:
+            on_iteration(iteration, es)
+
+    return es.result.xbest
+
+
+# Objective function held by each process in the estimate_od process pool.
+_worker_objective = None
+
 
-    # apply result
-    objective_fn(res[0])
+def _init_objective_worker(objective: ODMEObjective) -> None:
+    """Process pool initializer. Stores the objective function in the worker process."""
+    global _worker_objective
+    _worker_objective = objective
 
-    return res[0]
 
+def _objective_worker(X) -> np.ndarray:
+    """Process pool task. Evaluates part of a population."""
+    return _worker_objective(X)
@@ -1,14 +1,19 @@
 """Biproportional Matrix Factoring (Fratar Factoring)"""
-from copy import deepcopy
+from dataclasses import dataclass
 from enum import Enum
+from typing import Callable
+
+import numpy as np
+from scipy import sparse
 
 from od.od_matrix import ODMatrix, create_od_from_source
+from od.odme_progress import ODMEProgress
 
 class ODAxis(Enum):
-    """Axis in an ODMatrix. 
-    
+    """Axis in an ODMatrix.
+
     Values are used to get the corresponding zone from an (O, D) dictionary key.
-    For example: 
+    For example:
         ODMatrix.volume = {(8, 9) = 32.7}
         key = (8, 9)
         key[ODAxis.ORIGIN] = 8
@@ -17,57 +22,156 @@ class ODAxis(Enum):
     ORIGIN = 0
     DESTINATION = 1
 
-def estimate_od(od_seed: ODMatrix) -> ODMatrix:
 
-    # Limit number of Fratar factoring iterations
-    MAX_ITERATIONS = 10
+@dataclass(slots=True)
+class FratarDiagnostics():
+    """Convergence information from Fratar factoring.
 
-    od_1 = create_od_from_source(od_seed, copy_volume=True, copy_targets=True)
-    od_2 = create_od_from_source(od_seed, copy_volume=True, copy_targets=True)
+    Attributes
+    ----------
+    iterations: int
+        Number of row + column iterations done.
+    converged: bool
+        True if the residuals are within the tolerance.
+    residual_o: float
+        Largest relative difference between an origin total and its target.
+    residual_d: float
+        Largest relative difference between a destination total and its target.
+    """
+    iterations: int
+    converged: bool
+    residual_o: float
+    residual_d: float
 
-    def fratar_iter(od: ODMatrix, axis: ODAxis):
-        """Helper function to do row/col iterations.
-        Row Iter: axis = ODAxis.ORIGIN = 0 
-        Col Iter: axis = ODAxis.DESTINATION = 1
-        """
-        if axis is ODAxis.ORIGIN:
-            targets = od.targets_o
-            margin_sums = od.sums_o
-        elif axis is ODAxis.DESTINATION:
-            targets = od.targets_d
-            margin_sums = od.sums_d
-        else:
-            raise Exception(f"Axis {axis} unknown Expected ODAxis.ORIGIN or ODAxis.DESTINATION.")
-
-        for k, v in od.volume.items():
-            zone = k[axis.value]
-            if targets[zone] == -1:
-                continue
-            elif margin_sums[zone] == 0:
-                od.volume[k] = 0
-            else:    
-                od.volume[k] = v * targets[zone] / margin_sums[zone]
-        
-        od.set_margin_sums()
-
-
-    for _ in range(0, MAX_ITERATIONS):
-        # Swap matrices to save results for both row & col iterations
-        od_1, od_2 = od_2, od_1
+
+def estimate_od(od_seed: ODMatrix, tol: float = 1e-6, max_iterations: int = 100) -> ODMatrix:
+    """Balance the seed matrix to the origin and destination targets.
+
+    See balance() for the parameters. Returns only the balanced matrix.
+    """
+    od, _ = balance(od_seed, tol, max_iterations)
+    return od
+
+
+def balance(od_seed: ODMatrix,
+            tol: float = 1e-6,
+            max_iterations: int = 100,
+            progress: Callable[[ODMEProgress], None] = None,
+            cancel: Callable[[], bool] = None) -> tuple[ODMatrix, FratarDiagnostics] | None:
+    """Balance the seed matrix to the origin and destination targets using
+    iterative proportional fitting.
+
+    Each iteration scales every row to its origin target, then every column to
+    its destination target. Zones with a target of -1 have no target and are
+    not scaled. If the targets are not met within max_iterations (for example,
+    the origin and destination targets have different totals) the result is 
+    the average of the last row-scaled and column-scaled matrices.
+
+    Parameters
+    ----------
+    od_seed : ODMatrix
+        Seed matrix with origin and destination targets.
+    tol : float, optional
+        Stop once every zone total is within this relative difference of its target.
+    max_iterations : int, optional
+        Maximum number of row + column iterations.
+    progress : Callable[[ODMEProgress], None], optional
+        Called after every iteration with the largest residual as the 
+        objective, by default None.
+    cancel : Callable[[], bool], optional
+        Checked before every iteration. If it returns True balancing stops 
+        and None is returned. By default None.
+
+    Returns
+    -------
+    tuple[ODMatrix, FratarDiagnostics] | None
+        Balanced matrix and convergence information, or None if cancelled.
+    """
+    targets_o = np.array([od_seed.targets_o[o] for o in od_seed.origins], dtype=np.float64)
+    targets_d = np.array([od_seed.targets_d[d] for d in od_seed.destinations], dtype=np.float64)
+    has_target_o = targets_o != -1
+    has_target_d = targets_d != -1
+
+    X = od_seed.array.copy()
+    converged = False
+    col_factors = np.ones(len(targets_d))
+    iterations = 0
+
+    for iterations in range(1, max_iterations + 1):
+        if cancel is not None and cancel():
+            return None
 
         # Row Iteration
-        fratar_iter(od_1, ODAxis.ORIGIN)
+        row_factors = _factors(_margin(X, ODAxis.ORIGIN), targets_o, has_target_o)
+        X = _scale(X, row_factors, ODAxis.ORIGIN)
+
+        # Col Iteration. Check the column scaled row totals before scaling X.
+        col_sums = _margin(X, ODAxis.DESTINATION)
+        col_factors = _factors(col_sums, targets_d, has_target_d)
+
+        residual_o = _residual(X @ col_factors, targets_o, has_target_o)
+        residual_d = _residual(col_sums * col_factors, targets_d, has_target_d)
+        if progress is not None:
+            progress(ODMEProgress(iteration=iterations, 
+                                  objective=max(residual_o, residual_d), 
+                                  total_geh=float('nan')))
+
+        if residual_o <= tol and residual_d <= tol:
+            converged = True
+            break
+
+        if iterations < max_iterations:
+            X = _scale(X, col_factors, ODAxis.DESTINATION)
+
+    if converged:
+        X = _scale(X, col_factors, ODAxis.DESTINATION)
+    else:
+        # Average last iterations: (X_row + X_row * col_factors) / 2
+        X = _scale(X, (1 + col_factors) / 2.0, ODAxis.DESTINATION)
+
+    od = create_od_from_source(od_seed, copy_targets=True)
+    od.set_array(X)
 
-        # Col Iteration
-        fratar_iter(od_2, ODAxis.DESTINATION)
+    diagnostics = FratarDiagnostics(
+        iterations=iterations,
+        converged=converged,
+        residual_o=_residual(od.margin_array(ODAxis.ORIGIN.value), targets_o, has_target_o),
+        residual_d=_residual(od.margin_array(ODAxis.DESTINATION.value), targets_d, has_target_d))
 
-    # Average last iterations
-    od_3 = create_od_from_source(od_seed, copy_targets=True)
+    return od, diagnostics
+
+
+def _margin(X, axis: ODAxis) -> np.ndarray:
+    """Origin (row) or destination (column) totals of a dense or sparse matrix."""
+    return np.asarray(X.sum(axis=1 - axis.value), dtype=np.float64).ravel()
+
+
+def _factors(sums: np.ndarray, targets: np.ndarray, has_target: np.ndarray) -> np.ndarray:
+    """Scale factor of each zone. Zones without a target are not scaled,
+    zones with a zero total are set to zero."""
+    factors = np.divide(targets, sums, out=np.zeros_like(sums), where=sums != 0)
+    factors[~has_target] = 1
+    return factors
+
+
+def _scale(X, factors: np.ndarray, axis: ODAxis):
+    """Multiply each row (origin) or column (destination) by its factor."""
+    if sparse.issparse(X):
+        if axis is ODAxis.ORIGIN:
+            return sparse.csr_matrix(sparse.diags(factors) @ X)
+        return sparse.csr_matrix(X @ sparse.diags(factors))
 
-    for k in od_3.volume:
-        od_3.volume[k] = (od_1.volume[k] + od_2.volume[k]) / 2.0
+    if axis is ODAxis.ORIGIN:
+        X *= factors[:, None]
+    else:
+        X *= factors[None, :]
+    return X
 
-    od_3.set_margin_sums()
 
-    return od_3
-    
+def _residual(sums: np.ndarray, targets: np.ndarray, has_target: np.ndarray) -> float:
+    """Largest relative difference between zone totals and targets.
+    Zones with a zero target use the absolute difference."""
+    diff = np.abs(sums - targets)[has_target]
+    scale = np.abs(targets)[has_target]
+    rel = np.divide(diff, scale, out=diff.copy(), where=scale > 0)
+    return float(rel.max()) if len(rel) > 0 else 0.0
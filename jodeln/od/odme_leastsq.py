@@ -1,24 +1,55 @@
 """OD Estimation using the least squares method."""
 import numpy as np
+from scipy import sparse
 from scipy.optimize import lsq_linear as scipy_lsq_linear
 
 from od.od_matrix import ODMatrix, create_od_from_source
-from typing import TYPE_CHECKING
+from od.odme_progress import ODMEProgress
+from typing import TYPE_CHECKING, Callable
 
 if TYPE_CHECKING:
     from network.net import Network
 
+# Largest A matrix (n_equations * n_variables) solved as a dense matrix with 
+# the 'bvls' method. Larger problems use a sparse A matrix and the 'trf' method.
+DENSE_MAX_ELEMENTS = 4_000_000
+
 
 def estimate_od(od_seed: ODMatrix, 
                 net: 'Network', 
                 select_link: dict,
                 select_turn: dict,
-                seed_od_weight: float):
+                seed_od_weight: float,
+                use_sparse: bool = None,
+                progress: Callable[[ODMEProgress], None] = None,
+                cancel: Callable[[], bool] = None):
     """
     Estimated OD matrix using least squares.
 
     Use scipy-optimize-lsq-linear:
     https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.lsq_linear.html#scipy-optimize-lsq-linear
+
+    Small problems are solved with a dense A matrix and the 'bvls' method.
+    Large problems are solved with a sparse A matrix and the 'trf' method with
+    the 'lsmr' solver, which never stores the dense A matrix in memory.
+
+    Parameters
+    ----------
+    use_sparse : bool, optional
+        Force the sparse (True) or dense (False) solver. By default None, which
+        uses the sparse solver if A has more than DENSE_MAX_ELEMENTS elements.
+    progress : Callable[[ODMEProgress], None], optional
+        Called once the solver finishes, with the solver iterations and the 
+        final cost. scipy does not report progress during the solve. By 
+        default None.
+    cancel : Callable[[], bool], optional
+        Checked after the equations are built and after the solve. If it 
+        returns True, None is returned. By default None.
+
+    Returns
+    -------
+    tuple[scipy.optimize.OptimizeResult, ODMatrix] | None
+        Solver result and estimated OD, or None if cancelled.
     """
 
     # Set of variables included in the "A" matrix.
@@ -32,15 +63,14 @@ def estimate_od(od_seed: ODMatrix,
         for zone_pair_key in zone_pairs:
             var_set.add(zone_pair_key)
 
-    n_seed_od_var = 0
-    for zone_pair_key, seed_volume in od_seed.volume.items():
-        if zone_pair_key in var_set: 
-            n_seed_od_var += 1
-            continue
-        if seed_volume == 0:
-            continue
-        var_set.add(zone_pair_key)
-        n_seed_od_var += 1
+    # Every OD pair with a seed volume is also a variable.
+    seed_rows, seed_cols = od_seed.array.nonzero()
+    var_set.update(zip([od_seed.origins[i] for i in seed_rows.tolist()],
+                       [od_seed.destinations[j] for j in seed_cols.tolist()]))
+
+    # Variables in the seed matrix get a seed equation.
+    seed_pairs = [zone_pair_key for zone_pair_key in var_set if zone_pair_key in od_seed.volume]
+    n_seed_od_var = len(seed_pairs)
 
     var_indices = {}
     var_counter = {}
@@ -53,10 +83,13 @@ def estimate_od(od_seed: ODMatrix,
     n_equations = len(select_link) + len(select_turn) + n_seed_od_var
     n_variables = len(var_set)
 
-    A = np.zeros(shape=(n_equations, n_variables))
-    B = np.zeros(shape=A.shape[0])
+    # A matrix coefficients in coordinate (COO) format. Duplicate entries are summed.
+    A_rows = []
+    A_cols = []
+    A_data = []
+    B = np.zeros(shape=n_equations)
     # Weights
-    W = [1] * A.shape[0]
+    W = np.ones(shape=n_equations)
     
 
     # -------------------
@@ -69,7 +102,9 @@ def estimate_od(od_seed: ODMatrix,
         # A matrix coeff
         for zone_pair_key, route_ratio in zone_pairs.items(): 
             var_col = var_indices[zone_pair_key]
-            A[eq_row, var_col] += route_ratio
+            A_rows.append(eq_row)
+            A_cols.append(var_col)
+            A_data.append(route_ratio)
             var_counter[zone_pair_key] += 1
         
         # B matrix targets
@@ -81,7 +116,9 @@ def estimate_od(od_seed: ODMatrix,
         # A matrix coeff
         for zone_pair_key, route_ratio in zone_pairs.items(): 
             var_col = var_indices[zone_pair_key]
-            A[eq_row, var_col] += route_ratio
+            A_rows.append(eq_row)
+            A_cols.append(var_col)
+            A_data.append(route_ratio)
             var_counter[zone_pair_key] += 1
         
         # B matrix targets
@@ -89,41 +126,55 @@ def estimate_od(od_seed: ODMatrix,
         eq_row += 1     
 
     # Seed Equations
-    for zone_pair_key, seed_volume in od_seed.volume.items():
-        if zone_pair_key not in var_set: continue
+    for zone_pair_key, seed_volume in zip(seed_pairs, od_seed.volumes(seed_pairs).tolist()):
         var_col = var_indices[zone_pair_key]
-        A[eq_row, var_col] = 1
+        A_rows.append(eq_row)
+        A_cols.append(var_col)
+        A_data.append(1)
         B[eq_row] = seed_volume
         W[eq_row] = seed_od_weight * (var_counter[zone_pair_key] / (1.0 - seed_od_weight))
         eq_row += 1
 
+    A = sparse.csr_matrix((A_data, (A_rows, A_cols)), shape=(n_equations, n_variables))
+
     # Lower and upper bounds on OD volumes.
-    lbounds = [0] * A.shape[1]
-    ubounds = [np.inf] * A.shape[1]
+    lbounds = np.zeros(n_variables)
+    ubounds = np.full(n_variables, np.inf)
     
-    # print(A)
-    # print(B)
-    # print(W)
+    # Apply weights as a row scaling, same as multiplying by a diagonal matrix of W.
+    WA = sparse.diags(W) @ A
+    WB = W * B
+
+    if use_sparse is None:
+        use_sparse = n_equations * n_variables > DENSE_MAX_ELEMENTS
 
-    # Convert weights to a diagonal matrix for lsq_linear solver
-    W = np.diag(W)
+    if cancel is not None and cancel():
+        return None
 
     # ----------------------------
     # Run Least Squares Solver
     # ----------------------------
     # TODO: expose 'tol' as a user input?
-    result = scipy_lsq_linear(np.dot(W, A), np.dot(W, B), bounds=(lbounds, ubounds), 
-                              method='bvls', tol=1e-20)
-    
+    if use_sparse:
+        result = scipy_lsq_linear(WA, WB, bounds=(lbounds, ubounds), 
+                                  method='trf', lsq_solver='lsmr', tol=1e-10)
+    else:
+        result = scipy_lsq_linear(WA.toarray(), WB, bounds=(lbounds, ubounds), 
+                                  method='bvls', tol=1e-20)
+
+    if progress is not None:
+        progress(ODMEProgress(iteration=int(result.nit), objective=float(result.cost), 
+                              total_geh=float('nan')))
+
+    if cancel is not None and cancel():
+        return None
+
     # print(result)
     # for k, v in var_indices.items():
     #     print(f"{k}: {result.x[v]}")
     
     od_estimated = create_od_from_source(source_od=od_seed, copy_targets=True)
 
-    for zone_pair_key, v in var_indices.items():
-        od_estimated.volume[zone_pair_key] = result.x[v]
-    
-    od_estimated.set_margin_sums()
+    od_estimated.set_volumes(var_indices.keys(), result.x[list(var_indices.values())])
 
     return result, od_estimated
@@ -0,0 +1,23 @@
+"""Progress reported by the ODME methods."""
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class ODMEProgress():
+    """Progress of an ODME method, reported once per iteration.
+
+    Attributes
+    ----------
+    iteration: int
+        Number of completed iterations.
+    objective: float
+        Best objective value so far: the cma-es objective function, the 
+        largest Fratar residual, or the least squares cost.
+    total_geh: float
+        Total network GEH of the best solution so far. nan if the method 
+        does not assign volumes to the network.
+    """
+    iteration: int
+    objective: float
+    total_geh: float
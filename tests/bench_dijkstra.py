@@ -0,0 +1,38 @@
+"""Benchmark the shortest route search as the network grows.
+
+Run from the tests folder: python bench_dijkstra.py
+"""
+
+import time
+
+from synthetic_network import grid_network
+from jodeln.network.net import _dijkstra, _dijkstra_csr
+
+
+def bench(n_side: int, n_origins: int = 20) -> None:
+    net = grid_network(n_side)
+    destinations = [k for k, node in net.nodes(True) if node.is_destination]
+    origins = [k for k, node in net.nodes(True) if node.is_origin][:n_origins]
+
+    start = time.perf_counter()
+    for o in origins:
+        _dijkstra(net, o, destinations)
+    elapsed = (time.perf_counter() - start) / len(origins)
+
+    csr = net.csr()
+    adjacency = csr.adjacency()
+    d_indices = [csr.node_index[d] for d in destinations]
+
+    start = time.perf_counter()
+    for o in origins:
+        _dijkstra_csr(adjacency, csr.node_index[o], d_indices)
+    elapsed_csr = (time.perf_counter() - start) / len(origins)
+
+    n_nodes = n_side * n_side
+    print(f'{n_nodes:>8} nodes  {elapsed * 1000:10.2f} ms per origin'
+          f'  {elapsed_csr * 1000:10.2f} ms per origin (csr)')
+
+
+if __name__ == '__main__':
+    for n_side in (10, 30, 100, 200):
+        bench(n_side)
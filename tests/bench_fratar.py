@@ -0,0 +1,42 @@
+"""Benchmark Fratar factoring on large random matrices.
+
+Run from the tests folder: python bench_fratar.py
+"""
+
+import time
+
+import numpy as np
+
+from context import jodeln
+from jodeln.od import odme_fratar
+from jodeln.od.od_matrix import ODMatrix
+
+
+def bench(n_zones: int) -> None:
+    rng = np.random.default_rng(0)
+    seed = rng.uniform(0, 100, size=(n_zones, n_zones))
+    
+    # Consistent targets: margins of a perturbed seed matrix.
+    truth = seed * rng.uniform(0.5, 1.5, size=seed.shape)
+    zones = list(range(n_zones))
+    names = [str(z) for z in zones]
+
+    od = ODMatrix(
+        volume=seed,
+        origins=zones,
+        destinations=list(zones),
+        names_o=names,
+        names_d=list(names),
+        targets_o=dict(zip(zones, truth.sum(axis=1).tolist())),
+        targets_d=dict(zip(zones, truth.sum(axis=0).tolist())))
+
+    start = time.perf_counter()
+    _, diagnostics = odme_fratar.balance(od, tol=1e-6)
+    elapsed = time.perf_counter() - start
+
+    print(f'{n_zones:>6} zones  {elapsed:7.2f} s  {diagnostics}')
+
+
+if __name__ == '__main__':
+    for n_zones in (100, 1000, 5000):
+        bench(n_zones)
@@ -0,0 +1,32 @@
+"""Micro-benchmark of the scalar and array GEH calculations.
+
+Run from the tests folder: python bench_geh.py
+"""
+
+import random
+import timeit
+
+from context import jodeln
+from jodeln.network.geh import geh, geh_array
+
+import numpy as np
+
+
+def bench(n: int) -> None:
+    rng = random.Random(0)
+    m = [rng.uniform(0, 1000) for _ in range(n)]
+    c = [rng.uniform(0, 1000) for _ in range(n)]
+    m_arr = np.array(m)
+    c_arr = np.array(c)
+
+    repeat = max(1, 100000 // n)
+    t_scalar = timeit.timeit(lambda: sum(geh(a, b) for a, b in zip(m, c)), number=repeat) / repeat
+    t_array = timeit.timeit(lambda: geh_array(m_arr, c_arr), number=repeat) / repeat
+
+    print(f'{n:>9} pairs  scalar {t_scalar * 1000:9.3f} ms  '
+          f'array {t_array * 1000:9.3f} ms  speedup {t_scalar / t_array:6.1f}x')
+
+
+if __name__ == '__main__':
+    for n in (100, 1000, 10000, 100000, 1000000):
+        bench(n)
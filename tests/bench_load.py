@@ -0,0 +1,55 @@
+"""Benchmark reading nodes and links from csv, up to a 50k node network.
+
+Run from the tests folder: python bench_load.py
+"""
+
+import tempfile
+import time
+
+from synthetic_network import grid_network, write_csv
+from jodeln.network import net_read
+from jodeln.network.net import Network
+
+
+def linear_lookup(net: Network, node_name: str):
+    """Node lookup by scanning every node, as done before the name index."""
+    for k, node in net.nodes(True):
+        if node.name == node_name:
+            return k, node
+
+
+def bench(n_side: int, n_lookups: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        node_file, link_file = write_csv(grid_network(n_side), folder)
+
+        net = Network()
+        start = time.perf_counter()
+        net_read.add_nodes_from_csv(net, node_file)
+        net_read.add_links_from_csv(net, link_file)
+        elapsed_load = time.perf_counter() - start
+
+    names = [node.name for node in net.nodes()][-n_lookups:]
+    
+    start = time.perf_counter()
+    for name in names:
+        net.get_node_by_name(name)
+    elapsed_index = (time.perf_counter() - start) / n_lookups
+
+    start = time.perf_counter()
+    for name in names:
+        linear_lookup(net, name)
+    elapsed_linear = (time.perf_counter() - start) / n_lookups
+
+    # add_links_from_csv does two name lookups per link, add_link two more.
+    n_links = sum(1 for _ in net.links())
+    est_linear_load = elapsed_linear * n_links * 4
+
+    print(f'{n_side * n_side:>8} nodes {n_links:>8} links  '
+          f'load {elapsed_load:8.2f} s  '
+          f'lookup {elapsed_index * 1e6:8.2f} us (index) {elapsed_linear * 1e6:10.2f} us (scan)  '
+          f'est. load with scan {est_linear_load:10.1f} s')
+
+
+if __name__ == '__main__':
+    for n_side in (50, 100, 224):
+        bench(n_side)
@@ -0,0 +1,27 @@
+"""Benchmark building all routes in series and with a process pool.
+
+Run from the tests folder: python bench_routes.py
+"""
+
+import os
+import time
+
+from synthetic_network import grid_network
+
+
+def bench(n_side: int, zone_step: int, workers: list[int]) -> None:
+    for n_workers in workers:
+        net = grid_network(n_side, zone_step)
+        start = time.perf_counter()
+        net.init_routes(workers=n_workers)
+        elapsed = time.perf_counter() - start
+
+        n_zones = sum(1 for node in net.nodes() if node.is_origin)
+        print(f'{n_side * n_side:>8} nodes {n_zones:>6} zones  '
+              f'workers {n_workers:>3}  {elapsed:8.2f} s')
+
+
+if __name__ == '__main__':
+    workers = sorted({1, 2, os.cpu_count()})
+    bench(100, 2, workers)
+    bench(200, 8, workers)
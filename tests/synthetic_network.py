@@ -0,0 +1,107 @@
+"""Synthetic networks used by the benchmark scripts.
+
+Builds square grid networks of arbitrary size without needing csv or 
+shapefile inputs. Nodes on the outer edge of the grid are zones (origins and
+destinations), interior nodes are intersections.
+"""
+
+import csv
+import os
+import random
+
+from context import jodeln
+from jodeln.network.net import Network
+from jodeln.network.netlink import NetLinkData
+from jodeln.network.netnode import NetNodeData
+
+
+def grid_network(n_side: int, zone_step: int = 1, seed: int = 0) -> Network:
+    """Create a two-way grid network with n_side * n_side nodes.
+
+    Parameters
+    ----------
+    n_side : int
+        Number of nodes along one side of the grid.
+    zone_step : int, optional
+        Only every zone_step-th node on the grid edge is a zone, by default 1.
+    seed : int, optional
+        Seed for the random link costs, by default 0.
+
+    Returns
+    -------
+    Network
+        Network with nodes and links. Turns and routes are not initialized.
+    """
+    rng = random.Random(seed)
+    net = Network()
+
+    edge_count = 0
+    for r in range(n_side):
+        for c in range(n_side):
+            is_edge = r in (0, n_side - 1) or c in (0, n_side - 1)
+            is_zone = is_edge and (edge_count % zone_step == 0)
+            if is_edge:
+                edge_count += 1
+
+            net.add_node(NetNodeData(
+                name=f'{r}_{c}',
+                x=c * 100.0,
+                y=r * 100.0,
+                is_origin=is_zone,
+                is_destination=is_zone))
+
+    def connect(a, b):
+        i = net.node(a)
+        j = net.node(b)
+        net.add_link(i.name, j.name, NetLinkData(
+            cost=rng.uniform(1, 10),
+            name=f'{i.name}-{j.name}',
+            target_volume=-1,
+            shape_points=[(i.x, i.y), (j.x, j.y)]))
+
+    for r in range(n_side):
+        for c in range(n_side):
+            key = r * n_side + c
+            if c + 1 < n_side:
+                connect(key, key + 1)
+                connect(key + 1, key)
+            if r + 1 < n_side:
+                connect(key, key + n_side)
+                connect(key + n_side, key)
+
+    return net
+
+
+def write_csv(net: Network, folder: str) -> tuple[str, str]:
+    """Write the network nodes and links to csv files in the input format.
+
+    Parameters
+    ----------
+    net : Network
+        Network to write.
+    folder : str
+        Folder to write nodes.csv and links.csv to.
+
+    Returns
+    -------
+    tuple[str, str]
+        File paths of the node and link csv files.
+    """
+    node_file = os.path.join(folder, 'nodes.csv')
+    link_file = os.path.join(folder, 'links.csv')
+
+    with open(node_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'x', 'y', 'is_origin', 'is_destination'])
+        for node in net.nodes():
+            writer.writerow([node.name, node.x, node.y, 
+                             int(node.is_origin), int(node.is_destination)])
+
+    with open(link_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['from_node', 'to_node', 'cost', 'name', 'target_volume'])
+        for (i, j), link in net.links(True):
+            writer.writerow([net.node(i).name, net.node(j).name, 
+                             link.cost, link.name, link.target_volume])
+
+    return node_file, link_file
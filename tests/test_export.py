@@ -0,0 +1,108 @@
+"""
+Test exporting the network and OD tables.
+"""
+
+import csv
+import gzip
+import os
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from context import jodeln
+from jodeln.model import Model
+from jodeln.network import net_write
+
+
+NET01 = os.path.join(pathlib.Path(__file__).parent.absolute(), "networks", "net01")
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model()
+        self.model.load(node_file=os.path.join(NET01, "nodes.csv"),
+                        links_file=os.path.join(NET01, "links.csv"),
+                        od_seed_file=os.path.join(NET01, "seed_matrix.csv"))
+
+    def _expected_turn_seq(self):
+        net = self.model.net
+        rows = []
+        for od in net.od_pairs:
+            for route in od.routes:
+                names = [net.node(x).name for x in route.nodes]
+                for x in range(len(names) - 2):
+                    rows.append([net.node(od.origin).name, net.node(od.destination).name,
+                                 route.name] + names[x:x + 3])
+        return rows
+
+    def test_node_sequences_csv(self):
+        """Streaming the routes in small chunks writes every turn row once."""
+        with tempfile.TemporaryDirectory() as folder:
+            net_write.export_node_sequences(self.model.net, folder, chunk_size=1)
+
+            with open(os.path.join(folder, 'exported_route_turn_seq.csv'), newline='') as f:
+                rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0], ["o_node", "d_node", "route", "a_node", "b_node", "c_node"])
+        self.assertEqual(rows[1:], self._expected_turn_seq())
+
+    def test_node_sequences_npz(self):
+        """The npz export has the same rows as the csv export."""
+        with tempfile.TemporaryDirectory() as folder:
+            net_write.export_node_sequences(self.model.net, folder, fmt='npz', chunk_size=1)
+
+            with np.load(os.path.join(folder, 'exported_route_turn_seq.npz')) as table:
+                columns = [table[c].tolist() for c in
+                           ["o_node", "d_node", "route", "a_node", "b_node", "c_node"]]
+
+        self.assertEqual([list(row) for row in zip(*columns)], self._expected_turn_seq())
+
+    def test_od_list_npz(self):
+        """OD volumes are exported as numbers in the npz export."""
+        with tempfile.TemporaryDirectory() as folder:
+            self.model.export_od(folder, fmt='npz')
+
+            with np.load(os.path.join(folder, 'exported_od_(list format).npz')) as table:
+                volume = table["volume"]
+                o_names = table["o_node"].tolist()
+
+        self.assertEqual(volume.dtype, np.float64)
+        self.assertEqual(len(volume), len(self.model.net.od_pairs))
+        self.assertEqual(o_names[0], self.model.net.node(self.model.net.od_pairs[0].origin).name)
+
+    def test_export_all(self):
+        """export_all writes every file, compressed files match the csv files."""
+        with tempfile.TemporaryDirectory() as csv_folder, \
+             tempfile.TemporaryDirectory() as gz_folder:
+            self.model.export_all(csv_folder)
+            self.model.export_all(gz_folder, compression='gzip', workers=2)
+
+            csv_files = sorted(os.listdir(csv_folder))
+            self.assertEqual(len(csv_files), 6)
+            self.assertEqual(sorted(os.listdir(gz_folder)), [f + '.gz' for f in csv_files])
+
+            for file in csv_files:
+                with open(os.path.join(csv_folder, file), newline='') as f, \
+                     gzip.open(os.path.join(gz_folder, file + '.gz'), 'rt', newline='') as gz_f:
+                    self.assertEqual(f.read(), gz_f.read())
+
+    def test_export_all_snapshot(self):
+        """Results changed after export_all is called are not exported."""
+        route = self.model.net.od_pairs[0].routes[0]
+        route.assigned_volume = 10
+
+        with tempfile.TemporaryDirectory() as folder:
+            futures = self.model.export_all(folder, formats={'od_by_route': 'npz'}, wait=False)
+            route.assigned_volume = 20
+            for future in futures:
+                future.result()
+
+            with np.load(os.path.join(folder, 'exported_route_volumes.npz')) as table:
+                self.assertEqual(table["volume"][0], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -44,5 +44,56 @@ class TestFratar(unittest.TestCase):
         print(res.sums_d)
         self.assertEqual(1, 1)       
 
+    def test_fratar_convergence(self):
+        """Consistent targets converge, and both margins meet the targets."""
+        od = ODMatrix(
+            volume=volumes,
+            origins=[0, 1],
+            destinations=[0, 1],
+            names_o=['0', '1'],
+            names_d=['0', '1'],
+            targets_o={0: 20, 1: 30},
+            targets_d={0: 17, 1: 33})
+
+        res, diagnostics = odme_fratar.balance(od, tol=1e-9)
+
+        self.assertTrue(diagnostics.converged)
+        self.assertLess(diagnostics.iterations, 100)
+        for zone, target in od.targets_o.items():
+            self.assertAlmostEqual(res.sums_o[zone], target)
+        for zone, target in od.targets_d.items():
+            self.assertAlmostEqual(res.sums_d[zone], target)
+
+    def test_fratar_no_target(self):
+        """Zones with a target of -1 are not scaled."""
+        od = ODMatrix(
+            volume=volumes,
+            origins=[0, 1],
+            destinations=[0, 1],
+            names_o=['0', '1'],
+            names_d=['0', '1'],
+            targets_o={0: 30, 1: -1},
+            targets_d={0: -1, 1: -1})
+
+        res, diagnostics = odme_fratar.balance(od)
+
+        self.assertTrue(diagnostics.converged)
+        self.assertAlmostEqual(res.volume[(0, 0)], 10)
+        self.assertAlmostEqual(res.volume[(0, 1)], 20)
+        self.assertAlmostEqual(res.volume[(1, 1)], 33)
+
+    def test_fratar_progress_cancel(self):
+        """Progress is reported every iteration, and cancelling returns None."""
+        progress = []
+        _, diagnostics = odme_fratar.balance(sample_od, progress=progress.append)
+        self.assertEqual([p.iteration for p in progress], 
+                         list(range(1, diagnostics.iterations + 1)))
+
+        progress = []
+        res = odme_fratar.balance(sample_od, progress=progress.append, 
+                                  cancel=lambda: len(progress) >= 2)
+        self.assertIsNone(res)
+        self.assertEqual(len(progress), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
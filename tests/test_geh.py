@@ -0,0 +1,36 @@
+"""
+Test suite for geh.py
+"""
+
+import random
+import unittest
+
+from context import jodeln
+from jodeln.network.geh import geh, geh_array
+
+
+class TestGEH(unittest.TestCase):
+
+    def test_geh_array_matches_geh(self):
+        """Array GEH gives the same values as the scalar GEH."""
+        rng = random.Random(0)
+        m = [rng.uniform(0, 1000) for _ in range(100)] + [0, 0, -1, -1, 5, -10]
+        c = [rng.uniform(0, 1000) for _ in range(100)] + [0, 7, 0, -1, -5, 3]
+
+        result, total = geh_array(m, c)
+        
+        expected = [geh(a, b) for a, b in zip(m, c)]
+        for r, e in zip(result, expected):
+            self.assertAlmostEqual(r, e)
+        self.assertAlmostEqual(total, sum(expected))
+
+    def test_geh_array_mask(self):
+        """Masked out pairs have a GEH of 0 and are left out of the total."""
+        result, total = geh_array([100, 100], [50, 50], [True, False])
+        self.assertAlmostEqual(result[0], geh(100, 50))
+        self.assertEqual(result[1], 0)
+        self.assertAlmostEqual(total, geh(100, 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,113 @@ class TestModel(unittest.TestCase):
         
         self.assertEqual(odme_res == expected_res, True)
 
+    def test_od_estimation_batch(self):
+        """Population-wide cma-es evaluation finds the same solution."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"))
+        
+        res = model.estimate_od_cmaes(1, 1, 1, batch=True)
+        odme_res = [round(abs(x), 4) for x in res]
+
+        expected_res = [0.5839, 0.9216, 0.5537, 1.1827]
+        
+        self.assertEqual(odme_res == expected_res, True)
+
+    def test_od_estimation_progress(self):
+        """ODME reports progress, and the result is only saved when applied."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"))
+
+        model.estimate_od_fratar()
+        od_before = model.od_estimated.dense_array().copy()
+        volumes_before = _network_volumes(model)
+        progress = []
+        result = model.solve_od_cmaes(1, 1, 1, progress=progress.append)
+
+        self.assertEqual([p.iteration for p in progress], list(range(1, len(progress) + 1)))
+        self.assertEqual(progress[-1].objective, min(p.objective for p in progress))
+        self.assertTrue((model.od_estimated.dense_array() == od_before).all())
+        self.assertEqual(_network_volumes(model), volumes_before)
+
+        model.apply_od_estimate(result)
+        self.assertIs(model.od_estimated, result.od_estimated)
+        self.assertAlmostEqual(model.net.total_geh, progress[-1].total_geh)
+
+    def test_od_estimation_cancel(self):
+        """Cancelling ODME stops between iterations without a result."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"))
+
+        model.estimate_od_cmaes(1, 1, 1)
+        volumes_before = _network_volumes(model)
+
+        progress = []
+        result = model.solve_od_cmaes(1, 1, 1, progress=progress.append,
+                                      cancel=lambda: len(progress) >= 3)
+
+        self.assertIsNone(result)
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(_network_volumes(model), volumes_before)
+
+    def test_od_estimation_leastsq_solve(self):
+        """Least squares solve does not build the Model select index."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"))
+
+        result = model.solve_od_leastsq(0.5)
+        self.assertIsNone(model._select_index)
+
+        model.apply_od_estimate(result)
+        self.assertIs(model.od_estimated, result.od_estimated)
+
+    def test_stale_od_estimate(self):
+        """Results of every ODME method are not applied to a reloaded Model."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        files = {"node_file": os.path.join(net_path, "nodes.csv"),
+                 "links_file": os.path.join(net_path, "links.csv"),
+                 "od_seed_file": os.path.join(net_path, "seed_matrix.csv")}
+
+        model.load(**files)
+        results = [model.solve_od_fratar(), model.solve_od_leastsq(0.5)]
+
+        model.load(**files)
+        od_before = model.od_estimated
+        for result in results:
+            with self.assertRaises(ValueError):
+                model.apply_od_estimate(result)
+        self.assertIs(model.od_estimated, od_before)
+
+
+def _network_volumes(model):
+    """Seed and assigned volumes of every route, link, and turn."""
+    net = model.net
+    turns = net.turn_store()
+    return ([(r.seed_volume, r.assigned_volume) for od in net.od_pairs for r in od.routes],
+            [(link.seed_volume, link.assigned_volume, link.geh) for link in net.links()],
+            turns.seed_volume.tolist(), turns.assigned_volume.tolist(), turns.geh.tolist())
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Test suite for the Network class.
+"""
+
+import random
+import unittest
+
+from synthetic_network import grid_network
+from jodeln.network.net import Network, NodeNotFoundError
+from jodeln.network.netlink import NetLinkData
+from jodeln.network.netnode import NetNodeData
+
+
+class TestNetwork(unittest.TestCase):
+
+    def test_get_node_by_name(self):
+        """Node names are found through the name index."""
+        net = grid_network(3)
+        key, node = net.get_node_by_name('1_2')
+        self.assertEqual(key, 5)
+        self.assertEqual(node.name, '1_2')
+
+    def test_unknown_node_name(self):
+        """Unknown node names raise NodeNotFoundError."""
+        net = grid_network(3)
+        with self.assertRaises(NodeNotFoundError) as cm:
+            net.get_node_by_name('not a node')
+        self.assertEqual(cm.exception.node_name, 'not a node')
+
+    def test_parallel_init_routes(self):
+        """Routes from a process pool match the routes built in series."""
+        serial = grid_network(6)
+        serial.init_routes()
+        parallel = grid_network(6)
+        parallel.init_routes(workers=2)
+
+        self.assertEqual(
+            [(od.origin, od.destination, od.routes[0].nodes) for od in serial.od_pairs],
+            [(od.origin, od.destination, od.routes[0].nodes) for od in parallel.od_pairs])
+
+    def test_route_incidence_assignment(self):
+        """Sparse route assignment matches walking each route node by node."""
+        net = grid_network(5)
+        net.init_turns()
+        net.init_routes()
+
+        rng = random.Random(1)
+        for od in net.od_pairs:
+            for route in od.routes:
+                route.assigned_volume = rng.uniform(0, 100)
+
+        expected_links = dict.fromkeys((key for key, _ in net.links(True)), 0)
+        expected_turns = dict.fromkeys((key for key, _ in net.turns(True)), 0)
+        for od in net.od_pairs:
+            for route in od.routes:
+                nodes = route.nodes
+                for x in range(len(nodes) - 1):
+                    expected_links[(nodes[x], nodes[x + 1])] += route.assigned_volume
+                for x in range(len(nodes) - 2):
+                    expected_turns[(nodes[x], nodes[x + 1], nodes[x + 2])] += route.assigned_volume
+
+        net.set_link_and_turn_volume_from_route()
+
+        for key, link in net.links(True):
+            self.assertAlmostEqual(link.assigned_volume, expected_links[key])
+        for key, turn in net.turns(True):
+            self.assertAlmostEqual(turn.assigned_volume, expected_turns[key])
+
+
+    def test_set_link_costs(self):
+        """Updating costs gives the same routes as searching the whole network."""
+        rng = random.Random(2)
+
+        for trial in range(5):
+            net = grid_network(6)
+            net.init_routes()
+
+            links = [key for key, _ in net.links(True)]
+            costs = {key: net.link(*key).cost * rng.choice([0.2, 0.5, 2, 5]) 
+                     for key in rng.sample(links, 4)}
+
+            affected = net.set_link_costs(costs)
+
+            expected = grid_network(6)
+            for key, cost in costs.items():
+                expected.link(*key).cost = cost
+            expected.init_routes()
+
+            self.assertEqual(
+                [(od.origin, od.destination, od.routes[0].nodes, od.routes[0].name) 
+                 for od in net.od_pairs],
+                [(od.origin, od.destination, od.routes[0].nodes, od.routes[0].name) 
+                 for od in expected.od_pairs])
+
+            origins = [n.key for n in net.nodes() if n.is_origin]
+            self.assertLessEqual(set(affected), set(origins))
+
+    def test_set_link_costs_keeps_user_routes(self):
+        """User-defined routes are not replaced when costs change."""
+        net = grid_network(4)
+        net.init_routes()
+
+        od = net.od_pairs[0]
+        od.routes[0].user_defined = True
+        user_nodes = list(od.routes[0].nodes)
+
+        # Make every link on the route expensive.
+        nodes = od.routes[0].nodes
+        net.set_link_costs({(nodes[x], nodes[x + 1]): 1000 for x in range(len(nodes) - 1)})
+
+        self.assertEqual(od.routes[0].nodes, user_nodes)
+
+    def test_set_link_costs_ties_and_empty_routes(self):
+        """An existing route that ties the new shortest route is kept, OD pairs without routes get one."""
+        net = Network()
+        for name in 'ABCDEF':
+            net.add_node(NetNodeData(name=name, x=0, y=0, is_origin=name == 'A', 
+                                     is_destination=name in 'DEF'))
+        for i, j in ('AB', 'BD', 'AC', 'CD', 'AE', 'AF'):
+            net.add_link(i, j, NetLinkData(cost=1, name='', target_volume=-1, shape_points=[]))
+        net.init_routes()
+
+        a, b, c, d, e, f = range(6)
+        od_pairs = {(od.origin, od.destination): od for od in net.od_pairs}
+
+        # Use the other route of the same cost from A to D.
+        od_ad = od_pairs[(a, d)]
+        tie = [a, c, d] if od_ad.routes[0].nodes == [a, b, d] else [a, b, d]
+        od_ad.routes[0].nodes = tie
+        od_pairs[(a, e)].routes = []
+        net.reset_route_incidence()
+
+        self.assertEqual(net.set_link_costs({(a, f): 2}), [a])
+        self.assertEqual(od_ad.routes[0].nodes, tie)
+        self.assertEqual([route.nodes for route in od_pairs[(a, e)].routes], [[a, e]])
+        self.assertEqual(od_pairs[(a, f)].routes[0].nodes, [a, f])
+
+
+    def test_shape_points(self):
+        """Link shape points are views of one network array."""
+        net = grid_network(3)
+        expected = [list(link.shape_points) for link in net.links()]
+
+        xy, offsets = net.shape_points()
+        self.assertEqual(xy.shape, (offsets[-1], 2))
+
+        for link, points in zip(net.links(), expected):
+            self.assertEqual(link.shape_points.tolist(), [list(p) for p in points])
+            self.assertIs(link.shape_points.base, xy)
+
+        xy *= 2
+        link = net.link(0, 1)
+        self.assertEqual(link.shape_points.tolist(), [[0, 0], [200, 0]])
+
+
+    def test_set_coord_scale(self):
+        """Coordinates are scaled in place and the real-world values are kept."""
+        net = grid_network(3)
+        real_xy = [(n.x, n.y) for n in net.nodes()]
+        real_shape = net.link(0, 1).shape_points
+
+        net.set_coord_scale()
+        self.assertAlmostEqual(net.coord_scale, 1000 / 200)
+        self.assertEqual((net.node(8).x, net.node(8).y), (1000, 1000))
+        self.assertEqual(net.link(0, 1).shape_points.tolist(), [[0, 0], [500, 0]])
+
+        # Scaling again does not compound.
+        net.set_coord_scale()
+        self.assertEqual((net.node(8).x, net.node(8).y), (1000, 1000))
+
+        node_xy, shape_xy, offsets = net.unscaled_coordinates()
+        self.assertEqual([tuple(xy) for xy in node_xy.tolist()], real_xy)
+        self.assertEqual(shape_xy[offsets[0]:offsets[1]].tolist(), [list(p) for p in real_shape])
+
+    def test_set_coord_scale_flat(self):
+        """A network with every point on one line, or at one point, does not divide by zero."""
+        for xs, expected_scale in (([0, 100, 300], 1000 / 300), ([7, 7, 7], 1)):
+            net = Network()
+            for n, x in enumerate(xs):
+                net.add_node(NetNodeData(name=str(n), x=x, y=5, is_origin=False, 
+                                         is_destination=False))
+            net.add_link('0', '1', NetLinkData(cost=1, name='', target_volume=-1,
+                                               shape_points=[(xs[0], 5), (xs[1], 5)]))
+
+            net.set_coord_scale()
+            self.assertAlmostEqual(net.coord_scale, expected_scale)
+
+    def test_turn_store(self):
+        """Turns are every incoming/outgoing link pair, found by key or by link."""
+        net = grid_network(4)
+        net.init_turns()
+        turns = net.turn_store()
+
+        expected = {(i, j, k) for (i, j), _ in net.links(True) for k in net.node(j).neighbors}
+        self.assertEqual(set(turns), expected)
+        self.assertEqual(len(turns), len(expected))
+
+        for t, key in enumerate(turns):
+            self.assertEqual(turns.turn_id(*key), t)
+            self.assertEqual(turns.key(t), key)
+
+        for (i, j), _ in net.links(True):
+            self.assertEqual({turns.key(t) for t in turns.turn_ids_from_link(i, j).tolist()},
+                             {key for key in expected if key[:2] == (i, j)})
+            self.assertEqual({turns.key(t) for t in turns.turn_ids_to_link(i, j).tolist()},
+                             {key for key in expected if key[1:] == (i, j)})
+
+        self.assertNotIn((0, 1, 0, 1), turns)
+        self.assertNotIn((0, 5, 6), turns)
+
+        # TurnData objects read and write the store arrays.
+        turn = net.turn(0, 1, 2)
+        self.assertEqual((turn.name, turn.target_volume), ('0_1_2', -1))
+        turn.target_volume = 50
+        turn.name = 'NB Thru'
+        t = turns.turn_id(0, 1, 2)
+        self.assertEqual(turns.target_volume[t], 50)
+        self.assertEqual(net.turn(0, 1, 2).name, 'NB Thru')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Test suite for od_matrix.py
+"""
+
+import unittest
+import warnings
+
+import numpy as np
+from scipy import sparse
+
+from context import jodeln
+from jodeln.od.od_matrix import ODMatrix, create_od_from_source
+
+
+def sample_od(volume) -> ODMatrix:
+    return ODMatrix(
+        volume=volume,
+        origins=[3, 7],
+        destinations=[3, 7, 9],
+        names_o=['a', 'b'],
+        names_d=['a', 'b', 'c'],
+        targets_o={3: 0, 7: 0},
+        targets_d={3: 0, 7: 0, 9: 0})
+
+
+class TestODMatrix(unittest.TestCase):
+
+    def test_dict_access(self):
+        """Volumes from a dict are stored in the array and read back by (o, d)."""
+        od = sample_od({(3, 7): 10, (7, 9): 5.5})
+
+        self.assertEqual(od.array.shape, (2, 3))
+        self.assertEqual(od.volume[(3, 7)], 10)
+        self.assertEqual(od.volume[(7, 3)], 0)
+        self.assertEqual(len(od.volume), 6)
+        self.assertIn((7, 9), od.volume)
+        self.assertNotIn((9, 3), od.volume)
+
+        od.volume[(7, 3)] = 2
+        self.assertEqual(od.array[1, 0], 2)
+
+    def test_margin_sums(self):
+        """Margins are the row and column sums, updated by set_margin_sums."""
+        od = sample_od(np.array([[1, 2, 3], [4, 5, 6]]))
+        self.assertEqual(od.sums_o, {3: 6, 7: 15})
+        self.assertEqual(od.sums_d, {3: 5, 7: 7, 9: 9})
+
+        od.volume[(3, 3)] = 11
+        self.assertEqual(od.sums_o[3], 6)
+        od.set_margin_sums()
+        self.assertEqual(od.sums_o[3], 16)
+
+    def test_sparse_storage(self):
+        """Sparse storage gives the same volumes and margins as dense storage."""
+        dense = np.array([[0, 2, 0], [4, 0, 0]], dtype=np.float64)
+        od = sample_od(sparse.csr_matrix(dense))
+
+        self.assertTrue(od.is_sparse)
+        self.assertEqual(od.volume[(7, 3)], 4)
+        self.assertEqual(od.sums_d, {3: 4, 7: 2, 9: 0})
+        np.testing.assert_array_equal(od.dense_array(), dense)
+
+        copy = create_od_from_source(od, copy_volume=True)
+        self.assertTrue(copy.is_sparse)
+        np.testing.assert_array_equal(copy.dense_array(), dense)
+
+    def test_set_volumes(self):
+        """Batched and single writes give the same volumes, dense or sparse, without sparse warnings."""
+        dense = np.array([[0, 2, 0], [4, 0, 0]], dtype=np.float64)
+        expected = np.array([[1, 2, 0], [8, 0, 3]], dtype=np.float64)
+
+        for storage in (np.array, sparse.csr_matrix):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', sparse.SparseEfficiencyWarning)
+
+                od = sample_od(storage(dense))
+                od.set_volumes([(3, 3), (7, 3), (7, 9)], [1, 8, 3])
+                np.testing.assert_array_equal(od.dense_array(), expected)
+                self.assertEqual(od.sums_o, {3: 3, 7: 11})
+
+                od = sample_od(storage(dense))
+                od.volume[(3, 3)] = 1
+                od.volume[(7, 3)] = 8
+                od.volume[(7, 9)] = 3
+                np.testing.assert_array_equal(od.dense_array(), expected)
+
+            np.testing.assert_array_equal(od.volumes([(7, 9), (3, 7)]), [3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Test suite for od_read.py
+"""
+
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from context import jodeln
+from jodeln import model as model_module
+from jodeln.network import net_read
+from jodeln.od import od_read
+
+tests_path = pathlib.Path(__file__).parent.absolute()
+net_path = os.path.join(tests_path, "networks", "net01")
+
+
+class TestODRead(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.net = net_read.create_network(os.path.join(net_path, "nodes.csv"),
+                                           os.path.join(net_path, "links.csv"))
+
+    def test_od_from_csv(self):
+        """Volumes are read into the array in csv row/column order."""
+        od = od_read.od_from_csv(os.path.join(net_path, "seed_matrix.csv"), self.net)
+
+        self.assertEqual(od.names_o, ['100', '101', '104', '105'])
+        self.assertEqual(od.volume[(0, 4)], 99)
+        self.assertEqual(od.volume[(1, 5)], 42)
+        self.assertEqual(od.sums_o[0], 177)
+
+    def test_od_from_csv_sparse(self):
+        """Sparse output has the same volumes as dense output."""
+        od_file = os.path.join(net_path, "seed_matrix.csv")
+        dense = od_read.od_from_csv(od_file, self.net)
+        od = od_read.od_from_csv(od_file, self.net, sparse_output=True)
+
+        self.assertTrue(od.is_sparse)
+        self.assertEqual(od.array.nnz, 4)
+        np.testing.assert_array_equal(od.dense_array(), dense.array)
+
+    def test_model_load_sparse(self):
+        """Model.load reads a sparse seed matrix if requested, or if it has many zones."""
+        files = {"node_file": os.path.join(net_path, "nodes.csv"),
+                 "links_file": os.path.join(net_path, "links.csv"),
+                 "od_seed_file": os.path.join(net_path, "seed_matrix.csv")}
+
+        model = model_module.Model()
+        model.load(**files)
+        self.assertFalse(model.od_seed.is_sparse)
+
+        model.load(**files, od_sparse=True)
+        self.assertTrue(model.od_seed.is_sparse)
+        self.assertTrue(model.od_estimated.is_sparse)
+
+        with mock.patch.object(model_module.od_read, 'SPARSE_OD_ZONES', 4):
+            model.load(**files)
+        self.assertTrue(model.od_seed.is_sparse)
+
+    def test_unknown_zones(self):
+        """Zones that are not network nodes are reported before reading volumes."""
+        with tempfile.TemporaryDirectory() as folder:
+            od_file = os.path.join(folder, "od.csv")
+            with open(od_file, 'w') as f:
+                f.write("100,0,1,2\nX,0,0,0\nY,0,0,0\n")
+
+            with self.assertRaises(od_read.ZoneNotFoundError) as cm:
+                od_read.od_from_csv(od_file, self.net)
+        
+        self.assertEqual(cm.exception.zone_names, ['X', 'Y'])
+
+
+if __name__ == '__main__':
+    unittest.main()
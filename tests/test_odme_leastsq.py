@@ -8,6 +8,7 @@ import os
 
 from context import jodeln
 from jodeln.model import Model
+from jodeln.od import odme_leastsq
 
 
 class TestOdmeLeastSq(unittest.TestCase):
@@ -26,6 +27,48 @@ class TestOdmeLeastSq(unittest.TestCase):
         
         self.assertEqual(1 == 1, True)
 
+    def test_odme_leastsq_sparse(self):
+        """Sparse solver gives the same OD as the dense solver."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"),
+                   turns_file=os.path.join(net_path, "turns.csv"))
+
+        args = (model.od_seed, 
+                model.net, 
+                model.select_link(only_target_links=True),
+                model.select_turn(only_target_turns=True),
+                0.50)
+        
+        _, od_dense = odme_leastsq.estimate_od(*args, use_sparse=False)
+        _, od_sparse = odme_leastsq.estimate_od(*args, use_sparse=True)
+
+        for k, v in od_dense.volume.items():
+            self.assertAlmostEqual(od_sparse.volume[k], v, places=3)
+
+    def test_odme_leastsq_progress_cancel(self):
+        """The solver result is reported, and cancelling discards it."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+        
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"),
+                   turns_file=os.path.join(net_path, "turns.csv"))
+
+        progress = []
+        result = model.solve_od_leastsq(0.5, progress=progress.append)
+        self.assertEqual(len(progress), 1)
+        self.assertAlmostEqual(progress[0].objective, result.diagnostics.cost)
+
+        self.assertIsNone(model.solve_od_leastsq(0.5, cancel=lambda: True))
+        self.assertIsNone(model.solve_od_fratar(cancel=lambda: True))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Test suite for the on-disk route cache.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from synthetic_network import grid_network
+from jodeln.network import net as net_module
+from jodeln.network.route_cache import RouteCache
+
+
+def _routes(net):
+    return [(od.origin, od.destination, od.routes[0].nodes, od.routes[0].name)
+            for od in net.od_pairs]
+
+
+class TestRouteCache(unittest.TestCase):
+
+    def test_cache_hit_skips_search(self):
+        """Routes read from the cache match the searched routes."""
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RouteCache(folder)
+
+            searched = grid_network(5)
+            searched.init_routes(cache=cache)
+            self.assertEqual(len(os.listdir(folder)), 1)
+
+            cached = grid_network(5)
+            with mock.patch.object(net_module, '_search_routes', side_effect=AssertionError):
+                cached.init_routes(cache=cache)
+
+            self.assertEqual(_routes(searched), _routes(cached))
+
+    def test_cost_change_misses(self):
+        """Different link costs produce a different cache key."""
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RouteCache(folder)
+
+            grid_network(5, seed=0).init_routes(cache=cache)
+            grid_network(5, seed=1).init_routes(cache=cache)
+            self.assertEqual(len(os.listdir(folder)), 2)
+
+    def test_eviction(self):
+        """Least recently used files are deleted when over the size limit."""
+        with tempfile.TemporaryDirectory() as folder:
+            cache = RouteCache(folder)
+            grid_network(5, seed=0).init_routes(cache=cache)
+            size = os.path.getsize(os.path.join(folder, os.listdir(folder)[0]))
+
+            # Room for about one file.
+            cache.max_bytes = int(size * 1.5)
+            net = grid_network(5, seed=1)
+            net.init_routes(cache=cache)
+
+            csr = net.csr()
+            o_indices = [csr.node_index[n.key] for n in net.nodes() if n.is_origin]
+            d_indices = [csr.node_index[n.key] for n in net.nodes() if n.is_destination]
+            self.assertEqual(os.listdir(folder), [f'{cache.key(csr, o_indices, d_indices)}.npz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
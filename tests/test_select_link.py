@@ -8,6 +8,7 @@ import os
 
 from context import jodeln
 from jodeln.model import Model
+from jodeln.network import net_read
 
 
 class TestSelectLink(unittest.TestCase):
@@ -57,6 +58,68 @@ class TestSelectLink(unittest.TestCase):
 
         self.assertEqual(select_turn == expected_select_turn, True)
 
+    def test_select_index_updates(self):
+        """Cached select-link results follow route imports and ratio changes."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net03")
+
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"))
+        before = model.select_link()
+        index = model.select_index()
+
+        net_read.import_routes(os.path.join(net_path, "user_routes.csv"), model.net)
+        self.assertIsNot(model.select_index(), index)
+        self.assertEqual(model.select_link(), _brute_force_select_link(model))
+        self.assertNotEqual(model.select_link(), before)
+
+        # Change a route ratio without changing the routes.
+        index = model.select_index()
+        od = next(od for od in model.net.od_pairs if len(od.routes) == 2)
+        od.routes[0].target_ratio = 0.5
+        od.routes[1].target_ratio = 0.5
+        self.assertIs(model.select_index(), index)
+        self.assertEqual(model.select_link(), _brute_force_select_link(model))
+
+        # Single link queries match the full results.
+        for (i, j), zone_pairs in model.select_link().items():
+            self.assertEqual(model.select_link_at(i, j), zone_pairs)
+
+    def test_zone_pairs_through(self):
+        """Single element queries return zone pairs, ratios, and volumes."""
+        model = Model()
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+
+        model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                   links_file=os.path.join(net_path, "links.csv"),
+                   od_seed_file=os.path.join(net_path, "seed_matrix.csv"))
+        for n, route in enumerate(r for od in model.net.od_pairs for r in od.routes):
+            route.assigned_volume = 10 * (n + 1)
+        model.net.set_link_and_turn_volume_from_route()
+
+        for (i, j), zone_pairs in model.select_link().items():
+            flows = model.zone_pairs_through((i, j))
+            self.assertEqual({(f.origin, f.destination): f.ratio for f in flows}, zone_pairs)
+
+        flows = model.zone_pairs_through((2, 3, 4))
+        self.assertEqual([(f.origin, f.destination) for f in flows], [(0, 4), (1, 4)])
+        self.assertEqual(sum(f.volume for f in flows), model.net.turn(2, 3, 4).assigned_volume)
+        self.assertEqual(sum(f.volume for f in model.zone_pairs_through((2, 3))),
+                         model.net.link(2, 3).assigned_volume)
+
+
+def _brute_force_select_link(model):
+    select_link = {key: {} for key, _ in model.net.links(True)}
+    for od in model.net.od_pairs:
+        for route in od.routes:
+            for x in range(len(route.nodes) - 1):
+                zone_pairs = select_link[(route.nodes[x], route.nodes[x + 1])]
+                zone_pairs.setdefault((od.origin, od.destination), 0)
+                zone_pairs[(od.origin, od.destination)] += route.target_ratio
+    return select_link
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Test suite for the shortest route search in net.py
+"""
+
+import sys
+import unittest
+
+from synthetic_network import grid_network
+from jodeln.network.net import (
+    _dijkstra, _dijkstra_csr, _index_seq_from_prev, _node_seq_from_dijkstra)
+
+
+def list_scan_dijkstra(net, source):
+    """Reference O(V^2) implementation to compare against."""
+    Q = list(net._graph)
+    dist = dict.fromkeys(net._graph, sys.maxsize)
+    prev = dict.fromkeys(net._graph, None)
+    dist[source] = 0
+
+    while len(Q) > 0:
+        min_dist = sys.maxsize
+        for i in Q:
+            if dist[i] <= min_dist:
+                u, min_dist = i, dist[i]
+        Q.remove(u)
+
+        for v, link in net._graph[u].neighbors.items():
+            alt = dist[u] + link.cost
+            if alt < dist[v]:
+                dist[v] = alt
+                prev[v] = u
+
+    return {'dist': dist, 'prev': prev}
+
+
+class TestShortestPath(unittest.TestCase):
+
+    def test_heap_matches_list_scan(self):
+        """Heap search with early termination returns the same routes."""
+        net = grid_network(8)
+        destinations = [k for k, node in net.nodes(True) if node.is_destination]
+
+        for o in (0, 7, 63):
+            expected = list_scan_dijkstra(net, o)
+            result = _dijkstra(net, o, destinations)
+            for d in destinations:
+                self.assertEqual(_node_seq_from_dijkstra(result, o, d),
+                                 _node_seq_from_dijkstra(expected, o, d))
+                self.assertEqual(result['dist'][d], expected['dist'][d])
+
+    def test_equal_cost_ties(self):
+        """Equal cost routes are broken the same way as the list scan."""
+        net = grid_network(5)
+        for link in net.links():
+            link.cost = 1
+
+        for o in (0, 12, 24):
+            expected = list_scan_dijkstra(net, o)
+            result = _dijkstra(net, o)
+            self.assertEqual(result['prev'], expected['prev'])
+
+    def test_csr_view(self):
+        """CSR view lists the same links, in the same order, as Network.links()."""
+        net = grid_network(4)
+        csr = net.csr()
+
+        self.assertEqual(csr.n_nodes, 16)
+        self.assertEqual(csr.link_keys, [key for key, _ in net.links(True)])
+        for e, ((i, j), link) in enumerate(net.links(True)):
+            self.assertEqual(csr.node_keys[csr.targets[e]], j)
+            self.assertIn(e, csr.out_links(csr.node_index[i]))
+            self.assertEqual(csr.cost[e], link.cost)
+
+        csr.assigned_volume[:] = 5
+        csr.push_volumes(net)
+        self.assertTrue(all(link.assigned_volume == 5 for link in net.links()))
+
+    def test_csr_search_matches_dict_search(self):
+        """Shortest routes found on the CSR view match the dict graph search."""
+        net = grid_network(8)
+        csr = net.csr()
+        adjacency = csr.adjacency()
+        destinations = [k for k, node in net.nodes(True) if node.is_destination]
+
+        for o in (0, 7, 63):
+            expected = _dijkstra(net, o, destinations)
+            _, prev = _dijkstra_csr(adjacency, csr.node_index[o],
+                                    [csr.node_index[d] for d in destinations])
+            for d in destinations:
+                seq = _index_seq_from_prev(prev, csr.node_index[o], csr.node_index[d])
+                self.assertEqual([csr.node_keys[u] for u in seq],
+                                 _node_seq_from_dijkstra(expected, o, d))
+
+
+if __name__ == '__main__':
+    unittest.main()
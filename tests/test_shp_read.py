@@ -0,0 +1,99 @@
+"""
+Test reading networks from shapefiles, without the GUI.
+"""
+
+import os
+import pathlib
+import tempfile
+import unittest
+
+import shapefile
+
+from context import jodeln
+from jodeln.model import Model
+from jodeln.network import net_read
+from jodeln.network.net import Network
+
+
+NET05 = os.path.join(pathlib.Path(__file__).parent.absolute(), "networks", "net05")
+
+
+class TestShpRead(unittest.TestCase):
+
+    def test_snap_links(self):
+        """Link end points snap to the closest node."""
+        net = Network()
+        net_read.add_nodes_from_shp(net, os.path.join(NET05, "points.shp"))
+        flagged = net_read.add_links_from_shp(net, os.path.join(NET05, "links.shp"), 1e-6)
+
+        self.assertEqual(flagged, [])
+        self.assertEqual(len(list(net.links())), 14)
+
+        for (i, j), link in net.links(True):
+            self.assertAlmostEqual(link.shape_points[0][0], net.node(i).x)
+            self.assertAlmostEqual(link.shape_points[-1][1], net.node(j).y)
+
+    def test_snap_tolerance(self):
+        """Links further than the tolerance from a node are flagged and not added."""
+        net = Network()
+        net_read.add_nodes_from_shp(net, os.path.join(NET05, "points.shp"))
+
+        moved = net.node(0)
+        moved.x += 1000
+        moved.y += 1000
+
+        flagged = net_read.add_links_from_shp(net, os.path.join(NET05, "links.shp"), 1.0)
+
+        self.assertGreater(len(flagged), 0)
+        for snap in flagged:
+            self.assertGreater(max(snap.i_dist, snap.j_dist), 1.0)
+
+        for (i, j), _ in net.links(True):
+            self.assertNotIn(0, (i, j))
+
+    def test_chunked_read(self):
+        """Reading the shapefiles in small chunks gives the same network."""
+        net = Network()
+        net_read.add_nodes_from_shp(net, os.path.join(NET05, "points.shp"))
+        net_read.add_links_from_shp(net, os.path.join(NET05, "links.shp"))
+
+        chunked = Network()
+        net_read.add_nodes_from_shp(chunked, os.path.join(NET05, "points.shp"), chunk_size=3)
+        net_read.add_links_from_shp(chunked, os.path.join(NET05, "links.shp"), chunk_size=3)
+
+        self.assertEqual([(n.key, n.name, n.x, n.y) for n in net.nodes()],
+                         [(n.key, n.name, n.x, n.y) for n in chunked.nodes()])
+        self.assertEqual(list(net.links()), list(chunked.links()))
+        self.assertEqual(chunked.get_node_by_name(net.node(3).name)[0], 3)
+
+    def test_load_reports_skipped_links(self):
+        """Model.load passes the snap tolerance through, and lists links that were not added."""
+        with tempfile.TemporaryDirectory() as folder:
+            # Copy of the nodes, with the first node moved away from its links.
+            points_file = os.path.join(folder, "points.shp")
+            with shapefile.Reader(os.path.join(NET05, "points.shp")) as sf, \
+                 shapefile.Writer(points_file, shapeType=sf.shapeType) as out:
+                out.fields = sf.fields[1:]
+                for n, shape_record in enumerate(sf.iterShapeRecords()):
+                    x, y = shape_record.shape.points[0]
+                    if n == 0:
+                        x += 1000
+                        y += 1000
+                    out.point(x, y)
+                    out.record(*shape_record.record)
+
+            model = Model()
+            self.assertTrue(model.load(node_file=points_file,
+                                       links_file=os.path.join(NET05, "links.shp"),
+                                       snap_tolerance=1.0))
+
+        skipped = model.net.skipped_links
+        self.assertGreater(len(skipped), 0)
+        for snap in skipped:
+            self.assertGreater(max(snap.i_dist, snap.j_dist), 1.0)
+        for (i, j), _ in model.net.links(True):
+            self.assertNotIn(0, (i, j))
+
+
+if __name__ == '__main__':
+    unittest.main()
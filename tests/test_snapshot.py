@@ -0,0 +1,152 @@
+"""
+Test saving and loading binary network and OD snapshots.
+"""
+
+import unittest
+import pathlib
+import os
+import tempfile
+
+import numpy as np
+
+from context import jodeln
+from jodeln.model import Model
+from jodeln.network import net_snapshot
+from jodeln.network.net import Network
+from jodeln.network.netlink import NetLinkData
+from jodeln.network.netnode import NetNodeData
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        tests_path = pathlib.Path(__file__).parent.absolute()
+        net_path = os.path.join(tests_path, "networks", "net01")
+
+        self.model = Model()
+        self.model.load(node_file=os.path.join(net_path, "nodes.csv"),
+                        links_file=os.path.join(net_path, "links.csv"),
+                        od_seed_file=os.path.join(net_path, "seed_matrix.csv"),
+                        turns_file=os.path.join(net_path, "turns.csv"))
+        self.model.estimate_od_fratar()
+
+    def test_round_trip(self):
+        """Loaded snapshot matches the model it was saved from."""
+        with tempfile.TemporaryDirectory() as folder:
+            self.model.save_snapshot(folder)
+
+            loaded = Model()
+            self.assertTrue(loaded.load_snapshot(folder))
+
+            net = self.model.net
+            net_loaded = loaded.net
+
+            for node, node_loaded in zip(net.nodes(), net_loaded.nodes()):
+                self.assertEqual(node.key, node_loaded.key)
+                self.assertEqual(node.name, node_loaded.name)
+                self.assertEqual((node.x, node.y), (node_loaded.x, node_loaded.y))
+                self.assertEqual(node.is_origin, node_loaded.is_origin)
+                self.assertEqual(list(node.neighbors), list(node_loaded.neighbors))
+                self.assertEqual(node.up_neighbors, node_loaded.up_neighbors)
+
+            for link, link_loaded in zip(net.links(), net_loaded.links()):
+                self.assertEqual((link.key, link.name, link.cost, link.target_volume, 
+                                  link.assigned_volume, link.seed_volume, link.geh),
+                                 (link_loaded.key, link_loaded.name, link_loaded.cost, 
+                                  link_loaded.target_volume, link_loaded.assigned_volume, 
+                                  link_loaded.seed_volume, link_loaded.geh))
+                np.testing.assert_array_equal(link.shape_points, link_loaded.shape_points)
+            self.assertEqual(list(net.turns()), list(net_loaded.turns()))
+            self.assertEqual(net.od_pairs, net_loaded.od_pairs)
+            self.assertEqual(net_loaded.get_node_by_name(net.node(0).name)[0], 0)
+
+            np.testing.assert_allclose(loaded.od_seed.array, self.model.od_seed.array)
+            np.testing.assert_allclose(loaded.od_estimated.array, self.model.od_estimated.array)
+            np.testing.assert_allclose(loaded.od_diff.array, self.model.od_diff.array)
+            self.assertEqual(loaded.od_seed.targets_o, self.model.od_seed.targets_o)
+            self.assertEqual(loaded.od_seed.names_d, self.model.od_seed.names_d)
+
+            # Loaded routes assign the same volumes.
+            link_volume, turn_volume = net_loaded.set_link_and_turn_volume_from_route(write_back=False)
+            link_expected, turn_expected = net.set_link_and_turn_volume_from_route(write_back=False)
+            np.testing.assert_allclose(link_volume, link_expected)
+            np.testing.assert_allclose(turn_volume, turn_expected)
+
+    def test_saved_turns_and_incidence(self):
+        """Turn store and route incidence are loaded from the saved arrays, not rebuilt."""
+        net = self.model.net
+        turns = net.turn_store()
+        incidence = net.route_incidence()
+
+        with tempfile.TemporaryDirectory() as folder:
+            net_snapshot.save_network(net, folder)
+            net_loaded = net_snapshot.load_network(folder)
+            turns_loaded = net_loaded.turn_store()
+
+            for name in ('offsets', 'in_link', 'out_link', 'in_rank', 'seed_volume',
+                         'target_volume', 'assigned_volume', 'geh'):
+                array = getattr(turns_loaded, name)
+                self.assertIsInstance(array, np.memmap)
+                np.testing.assert_array_equal(array, getattr(turns, name))
+
+            self.assertEqual(turns_loaded.renamed(), turns.renamed())
+
+            self.assertIsNotNone(net_loaded._incidence)
+            incidence_loaded = net_loaded.route_incidence()
+            self.assertEqual((incidence_loaded.links != incidence.links).nnz, 0)
+            self.assertEqual((incidence_loaded.turns != incidence.turns).nnz, 0)
+
+            # Loaded arrays can be edited, and saved again to the same folder.
+            turns_loaded.assigned_volume[:] = 1
+            net_snapshot.save_network(net_loaded, folder)
+            np.testing.assert_array_equal(
+                net_snapshot.load_network(folder).turn_store().assigned_volume, 1)
+
+    def test_integer_node_names(self):
+        """Integer node names, e.g. from a shapefile, are still integers when loaded."""
+        net = Network()
+        for name, x in ((100, 0), (200, 10)):
+            net.add_node(NetNodeData(name=name, x=x, y=0, is_origin=True, is_destination=True))
+        net.add_link(100, 200, NetLinkData(cost=1, name=7, target_volume=-1,
+                                           shape_points=[(0, 0), (10, 0)]))
+        net.init_turns()
+
+        with tempfile.TemporaryDirectory() as folder:
+            net_snapshot.save_network(net, folder)
+            net_loaded = net_snapshot.load_network(folder)
+
+        self.assertEqual(net_loaded.get_node_by_name(200)[0], 1)
+        self.assertEqual(net_loaded.link(0, 1).name, 7)
+
+    def test_save_to_loaded_folder(self):
+        """A loaded snapshot can be saved back to its own folder and loaded again."""
+        with tempfile.TemporaryDirectory() as folder:
+            self.model.save_snapshot(folder)
+
+            loaded = Model()
+            loaded.load_snapshot(folder)
+            loaded.save_snapshot(folder)
+
+            reloaded = Model()
+            reloaded.load_snapshot(folder)
+            reloaded.save_snapshot(folder)
+
+            np.testing.assert_allclose(reloaded.od_seed.dense_array(),
+                                       self.model.od_seed.dense_array())
+            np.testing.assert_allclose(loaded.od_seed.dense_array(),
+                                       self.model.od_seed.dense_array())
+
+            final = Model()
+            final.load_snapshot(folder)
+            np.testing.assert_allclose(final.od_seed.dense_array(),
+                                       self.model.od_seed.dense_array())
+            self.assertGreater(final.od_seed.dense_array().sum(), 0)
+
+    def test_missing_snapshot(self):
+        """Loading from a folder without a snapshot returns False."""
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertFalse(Model().load_snapshot(folder))
+
+
+if __name__ == '__main__':
+    unittest.main()